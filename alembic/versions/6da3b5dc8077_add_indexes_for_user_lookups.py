@@ -0,0 +1,28 @@
+"""add indexes for user lookups
+
+Revision ID: 6da3b5dc8077
+Revises: a4697f28f65d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6da3b5dc8077'
+down_revision: Union[str, None] = 'a4697f28f65d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Token lookups in UserCRUD.get_user_by_code
+    op.create_index(op.f('ix_users_verify_user_token'), 'users', ['verify_user_token'], unique=False)
+    op.create_index(op.f('ix_users_forget_password_token'), 'users', ['forget_password_token'], unique=False)
+    # Admin onboarded-clients query: role = 'client' AND is_onboarded
+    op.create_index('ix_users_role_is_onboarded', 'users', ['role', 'is_onboarded'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_users_role_is_onboarded', table_name='users')
+    op.drop_index(op.f('ix_users_forget_password_token'), table_name='users')
+    op.drop_index(op.f('ix_users_verify_user_token'), table_name='users')
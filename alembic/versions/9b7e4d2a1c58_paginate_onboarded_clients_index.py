@@ -0,0 +1,26 @@
+"""extend onboarded clients index for keyset pagination
+
+Revision ID: 9b7e4d2a1c58
+Revises: 3f1c2b9e7d40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e4d2a1c58'
+down_revision: Union[str, None] = '3f1c2b9e7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Onboarded-clients listing pages through (updated_at, id) within role = 'client' AND is_onboarded
+    op.create_index('ix_users_role_is_onboarded_updated_at_id', 'users', ['role', 'is_onboarded', 'updated_at', 'id'], unique=False)
+    # The new index covers every query the old one served
+    op.drop_index('ix_users_role_is_onboarded', table_name='users')
+
+def downgrade() -> None:
+    op.create_index('ix_users_role_is_onboarded', 'users', ['role', 'is_onboarded'], unique=False)
+    op.drop_index('ix_users_role_is_onboarded_updated_at_id', table_name='users')
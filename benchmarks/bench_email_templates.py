@@ -0,0 +1,61 @@
+"""
+Benchmark of rendering the email templates.
+
+For both templates it reports renders per second through fastapi_mail's
+template machinery, which builds a Jinja environment and loads and parses
+the template for every message, and through the precompiled EmailTemplates,
+with and without minification. It also prints the rendered sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_email_templates --renders 5000
+"""
+import argparse
+import tempfile
+import time
+from jinja2 import Environment, FileSystemLoader
+from utils.email_templates import EMAIL_TEMPLATE_FOLDER, EmailTemplates
+
+CONTEXTS = {
+    "verification_email.html": {"name": "Alice Green", "code": "482913"},
+    "certificate_review.html": {"name": "Alice Green", "status": "rejected", "reason": "The scan is unreadable"},
+}
+
+
+def per_message_environment(template_name: str, context: dict) -> str:
+    """Renders the way FastMail.send_message does: a new environment per message."""
+    environment = Environment(loader=FileSystemLoader(EMAIL_TEMPLATE_FOLDER))
+    return environment.get_template(template_name).render(**context)
+
+
+def renders_per_second(render, renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        render()
+    return renders / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=5000, help="renders per template and method")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        precompiled = EmailTemplates(EMAIL_TEMPLATE_FOLDER, cache_dir=cache_dir)
+        minified = EmailTemplates(EMAIL_TEMPLATE_FOLDER, minify=True)
+        precompiled.warm()
+        minified.warm()
+
+        print(f"{'template':<26} {'method':<22} {'renders/s':>10} {'bytes':>7}")
+        for template_name, context in CONTEXTS.items():
+            methods = {
+                "fastapi_mail": lambda: per_message_environment(template_name, context),
+                "precompiled": lambda: precompiled.render(template_name, context).html,
+                "precompiled, minified": lambda: minified.render(template_name, context).html,
+            }
+            for method, render in methods.items():
+                rate = renders_per_second(render, args.renders)
+                print(f"{template_name:<26} {method:<22} {rate:10.0f} {len(render()):7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Login-storm benchmark: event-loop lag while many bcrypt verifications run.
+
+A ticker coroutine sleeps for a fixed interval and records how late it wakes
+up. The lag is reported with verification inline on the loop (the old
+behaviour), in the thread-pool PasswordHasher and in the process-pool one.
+
+Run from the repository root:
+    python -m benchmarks.bench_login_storm --logins 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from utils.password_hasher import PasswordHasher, pwd_context
+
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, lags: list):
+    """Records how late the loop wakes a coroutine sleeping TICK_SECONDS."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(loop.time() - started - TICK_SECONDS)
+
+
+async def storm(verify, logins: int, hashed: str):
+    """Runs the login storm and returns (elapsed seconds, lag samples)."""
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(verify("password123", hashed) for _ in range(logins)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    rejected = sum(isinstance(result, Exception) for result in results)
+    return elapsed, lags, rejected
+
+
+async def inline_verify(password, hashed):
+    """The previous behaviour: bcrypt runs directly on the event loop."""
+    return pwd_context.verify(password, hashed)
+
+
+def report(name, elapsed, lags, rejected, logins):
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{name:<16} logins={logins:<4} rejected={rejected:<4} total={elapsed:7.2f}s "
+        f"lag p50={statistics.median(lags_ms):8.1f}ms p99={p99:8.1f}ms max={lags_ms[-1]:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login attempts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing workers")
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("password123")
+    queue_limit = args.logins
+
+    elapsed, lags, rejected = asyncio.run(storm(inline_verify, args.logins, hashed))
+    report("inline", elapsed, lags, rejected, args.logins)
+
+    for executor_type in ("thread", "process"):
+        hasher = PasswordHasher(executor_type, max_workers=args.workers, queue_limit=queue_limit)
+        try:
+            elapsed, lags, rejected = asyncio.run(storm(hasher.verify, args.logins, hashed))
+        finally:
+            hasher.shutdown()
+        report(f"{executor_type} pool", elapsed, lags, rejected, args.logins)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark of the rate limiting algorithms.
+
+For each algorithm it reports the cost of one consume() call on a hot key,
+the cost of a BucketStore lookup plus consume() across many keys, and the
+memory held per key. It then reports the cost of one acquire() on each
+backend that can share state between workers, against the in-process one.
+The Redis figure uses the in-process fake, so it leaves out the round trip.
+
+Run from the repository root:
+    python -m benchmarks.bench_rate_limit_algorithms --keys 100000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from rate_limiter.algorithms.gcra import GCRA
+from rate_limiter.backends.memory import MemoryBackend
+from rate_limiter.backends.redis_backend import FakeRedis, RedisBackend
+from rate_limiter.backends.shared_memory import SharedMemoryBackend
+from rate_limiter.bucket_store import BucketStore
+from rate_limiter.rate_limiter import ALGORITHMS
+
+CAPACITY = 100
+REFILL_RATE = 10.0
+
+
+def hot_key(algorithm, calls: int) -> float:
+    """Mean nanoseconds per consume() on a single key."""
+    limiter = algorithm(CAPACITY, REFILL_RATE)
+    now = time.time()
+    started = time.perf_counter()
+    for i in range(calls):
+        limiter.consume(1, now + i * 0.001)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def many_keys(algorithm, keys: int) -> tuple:
+    """Mean nanoseconds per lookup and consume() across keys, and bytes held per key."""
+    names = [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(keys)]
+
+    def fill():
+        store = BucketStore(lambda: algorithm(CAPACITY, REFILL_RATE), max_keys=keys, idle_timeout=3600)
+        for name in names:
+            store.get(name).consume(1)
+        return store
+
+    started = time.perf_counter()
+    fill()
+    elapsed = time.perf_counter() - started
+
+    # Measured in a second pass, since tracing allocations slows everything down
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = fill()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del store
+
+    return elapsed / keys * 1e9, held / keys
+
+
+def backend_acquire(backend, keys: int, calls: int) -> float:
+    """Mean nanoseconds per acquire() spread over keys."""
+    names = [f"ip:10.0.{i >> 8 & 255}.{i & 255}" for i in range(keys)]
+    now = time.time()
+    started = time.perf_counter()
+    if asyncio.iscoroutinefunction(backend.acquire):
+        async def run():
+            for i in range(calls):
+                await backend.acquire(names[i % keys], now + i * 0.001)
+        asyncio.run(run())
+    else:
+        for i in range(calls):
+            backend.acquire(names[i % keys], now + i * 0.001)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000, help="consume() calls on the hot key")
+    parser.add_argument("--keys", type=int, default=100_000, help="distinct keys for the store run")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<16} {'hot key':>12} {'store lookup':>14} {'bytes/key':>10}")
+    for name, algorithm in ALGORITHMS.items():
+        hot = hot_key(algorithm, args.calls)
+        per_key, held = many_keys(algorithm, args.keys)
+        print(f"{name:<16} {hot:9.0f} ns {per_key:11.0f} ns {held:10.0f}")
+
+    with tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None) as directory:
+        backends = {
+            "memory (gcra)": MemoryBackend(GCRA, CAPACITY, REFILL_RATE, max_keys=100_000, idle_timeout=3600),
+            "shared memory": SharedMemoryBackend(os.path.join(directory, "table"), CAPACITY, REFILL_RATE),
+            "redis (fake)": RedisBackend(FakeRedis(), CAPACITY, REFILL_RATE),
+        }
+        print(f"\n{'backend':<16} {'acquire':>12}")
+        for name, backend in backends.items():
+            print(f"{name:<16} {backend_acquire(backend, 10_000, args.calls):9.0f} ns")
+        backends["shared memory"].close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-request overhead of the rate limiter: raw ASGI versus BaseHTTPMiddleware.
+
+Each variant wraps the same trivial ASGI app and is driven in-process with a
+synthetic scope, so the numbers only contain middleware cost. The
+BaseHTTPMiddleware variant reproduces the previous dispatch-based limiter.
+
+Run from the repository root:
+    python -m benchmarks.bench_rate_limiter --requests 20000
+"""
+import argparse
+import asyncio
+import time
+from fastapi import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from rate_limiter.algorithms.token_token import TokenBucket
+from rate_limiter.bucket_store import BucketStore
+from rate_limiter.key_functions import client_ip
+from rate_limiter.rate_limiter import RateLimiterMiddleware
+
+CAPACITY = 10**9
+REFILL_RATE = 10**9
+
+
+class DispatchRateLimiter:
+    """The previous limiter: a BaseHTTPMiddleware dispatch function."""
+
+    def __init__(self):
+        self.buckets = BucketStore(lambda: TokenBucket(CAPACITY, REFILL_RATE), max_keys=100_000, idle_timeout=60)
+
+    async def __call__(self, request, call_next):
+        bucket = self.buckets.get(client_ip(request.scope))
+        if not bucket.consume(1):
+            raise HTTPException(status_code=429, detail="Too Many Requests")
+        return await call_next(request)
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def drive(app, requests: int) -> float:
+    """Sends requests through app and returns the mean microseconds per request."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v1/user/data/1",
+            "raw_path": b"/api/v1/user/data/1",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver")],
+            "client": (f"10.0.{i % 256}.{i % 100}", 50000),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = {
+        "no limiter": ok_app,
+        "BaseHTTPMiddleware": BaseHTTPMiddleware(ok_app, dispatch=DispatchRateLimiter()),
+        "raw ASGI": RateLimiterMiddleware(ok_app, capacity=CAPACITY, refill_rate=REFILL_RATE),
+    }
+
+    results = {name: asyncio.run(drive(app, args.requests)) for name, app in variants.items()}
+    baseline = results["no limiter"]
+    for name, per_request in results.items():
+        print(f"{name:<20} {per_request:8.2f} us/request  overhead {per_request - baseline:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark of response serialization: untyped dicts rendered by the stdlib
+json module against typed response models rendered by orjson.
+
+Both paths run FastAPI's own serialize_response, as a route does: the
+untyped one with no response_model, which goes through jsonable_encoder
+and JSONResponse, and the typed one with the route's response_model and
+ORJSONResponse. Payloads are a single user profile (small) and pages of
+onboarded clients with datetime fields (large).
+
+Run from the repository root:
+    python -m benchmarks.bench_response_serialization --rounds 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from models.schemas.auth_schemas import OnboardedClientsPageOut
+from models.schemas.user_schemas import UserProfileOut
+
+
+def profile() -> dict:
+    """The body of GET /user/data/{user_id}."""
+    return {
+        "user_id": 1,
+        "user_role": "client",
+        "user_name": "Alice Green",
+        "email": "alicegreen@example.com",
+        "profile_picture": "https://example.com/profile/alice-green",
+        "business_url": "https://files.example.com/certificates/1.pdf",
+        "is_verified": True,
+    }
+
+
+def clients_page(size: int) -> dict:
+    """The body of one onboarded-clients page."""
+    started = datetime(2026, 1, 1)
+    return {
+        "clients": [
+            {
+                "user_id": index,
+                "name": f"Client {index}",
+                "email": f"client{index}@example.com",
+                "business_url": f"https://files.example.com/certificates/{index}.pdf",
+                "onboarded_at": started + timedelta(seconds=index, microseconds=index),
+            }
+            for index in range(size)
+        ],
+        "next_cursor": "WyIyMDI2LTAxLTAxVDAwOjAwOjAwIiwxXQ",
+    }
+
+
+async def render(content, field, response_class) -> bytes:
+    """Serializes and renders one response body the way a route does."""
+    serialized = await serialize_response(field=field, response_content=content)
+    return response_class(serialized).body
+
+
+def measure(content, field, response_class, rounds: int) -> tuple:
+    """Returns the microseconds per response and the body size."""
+    async def run():
+        body = await render(content, field, response_class)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await render(content, field, response_class)
+        return (time.perf_counter() - started) / rounds * 1e6, len(body)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000, help="responses rendered per measurement")
+    args = parser.parse_args()
+
+    payloads = [
+        ("profile", profile(), UserProfileOut, args.rounds),
+        ("clients x50", clients_page(50), OnboardedClientsPageOut, args.rounds),
+        ("clients x200", clients_page(200), OnboardedClientsPageOut, max(args.rounds // 4, 1)),
+        ("clients x5000", clients_page(5000), OnboardedClientsPageOut, max(args.rounds // 100, 1)),
+    ]
+    print(f"{'payload':<14} {'bytes':>8} {'dict + json':>14} {'model + orjson':>16} {'speedup':>8}")
+    for name, content, model, rounds in payloads:
+        field = create_model_field(name="Response_" + model.__name__, type_=model, mode="serialization")
+        before, size = measure(content, None, JSONResponse, rounds)
+        after, _ = measure(content, field, ORJSONResponse, rounds)
+        print(f"{name:<14} {size:8d} {before:11.1f} us {after:13.1f} us {before / after:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
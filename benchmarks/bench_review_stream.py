@@ -0,0 +1,133 @@
+"""
+Load test of the certificate review queue stream.
+
+A uvicorn server runs the auth routes in this process (without the rate
+limiter, which would turn away hundreds of connections from one address),
+and --streams clients connect to /auth/admin/review-queue/stream and read
+it. The process CPU time is then sampled over a quiet period, which should
+stay flat however many streams are open, and over a burst of --events
+review events, reported per event and stream.
+
+Run from the repository root:
+    python -m benchmarks.bench_review_stream --streams 500 --events 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+
+os.environ.setdefault("DB_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_review_stream.db"))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, insert
+from config.db import get_engine
+from logic.auth.auth_logic import create_access_token
+from logic.users.review_queue import publish_client_reviewed, review_queue_events
+from models.models import User
+from routes.api.v1.auth.auth_routes import auth_router
+
+
+def seed(clients: int):
+    """Fills the review queue with onboarded clients."""
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(delete(User))
+        conn.execute(insert(User), [
+            {"name": f"Client {index}", "email": f"client{index}@example.com", "role": "client",
+             "password": "hash", "is_onboarded": True}
+            for index in range(clients)
+        ])
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def read_stream(client: httpx.AsyncClient, url: str, token: str, connected: asyncio.Event, counts: list, index: int):
+    """Reads one stream, counting the events after the snapshot."""
+    async with client.stream("GET", url, headers={"Authorization": f"Bearer {token}"}) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: snapshot"):
+                connected.set()
+            elif line.startswith("event: client_reviewed"):
+                counts[index] += 1
+
+
+async def wait_until(condition, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("streams did not catch up")
+        await asyncio.sleep(0.01)
+
+
+async def run(streams: int, events: int, quiet: float):
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(auth_router, prefix="/api/v1")
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    url = f"http://127.0.0.1:{port}/api/v1/auth/admin/review-queue/stream"
+    token = create_access_token({"sub": "admin@example.com"}, "Admin")
+    limits = httpx.Limits(max_connections=streams + 10)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        counts = [0] * streams
+        connected = [asyncio.Event() for _ in range(streams)]
+        readers = [
+            asyncio.create_task(read_stream(client, url, token, connected[index], counts, index))
+            for index in range(streams)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(event.wait() for event in connected))
+        print(f"{streams} streams connected in {time.perf_counter() - started:.2f} s")
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        await asyncio.sleep(quiet)
+        idle_cpu = (time.process_time() - cpu) / (time.perf_counter() - wall)
+        print(f"quiet: {idle_cpu * 100:.2f}% of a core over {quiet:.0f} s")
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        for user_id in range(events):
+            publish_client_reviewed(user_id, True)
+            await asyncio.sleep(0)
+        await wait_until(lambda: sum(counts) == streams * events, timeout=120)
+        burst_cpu = time.process_time() - cpu
+        print(f"burst: {events} events to {streams} streams in {time.perf_counter() - wall:.2f} s, "
+              f"{burst_cpu / (events * streams) * 1e6:.1f} us CPU per event per stream "
+              f"(server and clients), dropped={review_queue_events.dropped}")
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        await asyncio.sleep(quiet)
+        print(f"quiet again: {(time.process_time() - cpu) / (time.perf_counter() - wall) * 100:.2f}% of a core")
+
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+    server.should_exit = True
+    await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=500, help="connected admin streams")
+    parser.add_argument("--events", type=int, default=200, help="review events in the burst")
+    parser.add_argument("--clients", type=int, default=1000, help="onboarded clients in the snapshot")
+    parser.add_argument("--quiet", type=float, default=5.0, help="seconds of each quiet period")
+    args = parser.parse_args()
+
+    seed(args.clients)
+    asyncio.run(run(args.streams, args.events, args.quiet))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of the cost of Server-Timing spans, switched off and on.
+
+Measures one timed() block outside a request, as every span costs when the
+middleware is left out, and inside collect_timings(), as it costs with
+timing on. Then measures a primary-key lookup on an in-memory SQLite
+database: without the statement hooks, with the hooks installed but no
+request collecting, and with a request collecting.
+
+Run from the repository root:
+    python -m benchmarks.bench_server_timing --rounds 200000
+"""
+import argparse
+import time
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from models.models import Base, User
+from utils.server_timing import collect_timings, install_db_timing, timed
+
+
+def per_call(func, rounds: int) -> float:
+    """Returns the nanoseconds per call of func."""
+    func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds * 1e9
+
+
+def span():
+    with timed("bcrypt"):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200000, help="spans per measurement")
+    parser.add_argument("--queries", type=int, default=20000, help="queries per measurement")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(name="User", email="user@example.com", role="client", password="hash"))
+        db.commit()
+        query = select(User.id, User.email).where(User.id == 1)
+        lookup = lambda: db.execute(query).first()
+
+        print(f"{'measurement':<32} {'ns/call':>10}")
+        print(f"{'span, timing off':<32} {per_call(span, args.rounds):10.0f}")
+        with collect_timings():
+            print(f"{'span, timing on':<32} {per_call(span, args.rounds):10.0f}")
+        print(f"{'query, no hooks':<32} {per_call(lookup, args.queries):10.0f}")
+        install_db_timing()
+        print(f"{'query, hooks, timing off':<32} {per_call(lookup, args.queries):10.0f}")
+        with collect_timings():
+            print(f"{'query, hooks, timing on':<32} {per_call(lookup, args.queries):10.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of sending email over new versus pooled SMTP connections.
+
+It starts a local aiosmtpd sink and sends the same messages through a plain
+FastMail, which opens a connection per message, and through PooledFastMail.
+A real relay also spends time on STARTTLS and login; --handshake-delay adds
+that much latency to every EHLO so the sink behaves more like one.
+
+Run from the repository root:
+    python -m benchmarks.bench_smtp_pool --messages 500 --handshake-delay 0.02
+"""
+import argparse
+import asyncio
+import socket
+import time
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from utils.smtp_pool import PooledFastMail
+
+
+class SinkHandler:
+    """Accepts every message, delaying each handshake by handshake_delay seconds."""
+
+    def __init__(self, handshake_delay: float):
+        self.handshake_delay = handshake_delay
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake_delay)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def connection_config(port: int) -> ConnectionConfig:
+    return ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    )
+
+
+async def send_many(mailer, messages: int, concurrency: int) -> float:
+    """Sends messages with up to concurrency in flight and returns messages per second."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with limit:
+            await mailer.send_message(MessageSchema(
+                subject="Benchmark",
+                recipients=[f"user{i}@example.com"],
+                body="<p>Hello</p>",
+                subtype=MessageType.html,
+            ))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    if hasattr(mailer, "close"):
+        await mailer.close()
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500, help="messages sent per run")
+    parser.add_argument("--concurrency", type=int, default=4, help="sends in flight, also the pool size")
+    parser.add_argument("--handshake-delay", type=float, default=0.0, help="seconds added to every EHLO")
+    args = parser.parse_args()
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler(args.handshake_delay)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        config = connection_config(port)
+        print(f"{'sender':<24} {'sequential':>14} {'concurrent':>14}")
+        for name, make_mailer in (
+            ("connection per message", lambda: FastMail(config)),
+            ("pooled", lambda: PooledFastMail(config, size=args.concurrency)),
+        ):
+            sequential = asyncio.run(send_many(make_mailer(), args.messages, 1))
+            concurrent = asyncio.run(send_many(make_mailer(), args.messages, args.concurrency))
+            print(f"{name:<24} {sequential:8.0f} msg/s {concurrent:8.0f} msg/s")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
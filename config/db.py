@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
@@ -7,13 +8,48 @@ from models.models import Base
 # Load environment variables from the .env file
 load_dotenv()
 
-def db_connection():
+# Connection pool settings, shared by every session in this worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+_engine = None
+_session_factory = None
+
+
+def _pool_options(db_url):
+    """
+    Returns the QueuePool sizing options for a database URL.
+
+    SQLite picks its own pool class and rejects these options.
     """
-    Establishes a database connection using SQLAlchemy.
+    if make_url(db_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def get_engine():
+    """
+    Returns the process-wide SQLAlchemy engine, creating it on first use.
+
+    The engine owns a QueuePool sized by the DB_POOL_* environment variables,
+    so connections are reused across requests instead of being opened per call.
+    The schema is created once, when the engine is built.
 
     Returns:
-        A SQLAlchemy session object.
+        The shared SQLAlchemy engine.
     """
+    global _engine
+    if _engine is not None:
+        return _engine
+
     # Retrieve database connection details from environment variables
     db_url = os.getenv("DB_URL")
 
@@ -21,25 +57,72 @@ def db_connection():
     if not db_url:
         raise ValueError("Database URL is not set in environment variables.")
 
-    # Build the connection URL for SQLAlchemy
-    connection_url = db_url
-
     try:
         # Create an SQLAlchemy engine
-        engine = create_engine(connection_url)
+        engine = create_engine(db_url, pool_pre_ping=DB_POOL_PRE_PING, **_pool_options(db_url))
 
         # Create the base
         Base.metadata.create_all(bind=engine)
-
-        # Create a session factory
-        Session = sessionmaker(bind=engine)
-
-        # Create and return a session
-        session = Session()
-        return session
-
     except Exception as e:
         # Handle connection errors (e.g., log the error, raise an exception)
         print(f"Failed to establish a database connection: {e}")
         raise
 
+    _engine = engine
+    return _engine
+
+
+def get_session_factory():
+    """
+    Returns the process-wide session factory bound to the shared engine.
+
+    Returns:
+        A SQLAlchemy sessionmaker.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(bind=get_engine())
+    return _session_factory
+
+
+def dispose_engine():
+    """
+    Closes every pooled connection and forgets the shared engine.
+
+    Call this after forking a worker or on application shutdown.
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+
+def db_connection():
+    """
+    Opens a session on the shared engine.
+
+    The caller owns the session and must close it; request handlers should
+    depend on get_db instead.
+
+    Returns:
+        A SQLAlchemy session object.
+    """
+    return get_session_factory()()
+
+
+def get_db():
+    """
+    FastAPI dependency that yields a session and always closes it.
+
+    Checking out a session only borrows a connection from the pool; closing
+    it hands the connection back.
+
+    Yields:
+        A SQLAlchemy session object.
+    """
+    db = db_connection()
+    try:
+        yield db
+    finally:
+        db.close()
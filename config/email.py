@@ -1,7 +1,8 @@
-from fastapi_mail import FastMail, ConnectionConfig
+from fastapi_mail import ConnectionConfig
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from utils.smtp_pool import PooledFastMail
 
 load_dotenv()
 
@@ -21,5 +22,5 @@ email_conf = ConnectionConfig(
     TEMPLATE_FOLDER = BASE_DIR / 'email_templates'
 )
 
-
-fastmail = FastMail(email_conf)
+# Sends over a pool of long-lived SMTP sessions (see SMTP_POOL_* settings)
+fastmail = PooledFastMail(email_conf)
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from models.models import EmailOutbox
+
+# Columns the sender needs to deliver a claimed message
+OUTBOX_DELIVERY_COLUMNS = (
+    EmailOutbox.id,
+    EmailOutbox.recipient,
+    EmailOutbox.subject,
+    EmailOutbox.template_name,
+    EmailOutbox.template_body,
+    EmailOutbox.attempts,
+)
+
+# Longest last_error kept, so one verbose relay reply cannot bloat the table
+MAX_ERROR_LENGTH = 1000
+
+
+def utcnow() -> datetime:
+    """The current UTC time as a naive datetime, matching the outbox columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EmailOutboxCRUD:
+    """Handles the email outbox: queuing messages, claiming due ones and recording delivery."""
+
+    def enqueue(
+        self, db: Session, recipient: str, subject: str, template_name: str,
+        template_body: dict, commit: bool = True
+    ) -> EmailOutbox:
+        """
+        Queues an email for the background sender.
+
+        Pass commit=False to queue the email in the caller's transaction, so it
+        is only sent if the change that caused it is committed.
+
+        Args:
+            db: The database session.
+            recipient: The address to send to.
+            subject: The subject line.
+            template_name: The template in email_templates/ to render.
+            template_body: The template variables. Must be JSON serialisable.
+            commit: Whether to commit the session.
+
+        Returns:
+            The queued outbox row.
+        """
+        message = EmailOutbox(
+            recipient=recipient,
+            subject=subject,
+            template_name=template_name,
+            template_body=template_body,
+            status="pending",
+            attempts=0,
+            next_attempt_at=utcnow(),
+        )
+        db.add(message)
+        if commit:
+            db.commit()
+        return message
+
+    def claim_due(self, db: Session, batch_size: int, lease: timedelta) -> List[Row]:
+        """
+        Claims up to batch_size due messages for delivery.
+
+        Claimed messages are leased by pushing their next attempt into the
+        future, so other workers skip them, and a message whose sender dies is
+        retried once the lease runs out. On PostgreSQL, rows locked by another
+        worker's claim are skipped rather than waited for.
+
+        Args:
+            db: The database session.
+            batch_size: The most messages to claim.
+            lease: How long the claim lasts.
+
+        Returns:
+            The claimed messages projected onto OUTBOX_DELIVERY_COLUMNS, oldest first.
+        """
+        now = utcnow()
+        statement = (
+            select(*OUTBOX_DELIVERY_COLUMNS)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = db.execute(statement).all()
+        if messages:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([message.id for message in messages]))
+                .values(next_attempt_at=now + lease)
+            )
+        db.commit()
+        return messages
+
+    def mark_sent(self, db: Session, message_ids: Sequence[int]) -> None:
+        """
+        Records that messages were delivered.
+
+        Args:
+            db: The database session.
+            message_ids: The IDs of the delivered messages.
+        """
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(message_ids))
+            .values(status="sent", attempts=EmailOutbox.attempts + 1, sent_at=utcnow(), last_error=None)
+        )
+        db.commit()
+
+    def mark_failed(self, db: Session, message_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        """
+        Records a failed delivery attempt.
+
+        Args:
+            db: The database session.
+            message_id: The ID of the message.
+            error: A description of the failure.
+            retry_at: When to try again, or None to give up and mark the message dead.
+        """
+        values = {
+            "attempts": EmailOutbox.attempts + 1,
+            "last_error": error[:MAX_ERROR_LENGTH],
+        }
+        if retry_at is None:
+            values["status"] = "dead"
+        else:
+            values["next_attempt_at"] = retry_at
+        db.execute(update(EmailOutbox).where(EmailOutbox.id == message_id).values(**values))
+        db.commit()
+
+# Create an instance of EmailOutboxCRUD
+email_outbox_crud = EmailOutboxCRUD()
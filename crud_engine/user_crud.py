@@ -1,18 +1,109 @@
-from typing import Optional, List  
+from datetime import datetime
+from typing import Iterator, Optional, List, Sequence, Tuple
+from sqlalchemy import Select, insert, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from crud_engine.user_events import mark_user_changed
+from crud_engine.user_loader import clear_user_loader, get_user_loader
 from models.models import User  
 from models.schemas.user_schemas import CreateUserSchema
 
+# Column attributes a caller may update, read from the mapper once
+USER_COLUMN_FIELDS = frozenset(User.__mapper__.columns.keys())
+
+# Columns returned by profile reads and updates
+USER_PROFILE_COLUMNS = (
+    User.id,
+    User.role,
+    User.name,
+    User.email,
+    User.profile_url,
+    User.business_url,
+    User.is_email_verified,
+)
+
+# Columns returned by the registration insert
+REGISTERED_USER_COLUMNS = (
+    User.id,
+    User.email,
+    User.name,
+)
+
+# Columns returned by the admin onboarded-clients listing
+ONBOARDED_CLIENT_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.business_url,
+    User.updated_at,
+)
+
+# Columns a user export may contain: everything but the password hash and the secret tokens
+USER_EXPORT_COLUMNS = tuple(
+    column for column in User.__table__.columns
+    if column.name != "password" and not column.name.endswith("_token")
+)
+
+
+def validate_update_fields(fields: dict) -> None:
+    """
+    Checks that every field to update is a mapped column of User.
+
+    Raises:
+        ValueError: If a field is not a User column.
+    """
+    for key in fields:
+        if key not in USER_COLUMN_FIELDS:
+            raise ValueError(f"Invalid field: {key}")
+
+
+def is_duplicate_email(error: IntegrityError) -> bool:
+    """
+    Tells whether an IntegrityError was raised by the unique constraint on users.email.
+
+    Args:
+        error: The error raised by the failed statement.
+
+    Returns:
+        True if another user already has the email.
+    """
+    message = str(error.orig).lower()
+    return "email" in message and ("unique" in message or "duplicate" in message)
+
+
+def onboarded_clients_page_statement(limit: int, after: Optional[Tuple[datetime, int]] = None) -> Select:
+    """
+    Builds the keyset query for one page of onboarded clients.
+
+    Rows are ordered by (updated_at, id) and the page starts strictly after
+    the given position, so every page is an index range scan on
+    ix_users_role_is_onboarded_updated_at_id however deep it is.
+
+    Args:
+        limit: The most rows to return.
+        after: The (updated_at, id) of the last row of the previous page.
+    """
+    statement = select(*ONBOARDED_CLIENT_COLUMNS).where(
+        User.role == "client",
+        User.is_onboarded == True
+    )
+    if after is not None:
+        statement = statement.where(tuple_(User.updated_at, User.id) > tuple_(*after))
+    return statement.order_by(User.updated_at, User.id).limit(limit)
+
 
 class UserCRUD:
     """Handles create, read, update, and delete (CRUD) operations for users."""
 
-    def create_user(self, db: Session, user_create: CreateUserSchema) -> User:
+    def create_user(self, db: Session, user_create: CreateUserSchema, commit: bool = True) -> User:
         """Creates a new user in the database.
 
         Args:
             db: The database session.
             user_create: A UserCreate schema instance containing user data.
+            commit: Whether to commit. With False the user is only flushed, so its
+                ID is known but the caller's transaction stays open.
 
         Returns:
             The newly created user object.
@@ -20,14 +111,54 @@ class UserCRUD:
         user_data = user_create.model_dump()
         user = User(**user_data)
         db.add(user)
+        db.flush()
+        # Caches hear about the new ID, which they may have cached as missing, on commit
+        mark_user_changed(db, user.id)
+        if not commit:
+            # Later lookups in this transaction see the new user, not an earlier miss
+            get_user_loader(db).prime(user)
+            return user
         db.commit()
         db.refresh(user)
         return user
     
 
+    def create_user_returning(self, db: Session, values: dict, commit: bool = True) -> Row:
+        """
+        Creates a user with a single INSERT ... RETURNING statement.
+
+        Unlike create_user, no ORM object is built and nothing is refreshed,
+        and a taken email is left to the unique constraint instead of being
+        looked up first, so the insert costs one round trip and two concurrent
+        sign-ups cannot both get the same email.
+
+        Args:
+            db: The database session.
+            values: The user's column values. Columns left out get their defaults.
+            commit: Whether to commit, or leave the transaction open for the caller.
+
+        Returns:
+            The new user, projected onto REGISTERED_USER_COLUMNS.
+
+        Raises:
+            ValueError: If a field is not a user column.
+            IntegrityError: If the email is taken (see is_duplicate_email). The
+                caller must roll the session back.
+        """
+        validate_update_fields(values)
+        row = db.execute(insert(User).values(**values).returning(*REGISTERED_USER_COLUMNS)).one()
+        # Caches hear about the new ID, which they may have cached as missing, on commit
+        mark_user_changed(db, row.id)
+        if commit:
+            db.commit()
+        return row
+
     def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
         """Gets a user by their email from the database.
 
+        The lookup goes through the session's UserLoader, so the same email
+        is queried at most once per transaction.
+
         Args:
             db: The database session.
             email: The email of the user to retrieve.
@@ -35,11 +166,14 @@ class UserCRUD:
         Returns:
             The user object if found, None otherwise.
         """
-        return db.query(User).filter(User.email == email).first()
+        return get_user_loader(db).by_email(email)
 
     def get_user_by_id(self, db: Session, user_id: int) -> Optional[User]:
         """Gets a user by their ID from the database.
 
+        The lookup goes through the session's UserLoader, so the same ID
+        is queried at most once per transaction.
+
         Args:
             db: The database session.
             user_id: The ID of the user to retrieve.
@@ -47,7 +181,25 @@ class UserCRUD:
         Returns:
             The user object if found, None otherwise.
         """
-        return db.query(User).filter(User.id == user_id).first()
+        return get_user_loader(db).by_id(user_id)
+
+    def get_users_by_ids(self, db: Session, user_ids: Sequence[int]) -> List[Row]:
+        """
+        Gets several users in one query, projected onto USER_PROFILE_COLUMNS.
+
+        Args:
+            db: The database session.
+            user_ids: The IDs of the users to retrieve. Duplicates are allowed.
+
+        Returns:
+            The rows of the users found, in no particular order. IDs that match
+            no user are simply absent.
+        """
+        if not user_ids:
+            return []
+        return db.execute(
+            select(*USER_PROFILE_COLUMNS).where(User.id.in_(set(user_ids)))
+        ).all()
 
     def get_user_by_code(self, db: Session, code: str, code_type: str) -> Optional[User]:
         """
@@ -88,16 +240,58 @@ class UserCRUD:
         if not user:
             raise ValueError("User not found.")
 
+        # Ensure the user model has every attribute before touching the object
+        validate_update_fields(kwargs)
+
         # Update the fields in the user object
         for key, value in kwargs.items():
-            if hasattr(user, key):  # Ensure the user model has the attribute
-                setattr(user, key, value)
-            else:
-                raise ValueError(f"Invalid field: {key}")
+            setattr(user, key, value)
 
+        mark_user_changed(db, user_id)
         db.commit()
         db.refresh(user)
         return user
+
+    def update_user_returning(
+        self, db: Session, user_id: int, columns: Optional[Sequence] = None, commit: bool = True, **kwargs
+    ) -> Optional[Row]:
+        """
+        Updates a user with a single UPDATE ... RETURNING statement.
+
+        Unlike update_user, the row is not loaded first and not refreshed
+        afterwards, so the update costs one round trip.
+
+        Args:
+            db: The database session.
+            user_id: The ID of the user to update.
+            columns: The columns to return. Defaults to USER_PROFILE_COLUMNS.
+            commit: Whether to commit, or leave the transaction open for the caller.
+            **kwargs: The fields to update and their new values.
+
+        Returns:
+            The updated row projected onto columns, or None if no user has this ID.
+
+        Raises:
+            ValueError: If no fields are given or a field is not a user column.
+        """
+        if not kwargs:
+            raise ValueError("No fields provided for update.")
+        validate_update_fields(kwargs)
+
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**kwargs)
+            .returning(*(columns or USER_PROFILE_COLUMNS))
+        )
+        row = db.execute(statement).first()
+        # Users memoized before the update may now be stale
+        clear_user_loader(db)
+        if row is not None:
+            mark_user_changed(db, user_id)
+        if commit:
+            db.commit()
+        return row
     
     def get_onboarded_clients(self, db: Session) -> List[User]:
         """Gets all clients who have uploaded their business certificates."""
@@ -106,5 +300,52 @@ class UserCRUD:
             User.is_onboarded == True
         ).all()
 
+    def get_onboarded_clients_page(
+        self, db: Session, limit: int, after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """
+        Gets one page of onboarded clients, projected onto ONBOARDED_CLIENT_COLUMNS.
+
+        Args:
+            db: The database session.
+            limit: The most clients to return.
+            after: The (updated_at, id) of the last client of the previous page.
+
+        Returns:
+            The clients ordered by (updated_at, id).
+        """
+        return db.execute(onboarded_clients_page_statement(limit, after)).all()
+
+    def stream_users(
+        self, db: Session, batch_size: int = 1000, role: Optional[str] = None,
+        is_onboarded: Optional[bool] = None, is_approved: Optional[bool] = None
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Streams users, projected onto USER_EXPORT_COLUMNS, in batches.
+
+        Rows are fetched batch_size at a time through a server-side cursor
+        where the driver supports one, so memory use does not grow with the
+        table. The session must stay open until the iterator is exhausted.
+
+        Args:
+            db: The database session.
+            batch_size: The rows fetched and yielded at a time.
+            role: Only users with this role.
+            is_onboarded: Only users with this onboarding state.
+            is_approved: Only users with this approval state.
+
+        Returns:
+            An iterator of row batches, ordered by ID.
+        """
+        statement = select(*USER_EXPORT_COLUMNS)
+        if role is not None:
+            statement = statement.where(User.role == role)
+        if is_onboarded is not None:
+            statement = statement.where(User.is_onboarded == is_onboarded)
+        if is_approved is not None:
+            statement = statement.where(User.is_approved == is_approved)
+        statement = statement.order_by(User.id).execution_options(yield_per=batch_size)
+        return db.execute(statement).partitions()
+
 # Create an instance of UserCRUD
 crud = UserCRUD()
@@ -0,0 +1,68 @@
+import logging
+from typing import Callable, Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Key of the IDs of the users changed in the session's transaction, in Session.info
+CHANGED_USER_IDS_KEY = "changed_user_ids"
+
+# Called with the IDs of the users changed by each committed transaction
+_listeners: list = []
+
+
+def mark_user_changed(session: Session, user_id: int):
+    """
+    Records that a user was created or updated in the session's transaction.
+
+    Listeners hear about the user once the transaction commits; a rollback
+    forgets it.
+
+    Args:
+        session (Session): The session that wrote the user.
+        user_id (int): The ID of the user.
+    """
+    session.info.setdefault(CHANGED_USER_IDS_KEY, set()).add(user_id)
+
+
+def on_users_changed(listener: Callable[[Iterable[int]], None]):
+    """
+    Registers a callable to run with the IDs of the users each commit changed.
+
+    Listeners run in the committing thread, right after the commit, and must
+    be quick. An exception in one is logged and does not reach the caller.
+
+    Args:
+        listener (callable): Takes an iterable of user IDs.
+
+    Returns:
+        The listener, so this can be used as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def remove_users_changed_listener(listener: Callable[[Iterable[int]], None]):
+    """Unregisters a listener added with on_users_changed."""
+    _listeners.remove(listener)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_users(session):
+    """Hands the users changed by the committed transaction to every listener."""
+    user_ids = session.info.pop(CHANGED_USER_IDS_KEY, None)
+    if not user_ids:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(user_ids)
+        except Exception:
+            logger.exception("User change listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session, previous_transaction):
+    """Forgets the changes of a transaction that was rolled back."""
+    if previous_transaction.parent is None:
+        session.info.pop(CHANGED_USER_IDS_KEY, None)
@@ -0,0 +1,96 @@
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models.models import User
+
+# Key of the loader in Session.info
+USER_LOADER_KEY = "user_loader"
+
+# Marks a lookup that has not been made yet, as opposed to one that found nobody
+_MISSING = object()
+
+
+class UserLoader:
+    """
+    Memoizes the users loaded through one session, by ID and by email.
+
+    A request holds one session, so the loader lives as long as the request:
+    the first lookup of a user queries the database and later lookups of the
+    same ID or email, including lookups that found nobody, are answered from
+    memory. The memo is dropped whenever the session's transaction ends and
+    whenever a user is updated, so it never outlives the data it was read from.
+    """
+    def __init__(self, session: Session):
+        """
+        Initializes a UserLoader for a session.
+
+        Args:
+            session (Session): The session that runs the lookups.
+        """
+        self.session = session
+        self._by_id = {}
+        self._by_email = {}
+
+    def by_id(self, user_id: int) -> Optional[User]:
+        """Returns the user with this ID, querying only on the first lookup."""
+        user = self._by_id.get(user_id, _MISSING)
+        if user is _MISSING:
+            user = self.session.execute(select(User).where(User.id == user_id).limit(1)).scalars().first()
+            self._remember(user, user_id=user_id)
+        return user
+
+    def by_email(self, email: str) -> Optional[User]:
+        """Returns the user with this email, querying only on the first lookup."""
+        user = self._by_email.get(email, _MISSING)
+        if user is _MISSING:
+            user = self.session.execute(select(User).where(User.email == email).limit(1)).scalars().first()
+            self._remember(user, email=email)
+        return user
+
+    def prime(self, user: User):
+        """Remembers a user the caller already holds, such as one just created."""
+        self._remember(user)
+
+    def clear(self):
+        """Forgets every user, found or not."""
+        self._by_id.clear()
+        self._by_email.clear()
+
+    def _remember(self, user: Optional[User], user_id: Optional[int] = None, email: Optional[str] = None):
+        """Stores a lookup result under the key it was asked for and, when found, under both keys."""
+        if user is not None:
+            user_id, email = user.id, user.email
+        if user_id is not None:
+            self._by_id[user_id] = user
+        if email is not None:
+            self._by_email[email] = user
+
+
+def get_user_loader(session: Session) -> UserLoader:
+    """
+    Returns the session's user loader, creating it on first use.
+
+    Args:
+        session (Session): The database session.
+
+    Returns:
+        UserLoader: The loader shared by everything that uses this session.
+    """
+    loader = session.info.get(USER_LOADER_KEY)
+    if loader is None:
+        loader = session.info[USER_LOADER_KEY] = UserLoader(session)
+    return loader
+
+
+def clear_user_loader(session: Session):
+    """Forgets the users memoized by the session's loader, if it has one."""
+    loader = session.info.get(USER_LOADER_KEY)
+    if loader is not None:
+        loader.clear()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_at_transaction_end(session, transaction):
+    """Drops the memo with the transaction it was read in; commits expire the rows anyway."""
+    if transaction.parent is None:
+        clear_user_loader(session)
@@ -1,20 +1,23 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from config.db import db_connection
-from crud_engine.user_crud import UserCRUD
+from config.db import get_db
+from crud_engine.user_crud import UserCRUD, is_duplicate_email
 from logic.auth.utils import generate_verification_code_alphanumeric
 from models.schemas.login_user_schema import LoginUserSchemas
 from models.schemas.user_schemas import CreateUserSchema
 from validator.user_validator import UserValidator
-from passlib.context import CryptContext
 from dotenv import load_dotenv
 import os
 from jose import jwt
 from fastapi import status
-from fastapi_mail import MessageSchema, MessageType
-from config.email import fastmail
+from crud_engine.email_outbox_crud import email_outbox_crud
+from logic.email.outbox_worker import outbox_worker
 from utils.opt import generate_otp, generate_otp_expiry
+from utils.password_hasher import password_hasher
+from utils.server_timing import timed
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,32 +25,71 @@ load_dotenv()
 # Create an instance of the CRUD class
 crud = UserCRUD()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-user_validator = UserValidator(crud=crud, pwd_context=pwd_context)
+user_validator = UserValidator(crud=crud, password_hasher=password_hasher)
 token_secret = os.getenv("TOKEN_SECRET")
 # Access environment variables
 SECRET_KEY = os.getenv("SECRET_KEY", token_secret)
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-async def register_new_user(user_data: CreateUserSchema, session: Session = Depends(db_connection)):
+def _store_new_user(session: Session, user_values: dict, verification_code: str):
     """
-    Register a new user and send verification code immediately.
+    Inserts a user and queues its verification email in one transaction.
+
+    Runs in a worker thread, so the queries never block the event loop.
+
+    Returns:
+        Row: The id, email and name of the new user.
+
+    Raises:
+        HTTPException: 400 if the email is already registered.
     """
+    # Create user, leaving the transaction open for the email
     try:
-        # Validate user data for duplication
-        user_validator.validate_for_duplicate_user(session, email=user_data.email)
+        user = crud.create_user_returning(session, user_values, commit=False)
+    except IntegrityError as e:
+        session.rollback()
+        if is_duplicate_email(e):
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+        raise
+
+    # Queue verification email in the same transaction
+    email_outbox_crud.enqueue(
+        session,
+        recipient=user.email,
+        subject="Verify Your Email",
+        template_name="verification_email.html",
+        template_body={
+            "name": user.name,
+            "code": verification_code
+        },
+        commit=False
+    )
+    session.commit()
+    return user
+
+async def register_new_user(user_data: CreateUserSchema, session: Session = Depends(get_db)):
+    """
+    Register a new user and queue the verification email.
 
+    The user is written with one INSERT ... RETURNING, and a taken email is
+    reported by the unique constraint rather than a lookup beforehand. The
+    user and the email are committed together in a worker thread, and the
+    outbox worker sends the email after the response, so neither the
+    database nor SMTP latency holds up the event loop.
+    """
+    try:
         # Generate verification code
         verification_code = generate_otp()  # This will generate a 6-digit code
         expiry_time = generate_otp_expiry()
 
-        # Hash the password
-        hashed_password = pwd_context.hash(user_data.password)
+        # Hash the password in the hashing executor
+        with timed("bcrypt"):
+            hashed_password = await password_hasher.hash(user_data.password)
         
-        # Update the user_data with verification details
-        user_data_dict = user_data.model_dump()
-        user_data_dict.update({
+        # Add the verification details to the already validated payload
+        user_values = user_data.model_dump(exclude_none=True)
+        user_values.update({
             "password": hashed_password,
             "verify_user_token": verification_code,
             "verify_user_token_expiry": expiry_time,
@@ -57,24 +99,8 @@ async def register_new_user(user_data: CreateUserSchema, session: Session = Depe
             "is_approved": False
         })
 
-        # Create user
-        user = crud.create_user(session, CreateUserSchema(**user_data_dict))
-
-        # Send verification email
-        message = MessageSchema(
-            subject="Verify Your Email",
-            recipients=[user.email],
-            template_body={
-                "name": user.name,
-                "code": verification_code
-            },
-            subtype=MessageType.html
-        )
-
-        await fastmail.send_message(
-            message, 
-            template_name="verification_email.html"
-        )
+        user = await asyncio.to_thread(_store_new_user, session, user_values, verification_code)
+        outbox_worker.wake()
 
         return {
             "message": "Registration successful. Please check your email for verification code.",
@@ -109,12 +135,13 @@ def create_access_token(data: dict, role: str):
     # Add expiration and role to the payload
     to_encode.update({"exp": expire, "role": role})
     
-    encoded_jwt = jwt.encode(to_encode, str(SECRET_KEY), algorithm=ALGORITHM)
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(to_encode, str(SECRET_KEY), algorithm=ALGORITHM)
     return encoded_jwt
 
 
 
-async def login_user(user_data: LoginUserSchemas, session: Session = Depends(db_connection)):
+async def login_user(user_data: LoginUserSchemas, session: Session = Depends(get_db)):
     """
     Login a user, validate credentials, and create an access token.
 
@@ -127,7 +154,7 @@ async def login_user(user_data: LoginUserSchemas, session: Session = Depends(db_
     """
     try:
         # Validate user credentials
-        user = user_validator.validate_user_credentials(session, email=user_data.email, password=user_data.password)
+        user = await user_validator.validate_user_credentials(session, email=user_data.email, password=user_data.password)
 
         # Create an access token with the user's email and role
         access_token = create_access_token(data={"sub": user.email}, role=str(user.role))
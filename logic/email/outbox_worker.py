@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from dotenv import load_dotenv
+from fastapi_mail import MessageSchema, MessageType
+from jinja2 import TemplateError
+from config.db import get_session_factory
+from crud_engine.email_outbox_crud import email_outbox_crud, utcnow
+from utils.email_templates import email_templates
+from utils.server_timing import SERVER_TIMING_LOG, collect_timings, log_timings, timed
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Outbox sender settings, per worker process
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 20))
+EMAIL_OUTBOX_CONCURRENCY = int(os.getenv("EMAIL_OUTBOX_CONCURRENCY", 4))
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", 5))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 8))
+EMAIL_OUTBOX_BACKOFF_BASE = float(os.getenv("EMAIL_OUTBOX_BACKOFF_BASE", 30))
+EMAIL_OUTBOX_BACKOFF_MAX = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", 3600))
+EMAIL_OUTBOX_LEASE = float(os.getenv("EMAIL_OUTBOX_LEASE", 300))
+
+
+def backoff_delay(attempts: int, base: float, maximum: float) -> float:
+    """
+    Seconds to wait before retrying a message that has failed attempts times.
+
+    The delay doubles with every failure, starting at base, up to maximum.
+    """
+    return min(maximum, base * 2 ** (attempts - 1))
+
+
+class OutboxWorker:
+    """
+    Delivers the email outbox from a background asyncio task.
+
+    Request handlers queue messages with EmailOutboxCRUD.enqueue in their own
+    transaction and return without waiting for SMTP. The worker claims due
+    messages in batches, sends them a few at a time, and records the result:
+    delivered messages become 'sent', failed ones are retried with
+    exponential backoff, and messages still failing after max_attempts become
+    'dead' for an operator to inspect. A message whose template fails to
+    render is marked dead at once, since retrying cannot fix it. The worker
+    polls every poll_interval seconds, and wake() starts a batch immediately.
+
+    Messages are rendered from the precompiled templates and handed to the
+    mailer as a finished subject and HTML body.
+
+    Args:
+        mailer (FastMail, optional): Sends the messages. Defaults to config.email.fastmail.
+        session_factory (callable, optional): Creates database sessions.
+            Defaults to the shared factory from config.db.
+        templates (EmailTemplates, optional): Renders the messages.
+            Defaults to utils.email_templates.email_templates.
+        batch_size (int): The most messages claimed at once.
+        concurrency (int): The most messages sent at once.
+        poll_interval (float): Seconds between checks for due messages.
+        max_attempts (int): Delivery attempts before a message is marked dead.
+        backoff_base (float): Seconds before the first retry.
+        backoff_max (float): The longest wait between retries.
+        lease (float): Seconds a claimed message stays hidden from other workers.
+    """
+
+    def __init__(self, mailer=None, session_factory=None, templates=None, batch_size: int = EMAIL_OUTBOX_BATCH_SIZE,
+                 concurrency: int = EMAIL_OUTBOX_CONCURRENCY, poll_interval: float = EMAIL_OUTBOX_POLL_INTERVAL,
+                 max_attempts: int = EMAIL_OUTBOX_MAX_ATTEMPTS, backoff_base: float = EMAIL_OUTBOX_BACKOFF_BASE,
+                 backoff_max: float = EMAIL_OUTBOX_BACKOFF_MAX, lease: float = EMAIL_OUTBOX_LEASE):
+        self.mailer = mailer
+        self.session_factory = session_factory
+        self.templates = templates or email_templates
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = timedelta(seconds=lease)
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+
+    def start(self):
+        """Starts the worker task on the running event loop."""
+        if self._task is not None:
+            return
+        if self.mailer is None:
+            # Imported here so the mail settings are only required by a running sender
+            from config.email import fastmail
+            self.mailer = fastmail
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self.run())
+
+    def wake(self):
+        """Asks the worker to check for due messages now. Safe to call from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def stop(self):
+        """
+        Stops the worker task and closes the mailer's connections.
+
+        Messages being sent are claimed again after their lease.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        if hasattr(self.mailer, "close"):
+            await self.mailer.close()
+
+    async def run(self):
+        """Delivers due messages until cancelled."""
+        while True:
+            try:
+                claimed = await self._timed_drain() if SERVER_TIMING_LOG else await self.drain_once()
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                claimed = 0
+            # A full batch suggests more are waiting
+            if claimed == self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Claims one batch of due messages, sends it and records the results.
+
+        Returns:
+            int: The number of messages claimed.
+        """
+        messages = await asyncio.to_thread(self._claim)
+        if not messages:
+            return 0
+
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(message):
+            rendered = self.templates.render(message.template_name, message.template_body, message.subject)
+            async with limit:
+                with timed("smtp"):
+                    await self.mailer.send_message(
+                        MessageSchema(
+                            subject=rendered.subject,
+                            recipients=[message.recipient],
+                            body=rendered.html,
+                            subtype=MessageType.html,
+                        )
+                    )
+
+        results = await asyncio.gather(*(deliver(message) for message in messages), return_exceptions=True)
+        await asyncio.to_thread(self._record, messages, results)
+        return len(messages)
+
+    async def _timed_drain(self) -> int:
+        """Drains one batch and logs its database and SMTP time, as requests are logged."""
+        with collect_timings() as timings:
+            claimed = await self.drain_once()
+        if claimed:
+            log_timings("email outbox batch", timings, messages=claimed)
+        return claimed
+
+    def _session(self):
+        factory = self.session_factory or get_session_factory()
+        return factory()
+
+    def _claim(self):
+        with self._session() as db:
+            return email_outbox_crud.claim_due(db, self.batch_size, self.lease)
+
+    def _record(self, messages, results):
+        sent = [message.id for message, result in zip(messages, results) if result is None]
+        with self._session() as db:
+            if sent:
+                email_outbox_crud.mark_sent(db, sent)
+            for message, result in zip(messages, results):
+                if result is None:
+                    continue
+                attempts = message.attempts + 1
+                if attempts >= self.max_attempts or isinstance(result, TemplateError):
+                    retry_at = None
+                    logger.error("Email %s to %s is dead after %s attempts: %s", message.id, message.recipient, attempts, result)
+                else:
+                    retry_at = utcnow() + timedelta(seconds=backoff_delay(attempts, self.backoff_base, self.backoff_max))
+                    logger.warning("Email %s to %s failed, attempt %s: %s", message.id, message.recipient, attempts, result)
+                email_outbox_crud.mark_failed(db, message.id, repr(result), retry_at)
+
+# The sender shared by this worker process
+outbox_worker = OutboxWorker()
@@ -0,0 +1,172 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+import orjson
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from config.db import get_session_factory
+from crud_engine.user_crud import crud
+from utils.broadcaster import Broadcaster
+from utils.singleflight import singleflight
+
+load_dotenv()
+
+# Seconds of silence after which a comment line keeps proxies from closing the stream
+REVIEW_STREAM_KEEPALIVE = float(os.getenv("REVIEW_STREAM_KEEPALIVE", 15))
+# Clients per snapshot event
+REVIEW_STREAM_SNAPSHOT_PAGE = int(os.getenv("REVIEW_STREAM_SNAPSHOT_PAGE", 500))
+# Milliseconds a disconnected browser waits before reconnecting
+REVIEW_STREAM_RETRY_MS = int(os.getenv("REVIEW_STREAM_RETRY_MS", 3000))
+
+# Certificate review events of this worker process, already encoded as SSE messages
+review_queue_events = Broadcaster()
+
+# Counts the uploads and reviews committed by this worker; part of the listing's singleflight key
+_review_queue_generation = 0
+
+
+def mark_review_queue_changed():
+    """
+    Records that an upload or review changed the review queue.
+
+    Call it after the change commits. Listing reads that start afterwards
+    no longer join a read that began before the change, which would return
+    the old page and its ETag.
+    """
+    global _review_queue_generation
+    _review_queue_generation += 1
+
+
+def onboarded_client(row) -> dict:
+    """
+    Builds one entry of the review queue from a row of ONBOARDED_CLIENT_COLUMNS.
+
+    Args:
+        row: A row with id, name, email, business_url and updated_at.
+
+    Returns:
+        dict: The client as the onboarded-clients listing shows it.
+    """
+    return {
+        "user_id": row.id,
+        "name": row.name,
+        "email": row.email,
+        "business_url": row.business_url,
+        "onboarded_at": row.updated_at
+    }
+
+
+def format_event(event: str, data) -> bytes:
+    """Encodes one server-sent event with a JSON data line."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def publish_client_onboarded(row):
+    """
+    Tells the connected review queues that a client uploaded a business certificate.
+
+    Args:
+        row: The client, as a row of ONBOARDED_CLIENT_COLUMNS.
+    """
+    review_queue_events.publish(format_event("client_onboarded", onboarded_client(row)))
+
+
+def publish_client_reviewed(user_id: int, approved: bool, reason: Optional[str] = None):
+    """
+    Tells the connected review queues that a client's certificate was reviewed.
+
+    Args:
+        user_id (int): The ID of the client.
+        approved (bool): Whether the certificate was approved.
+        reason (str, optional): Why it was rejected.
+    """
+    review_queue_events.publish(format_event(
+        "client_reviewed", {"user_id": user_id, "approved": approved, "reason": reason}
+    ))
+
+
+def _read_onboarded_clients_page(bind, limit: int, after):
+    """Reads one page of onboarded clients, as a tuple of rows, in a session of its own."""
+    with Session(bind) as db:
+        return tuple(crud.get_onboarded_clients_page(db, limit, after))
+
+
+async def load_onboarded_clients_page(
+    session: Session, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> tuple:
+    """
+    Reads one page of onboarded clients in a worker thread.
+
+    Concurrent requests for the same page share one query, as when many
+    admin dashboards refresh at once. The review queue generation is part
+    of the key, so a request made after an upload or review never joins a
+    read that started before it. The page is read in a session of its own,
+    since the shared read may outlive the request that started it.
+
+    Args:
+        session (Session): The database session, whose engine the read uses.
+        limit (int): The most clients to return.
+        after (tuple, optional): The (updated_at, id) of the last client of the previous page.
+
+    Returns:
+        tuple: Immutable rows of ONBOARDED_CLIENT_COLUMNS, ordered by (updated_at, id).
+    """
+    return await singleflight.do(
+        ("onboarded_clients_page", limit, after, _review_queue_generation),
+        asyncio.to_thread, _read_onboarded_clients_page, session.get_bind(), limit, after
+    )
+
+
+def _load_snapshot_page(session_factory, after):
+    """Reads one page of onboarded clients in its own short-lived session."""
+    with session_factory() as db:
+        return crud.get_onboarded_clients_page(db, REVIEW_STREAM_SNAPSHOT_PAGE, after)
+
+
+async def stream_review_queue(session_factory=None, keepalive: float = REVIEW_STREAM_KEEPALIVE) -> AsyncIterator[bytes]:
+    """
+    Streams the certificate review queue as server-sent events.
+
+    The current queue is sent first, as snapshot events of up to
+    REVIEW_STREAM_SNAPSHOT_PAGE clients, the last one with complete set to
+    true. Then every client_onboarded and client_reviewed event published
+    by this worker follows, with a keepalive comment after each quiet
+    period. Events are encoded once when published, so a connected stream
+    does no work between changes. A stream that falls too far behind gets
+    a resync event and ends; the browser reconnects and starts over from a
+    new snapshot.
+
+    Args:
+        session_factory (callable, optional): Creates the database sessions for the
+            snapshot. Defaults to the shared factory from config.db.
+        keepalive (float): Seconds of silence before a keepalive comment.
+
+    Yields:
+        bytes: Encoded server-sent events.
+    """
+    session_factory = session_factory or get_session_factory()
+    # Subscribe before reading the snapshot so no change made meanwhile is missed;
+    # a client can arrive twice, and the later event wins
+    with review_queue_events.subscribe() as subscription:
+        yield f"retry: {REVIEW_STREAM_RETRY_MS}\n\n".encode()
+
+        after = None
+        while True:
+            rows = await asyncio.to_thread(_load_snapshot_page, session_factory, after)
+            complete = len(rows) < REVIEW_STREAM_SNAPSHOT_PAGE
+            yield format_event("snapshot", {"clients": [onboarded_client(row) for row in rows], "complete": complete})
+            if complete:
+                break
+            after = (rows[-1].updated_at, rows[-1].id)
+
+        while True:
+            try:
+                event = await subscription.get(keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                yield format_event("resync", {})
+                return
+            yield event
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator
+from config.db import get_session_factory
+from crud_engine.user_crud import USER_EXPORT_COLUMNS, crud
+
+# Names of the exported fields, in column order
+EXPORT_FIELDS = [column.name for column in USER_EXPORT_COLUMNS]
+
+
+def _json_default(value):
+    """Serializes the datetimes json cannot."""
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_ndjson(batches) -> Iterator[bytes]:
+    """Encodes row batches as newline-delimited JSON, one chunk per batch."""
+    dumps = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+    for rows in batches:
+        yield "".join(dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows).encode()
+
+
+def encode_csv(batches) -> Iterator[bytes]:
+    """Encodes row batches as CSV with a header line, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # An empty export still gets its header
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# Export formats: media type, file extension and encoder
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson", encode_ndjson),
+    "csv": ("text/csv; charset=utf-8", "csv", encode_csv),
+}
+
+
+def export_users(export_format: str, batch_size: int = 1000, session_factory=None, **filters) -> Iterator[bytes]:
+    """
+    Streams the users table as NDJSON or CSV.
+
+    The session is opened when iteration starts and closed when it ends, so
+    the generator can outlive the request handler that created it, as a
+    StreamingResponse body does. Only USER_EXPORT_COLUMNS are exported.
+
+    Args:
+        export_format (str): "ndjson" or "csv".
+        batch_size (int): The rows fetched and encoded at a time.
+        session_factory (callable, optional): Creates the database session.
+            Defaults to the shared factory from config.db.
+        **filters: role, is_onboarded and is_approved, as for UserCRUD.stream_users.
+
+    Yields:
+        bytes: One encoded chunk per batch of rows.
+
+    Raises:
+        ValueError: If export_format is not supported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    encode = EXPORT_FORMATS[export_format][2]
+
+    def generate():
+        with (session_factory or get_session_factory())() as db:
+            yield from encode(crud.stream_users(db, batch_size=batch_size, **filters))
+
+    return generate()
@@ -1,56 +1,123 @@
+import asyncio
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
-from config.db import db_connection
-from crud_engine.user_crud import UserCRUD  
+from config.db import get_db
+from crud_engine.user_crud import UserCRUD, USER_PROFILE_COLUMNS
+from crud_engine.user_events import on_users_changed
+from models.models import User
 import logging
 from logic.auth.utils import generate_verification_code_alphanumeric
 from validator.user_validator import UserValidator
+from utils.password_hasher import password_hasher
+from utils.etag import weak_etag
+from utils.profile_cache import PROFILE_MISS, CachedProfile, profile_cache
+from utils.singleflight import singleflight
 
 crud = UserCRUD()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-user_validator = UserValidator(crud=crud, pwd_context=pwd_context)
+user_validator = UserValidator(crud=crud, password_hasher=password_hasher)
+
+# Drop cached profiles once a change to their user commits
+on_users_changed(profile_cache.invalidate)
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-async def get_user_data_by_id(user_id: int, session: Session):
+def build_user_profile(user) -> dict:
+    """
+    Builds the profile response from a User object or a row of USER_PROFILE_COLUMNS.
+
+    Args:
+        user: A User object or a row with the profile columns.
+
+    Returns:
+        dict: The user profile fields exposed by the API.
+    """
+    return {
+        "user_id": user.id,
+        "user_role": user.role,
+        "user_name": user.name,
+        "email": user.email,
+        "profile_picture": user.profile_url,
+        "business_url": user.business_url,
+        "is_verified": user.is_email_verified,
+    }
+
+def build_profile_etag(user) -> str:
+    """
+    Builds the weak ETag of a user's profile, which changes whenever the user row does.
+
+    Args:
+        user: A User object or a row with id and updated_at.
+
+    Returns:
+        str: The weak ETag.
+    """
+    return weak_etag(user.id, user.updated_at.isoformat())
+
+def _read_user_profile(bind, user_id: int):
+    """
+    Reads a user's profile in a short-lived session of its own.
+
+    The shared read may outlive the request that started it, so it cannot
+    use that request's session; only the finished CachedProfile leaves it.
+    """
+    with Session(bind) as db:
+        user = crud.get_user_by_id(db, user_id)
+        return CachedProfile(build_user_profile(user), build_profile_etag(user)) if user else None
+
+async def load_user_profile(user_id: int, session: Session) -> CachedProfile:
     """
-    Retrieves user data based on the provided user ID.
+    Returns a user's profile and its ETag, from profile_cache when possible.
+
+    Profiles, and IDs that match no user, are served from profile_cache.
+    On a miss the database is read in a worker thread, and concurrent
+    requests for the same profile share that one read. The cache
+    generation is part of the key, so a request arriving after a change
+    never joins a read that started before it.
 
     Args:
-        user_id (int): The ID of the user to retrieve data for.
+        user_id (int): The ID of the user.
+        session (Session): The database session, whose engine the read uses.
+
+    Returns:
+        CachedProfile: The profile, which must not be mutated, and its ETag.
+
+    Raises:
+        HTTPException: If the user does not exist.
+    """
+    cached = profile_cache.get(user_id)
+    if cached is PROFILE_MISS:
+        generation = profile_cache.generation
+        cached = await singleflight.do(
+            ("user_profile", user_id, generation),
+            asyncio.to_thread, _read_user_profile, session.get_bind(), user_id
+        )
+        profile_cache.set(user_id, cached, generation)
+
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
+    return cached
+
+async def get_users_data_by_ids(user_ids: list, session: Session):
+    """
+    Retrieves the profiles of several users with a single query.
+
+    Args:
+        user_ids (list): The IDs of the users to retrieve.
         session (Session): The database session.
 
     Returns:
-        dict: The user data if the user exists.
+        dict: Each requested ID mapped to its profile, or to None if no user has that ID.
 
     Raises:
         HTTPException: If there's an error retrieving the user data.
     """
     try:
+        rows = await asyncio.to_thread(crud.get_users_by_ids, session, user_ids)
+        profiles = {row.id: build_user_profile(row) for row in rows}
+        return {user_id: profiles.get(user_id) for user_id in user_ids}
 
-        user = user_validator.validate_user_exists(session, user_id)
-        
-        # Create a dictionary with only the required fields
-        user_data = {
-            "user_id": user.id,
-            "user_role": user.role,
-            "user_name": user.name,
-            "email": user.email,
-            "profile_picture": user.profile_url,
-            "business_url": user.business_url,
-            "is_verified": user.is_email_verified,
-        }
-
-        # Return the user data
-        return user_data
-
-    except HTTPException as e:
-        # Log and re-raise HTTPException if it occurs during validation
-        logger.error(f"HTTPException: {e.detail}")
-        raise e
     except Exception as ex:
         # Log unexpected exceptions for debugging
         logger.error(f"Unexpected error: {ex}", exc_info=True)
@@ -67,43 +134,39 @@ async def update_user_data(user_id: int, update_data: dict, session: Session):
         user_id (int): The ID of the user to update.
         update_data (dict): A dictionary containing the fields to update.
         session (Session): The database session.
-        validator (UserValidator): An instance of UserValidator for validation.
 
     Returns:
         dict: The updated user data if the update is successful.
 
     Raises:
-        HTTPException: If there's an error during the update.
+        HTTPException: If the user does not exist, a field is invalid, or the update fails.
     """
     try:
-        # Validate if the user exists using UserValidator
-        _ = user_validator.validate_user_exists(session, user_id)
-
-        # Update the user with the provided data
-        updated_user = UserCRUD.update_user(
-            db=session,
-            user_id=user_id,
+        # Update the user and read back the profile columns in one statement, in a worker thread
+        updated_user = await asyncio.to_thread(
+            crud.update_user_returning,
+            session,
+            user_id,
+            columns=USER_PROFILE_COLUMNS,
             **update_data  # Unpack the update_data dictionary
         )
+        if updated_user is None:
+            raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
 
-        # Create a dictionary with only the required fields for response
-        updated_user_data = {
-            "user_id": updated_user.id,
-            "user_role": updated_user.role,
-            "user_name": updated_user.name,
-            "email": updated_user.email,
-            "profile_picture": updated_user.profile_url,
-            "business_url": updated_user.business_url,
-            "is_verified": updated_user.is_email_verified,
-        }
-
-        # Return the updated user data
-        return updated_user_data
+        # Return a dictionary with only the required fields for response
+        return build_user_profile(updated_user)
 
     except HTTPException as e:
         # Log and re-raise HTTPException if it occurs during validation
         logger.error(f"HTTPException: {e.detail}")
         raise e
+    except ValueError as ve:
+        # Unknown fields or an empty update are client errors
+        logger.error(f"Invalid update: {ve}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
     except Exception as ex:
         # Log unexpected exceptions for debugging
         logger.error(f"Unexpected error: {ex}", exc_info=True)
@@ -114,7 +177,7 @@ async def update_user_data(user_id: int, update_data: dict, session: Session):
 
 
 
-def send_code_to_verify_email(email: str, session: Session = Depends(db_connection)):
+def send_code_to_verify_email(email: str, session: Session = Depends(get_db)):
     """
     Send a verification code to the user's email.
 
@@ -144,7 +207,7 @@ def send_code_to_verify_email(email: str, session: Session = Depends(db_connecti
 
     # Update the user with the verification code
     update_data = {"verify_user_token": code}
-    _ = crud.update_user(session, user_id=user_id, **update_data)
+    _ = crud.update_user_returning(session, user_id, columns=(User.id,), **update_data)
 
     # Return a success message
     return {"message": "Verification code sent successfully."}
@@ -1,12 +1,50 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from routes.api.v1.auth.auth_routes import auth_router
 from rate_limiter.rate_limiter import RateLimiterMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from middleware.server_timing import ServerTimingMiddleware
+from rate_limiter.key_functions import client_ip
+from rate_limiter.backends.shared_memory import SharedMemoryBackend
 from routes.api.v1.users.user_routes import user_data_router
+from config.db import dispose_engine
+from crud_engine.user_events import on_users_changed
+from logic.email.outbox_worker import outbox_worker
+from utils.email_templates import email_templates
+from utils.invalidation_bus import invalidation_bus
+from utils.password_hasher import password_hasher
+from utils.profile_cache import profile_cache
+from utils.server_timing import SERVER_TIMING_HEADER, SERVER_TIMING_LOG
 
-# Initialize FastAPI app
-app = FastAPI(title="MK Solutions", docs_url="/")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the email templates once, before the first message
+    email_templates.warm()
+    # Deliver queued emails in the background
+    outbox_worker.start()
+    # Evict the profiles other workers change, and tell them about ours
+    await invalidation_bus.start()
+    if not invalidation_bus.connected:
+        # Profiles other workers change would be served stale until they expire
+        profile_cache.disable()
+    yield
+    # Release worker-level resources on shutdown
+    await invalidation_bus.stop()
+    await outbox_worker.stop()
+    password_hasher.shutdown()
+    dispose_engine()
+    # Unmap the shared rate-limit table and close its file
+    if rate_limit_backend is not None:
+        rate_limit_backend.close()
+
+# Share user changes committed by this worker with the others
+on_users_changed(invalidation_bus.publish_users_changed)
+invalidation_bus.subscribe(profile_cache.invalidate)
+
+# Initialize FastAPI app; responses are serialized by their response_model, then orjson
+app = FastAPI(title="MK Solutions", docs_url="/", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -20,7 +58,19 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api/v1", tags=["Auth"])
 app.include_router(user_data_router, prefix="/api/v1", tags=["User"])
 
-# Add the RateLimiterMiddleware
-# Add rate limiter middleware
-rate_limiter_middleware = RateLimiterMiddleware(capacity=100, refill_rate=1.0)
-app.add_middleware(BaseHTTPMiddleware,dispatch=rate_limiter_middleware)
+# Share rate limits between the workers on this host when a table path is configured
+RATE_LIMIT_SHARED_PATH = os.getenv("RATE_LIMIT_SHARED_PATH")
+rate_limit_backend = (
+    SharedMemoryBackend(RATE_LIMIT_SHARED_PATH, capacity=100, refill_rate=1.0)
+    if RATE_LIMIT_SHARED_PATH else None
+)
+
+# Add the RateLimiterMiddleware as a plain ASGI middleware
+app.add_middleware(
+    RateLimiterMiddleware, capacity=100, refill_rate=1.0, key_func=client_ip, backend=rate_limit_backend
+)
+
+# Time the database, bcrypt, JWT and SMTP work of every request when the header or the log is switched on.
+# Added last, so it is the outermost middleware and the total covers the rate limiter too.
+if SERVER_TIMING_HEADER or SERVER_TIMING_LOG:
+    app.add_middleware(ServerTimingMiddleware, header=SERVER_TIMING_HEADER, log=SERVER_TIMING_LOG)
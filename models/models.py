@@ -1,11 +1,43 @@
-from sqlalchemy import Boolean, String, Integer, DateTime, Text, func
+from sqlalchemy import JSON, Boolean, String, Integer, DateTime, Text, Index, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class precise_now(FunctionElement):
+    """
+    now() for users.updated_at, which the onboarded-clients keyset cursor compares against.
+
+    On SQLite, CURRENT_TIMESTAMP has no fractional seconds and is not in the
+    text format SQLAlchemy stores datetimes in, so its values compare wrongly
+    against bound cursor datetimes. There this renders the storage format
+    instead; every other database gets plain now(). Other columns keep
+    func.now().
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _precise_now(element, compiler, **kw):
+    return compiler.process(func.now(), **kw)
+
+
+@compiles(precise_now, "sqlite")
+def _precise_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
 
 class Base(DeclarativeBase):
     pass
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Serves the admin onboarded-clients listing (role = 'client' AND is_onboarded),
+        # paginated in (updated_at, id) order
+        Index("ix_users_role_is_onboarded_updated_at_id", "role", "is_onboarded", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -13,10 +45,10 @@ class User(Base):
     phone: Mapped[str | None] = mapped_column(String, nullable=True)
     role: Mapped[str | None] = mapped_column(String, nullable=True)
     password: Mapped[str] = mapped_column(String, nullable=False)
-    forget_password_token: Mapped[str | None] = mapped_column(String, nullable=True)
+    forget_password_token: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
     forget_password_token_expiry: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     forget_password_token_used: Mapped[bool] = mapped_column(Boolean, default=False)
-    verify_user_token: Mapped[str | None] = mapped_column(String, nullable=True)
+    verify_user_token: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
     verify_user_token_expiry: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     verify_user_token_used: Mapped[bool] = mapped_column(Boolean, default=False)
     is_email_verified: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -26,5 +58,26 @@ class User(Base):
     is_onboarded: Mapped[bool] = mapped_column(Boolean, default=False)
     is_approved: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now(), nullable=False)
-    updated_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, default=precise_now(), onupdate=precise_now(), nullable=False)
+
 
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Serves the sender's due-message query (status = 'pending' AND next_attempt_at <= now)
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recipient: Mapped[str] = mapped_column(String, nullable=False)
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    template_name: Mapped[str] = mapped_column(String, nullable=False)
+    template_body: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # pending until delivered ('sent') or out of attempts ('dead')
+    status: Mapped[str] = mapped_column(String, default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    sent_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 class VerifyEmailRequest(BaseModel):
     email: EmailStr = Field(..., description="Email address to verify")
@@ -41,4 +42,32 @@ class BusinessCertificateReview(BaseModel):
                 "reason": "Certificate is not clearly legible"
             }
         }
-    )
\ No newline at end of file
+    )
+
+
+class MessageOut(BaseModel):
+    message: str = Field(..., description="What the request did")
+
+class RegisterOut(BaseModel):
+    message: str = Field(..., description="What the request did")
+    user_id: int = Field(..., description="The ID of the new user")
+    email: str = Field(..., description="The email address the verification code was sent to")
+
+class LoginOut(BaseModel):
+    token_type: str = Field(..., description="Always bearer")
+    access_token: str = Field(..., description="The JWT to send as a bearer token")
+    user_id: int = Field(..., description="The ID of the user")
+    email: str = Field(..., description="The email address of the user")
+    user_role: Optional[str] = Field(None, description="The role of the user")
+    is_email_verified: Optional[bool] = Field(None, description="Whether the user has verified their email")
+
+class OnboardedClientOut(BaseModel):
+    user_id: int = Field(..., description="The ID of the client")
+    name: str = Field(..., description="The full name of the client")
+    email: str = Field(..., description="The email address of the client")
+    business_url: Optional[str] = Field(None, description="URL of the uploaded business certificate")
+    onboarded_at: datetime = Field(..., description="When the client last updated their onboarding")
+
+class OnboardedClientsPageOut(BaseModel):
+    clients: List[OnboardedClientOut] = Field(..., description="One page of clients, oldest update first")
+    next_cursor: Optional[str] = Field(None, description="Pass as after to get the next page; null on the last page")
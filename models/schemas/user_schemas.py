@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, HttpUrl, Field, ConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -44,3 +44,49 @@ class CreateUserSchema(BaseModel):
         }
     )
 
+
+# Most user IDs one batch lookup may ask for
+MAX_BATCH_USER_IDS = 100
+
+class UserBatchLookupSchema(BaseModel):
+    user_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_USER_IDS,
+        description="The IDs of the users to look up"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "user_ids": [1, 2, 3]
+            }
+        }
+    )
+
+
+class UserProfileOut(BaseModel):
+    user_id: int = Field(..., description="The ID of the user")
+    user_role: Optional[str] = Field(None, description="The role of the user")
+    user_name: str = Field(..., description="The full name of the user")
+    email: str = Field(..., description="The email address of the user")
+    profile_picture: Optional[str] = Field(None, description="The profile picture URL of the user")
+    business_url: Optional[str] = Field(None, description="The business certificate URL of the user")
+    is_verified: Optional[bool] = Field(None, description="Whether the user has verified their email")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "user_id": 1,
+                "user_role": "client",
+                "user_name": "Alice Green",
+                "email": "alicegreen@example.com",
+                "profile_picture": "https://example.com/profile/alice-green",
+                "business_url": None,
+                "is_verified": True
+            }
+        }
+    )
+
+# Each requested user ID mapped to its profile, or to null if no user has that ID
+UserBatchOut = Dict[int, Optional[UserProfileOut]]
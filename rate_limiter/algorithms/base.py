@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+
+
+class RateLimitAlgorithm(ABC):
+  """
+  Interface shared by the rate limiting algorithms.
+
+  One instance holds the rate-limit state of a single key. All algorithms
+  admit a burst of up to capacity requests and a sustained rate of
+  refill_rate requests per second.
+
+  Attributes:
+      capacity (int): The largest burst admitted at once.
+      refill_rate (float): The sustained rate, in requests per second.
+
+  Methods:
+      consume(self, amount: int, now: float=None) -> bool:
+          Attempts to admit amount requests. Returns True if successful, False otherwise.
+      remaining(self, now: float=None) -> int:
+          The number of requests that would be admitted right now.
+      retry_after(self, amount: int=1, now: float=None) -> float:
+          Seconds until amount requests would be admitted.
+      reset_after(self, now: float=None) -> float:
+          Seconds until the full capacity is available again.
+  """
+
+  __slots__ = ()
+
+  @abstractmethod
+  def consume(self, amount, now=None):
+    """Attempts to admit amount requests. Returns True if successful, False otherwise."""
+
+  @abstractmethod
+  def remaining(self, now=None):
+    """The number of requests that would be admitted right now."""
+
+  @abstractmethod
+  def retry_after(self, amount=1, now=None):
+    """Seconds until amount requests would be admitted, 0.0 if they would be now."""
+
+  @abstractmethod
+  def reset_after(self, now=None):
+    """Seconds until the full capacity is available again."""
@@ -0,0 +1,107 @@
+from time import time
+from rate_limiter.algorithms.base import RateLimitAlgorithm
+
+
+def gcra_update(tat, now, amount, emission_interval, burst_tolerance):
+  """
+  Applies one GCRA decision to a theoretical arrival time.
+
+  Args:
+      tat (float): The stored theoretical arrival time, 0.0 for a new key.
+      now (float): The current timestamp.
+      amount (int): The number of requests to admit.
+      emission_interval (float): Seconds between requests at the sustained rate.
+      burst_tolerance (float): How far ahead of now the arrival time may run.
+
+  Returns:
+      tuple: (allowed, new_tat). new_tat equals tat when the request is refused.
+  """
+  new_tat = max(tat, now) + amount * emission_interval
+  if new_tat - burst_tolerance > now:
+    return False, tat
+  return True, new_tat
+
+
+def gcra_limits(tat, now, amount, capacity, emission_interval):
+  """
+  Derives the rate-limit figures reported to clients from a theoretical arrival time.
+
+  Args:
+      tat (float): The stored theoretical arrival time.
+      now (float): The current timestamp.
+      amount (int): The number of requests the client wants admitted.
+      capacity (int): The largest burst admitted at once.
+      emission_interval (float): Seconds between requests at the sustained rate.
+
+  Returns:
+      tuple: (remaining, retry_after, reset_after), the requests admissible now
+      and the seconds until amount requests and the full capacity are available.
+  """
+  used = max(0.0, tat - now) / emission_interval
+  remaining = max(0, int(capacity - used + 1e-9))
+  allow_at = max(tat, now) + amount * emission_interval - emission_interval * capacity
+  return remaining, max(0.0, allow_at - now), max(0.0, tat - now)
+
+
+class GCRA(RateLimitAlgorithm):
+  """
+  Implements the Generic Cell Rate Algorithm for rate limiting.
+
+  GCRA behaves like a token bucket, but the only per-key state is a single
+  float: the theoretical arrival time (TAT) of the next request at the
+  sustained rate. A request is admitted when admitting it would not push the
+  TAT more than capacity emission intervals ahead of now. That makes it a
+  good fit for very large key spaces and for shared storage.
+
+  Attributes:
+      capacity (int): The largest burst admitted at once.
+      refill_rate (float): The sustained rate, in requests per second.
+      tat (float): The theoretical arrival time, 0.0 for a fresh key.
+  """
+
+  __slots__ = ("capacity", "refill_rate", "tat")
+
+  def __init__(self, capacity, refill_rate):
+    self.capacity = capacity
+    self.refill_rate = refill_rate
+    self.tat = 0.0
+
+  @property
+  def emission_interval(self):
+    """Seconds between requests at the sustained rate."""
+    return 1.0 / self.refill_rate
+
+  def consume(self, amount, now=None):
+    """
+    Attempts to admit the specified amount of requests.
+
+    Args:
+        amount (int): The number of requests to admit.
+        now (float, optional): The current timestamp. Defaults to the current time.
+
+    Returns:
+        bool: True if successful, False otherwise.
+    """
+    if now is None:
+      now = time()
+    interval = self.emission_interval
+    allowed, self.tat = gcra_update(self.tat, now, amount, interval, interval * self.capacity)
+    return allowed
+
+  def remaining(self, now=None):
+    """The number of requests that would be admitted right now."""
+    if now is None:
+      now = time()
+    return gcra_limits(self.tat, now, 1, self.capacity, self.emission_interval)[0]
+
+  def retry_after(self, amount=1, now=None):
+    """Seconds until the specified amount of requests would be admitted."""
+    if now is None:
+      now = time()
+    return gcra_limits(self.tat, now, amount, self.capacity, self.emission_interval)[1]
+
+  def reset_after(self, now=None):
+    """Seconds until the full capacity is available again."""
+    if now is None:
+      now = time()
+    return gcra_limits(self.tat, now, 1, self.capacity, self.emission_interval)[2]
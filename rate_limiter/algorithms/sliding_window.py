@@ -0,0 +1,110 @@
+from math import floor
+from time import time
+from rate_limiter.algorithms.base import RateLimitAlgorithm
+
+
+class SlidingWindowCounter(RateLimitAlgorithm):
+  """
+  Implements the sliding window counter algorithm for rate limiting.
+
+  Time is split into fixed windows of capacity / refill_rate seconds. The
+  count for the sliding window ending now is estimated as the current
+  window's count plus the previous window's count, weighted by how much of
+  the previous window still overlaps the sliding window. A request is
+  admitted while that estimate stays within capacity.
+
+  Attributes:
+      capacity (int): The most requests admitted per window.
+      refill_rate (float): The sustained rate, in requests per second.
+      window_start (float): The start of the current fixed window.
+      previous_count (int): Requests admitted in the previous window.
+      current_count (int): Requests admitted in the current window.
+  """
+
+  __slots__ = ("capacity", "refill_rate", "window_start", "previous_count", "current_count")
+
+  def __init__(self, capacity, refill_rate):
+    self.capacity = capacity
+    self.refill_rate = refill_rate
+    self.window_start = 0.0
+    self.previous_count = 0
+    self.current_count = 0
+
+  @property
+  def window(self):
+    """The length of a fixed window, in seconds."""
+    return self.capacity / self.refill_rate
+
+  def _advance(self, now):
+    """Moves the fixed windows forward to the one containing now."""
+    window = self.window
+    elapsed_windows = floor((now - self.window_start) / window)
+    if elapsed_windows <= 0:
+      return
+    self.previous_count = self.current_count if elapsed_windows == 1 else 0
+    self.current_count = 0
+    self.window_start += elapsed_windows * window
+
+  def _estimate(self, now):
+    """The estimated number of requests in the sliding window ending at now."""
+    overlap = 1.0 - (now - self.window_start) / self.window
+    return self.previous_count * overlap + self.current_count
+
+  def consume(self, amount, now=None):
+    """
+    Attempts to admit the specified amount of requests.
+
+    Args:
+        amount (int): The number of requests to admit.
+        now (float, optional): The current timestamp. Defaults to the current time.
+
+    Returns:
+        bool: True if successful, False otherwise.
+    """
+    if now is None:
+      now = time()
+    self._advance(now)
+    if self._estimate(now) + amount > self.capacity:
+      return False
+    self.current_count += amount
+    return True
+
+  def remaining(self, now=None):
+    """The number of requests that would be admitted right now."""
+    if now is None:
+      now = time()
+    self._advance(now)
+    return max(0, floor(self.capacity - self._estimate(now) + 1e-9))
+
+  def retry_after(self, amount=1, now=None):
+    """Seconds until the specified amount of requests would be admitted."""
+    if now is None:
+      now = time()
+    self._advance(now)
+    if self._estimate(now) + amount <= self.capacity:
+      return 0.0
+
+    window = self.window
+    window_end = self.window_start + window
+    room = self.capacity - self.current_count - amount
+    if room >= 0:
+      # The previous window's weight decays enough before this window ends
+      overlap_needed = room / self.previous_count
+      return max(0.0, window_end - window * overlap_needed - now)
+
+    # Wait for the next window, where the current count becomes the decaying one
+    room = self.capacity - amount
+    overlap_needed = room / self.current_count if self.current_count else 1.0
+    return max(0.0, window_end + window * (1.0 - overlap_needed) - now)
+
+  def reset_after(self, now=None):
+    """Seconds until the full capacity is available again."""
+    if now is None:
+      now = time()
+    self._advance(now)
+    window_end = self.window_start + self.window
+    if self.current_count:
+      return window_end + self.window - now
+    if self.previous_count:
+      return window_end - now
+    return 0.0
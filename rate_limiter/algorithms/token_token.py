@@ -1,6 +1,7 @@
 from time import time
+from rate_limiter.algorithms.base import RateLimitAlgorithm
 
-class TokenBucket:
+class TokenBucket(RateLimitAlgorithm):
   """
   Implements a token bucket algorithm for rate limiting.
 
@@ -19,8 +20,16 @@ class TokenBucket:
           Calculates and returns the number of available tokens based on refill rate and elapsed time.
       consume(self, amount: int, now: float=None) -> bool:
           Attempts to consume the specified amount of tokens. Returns True if successful, False otherwise.
+      remaining(self, now: float=None) -> int:
+          The number of whole tokens available.
+      retry_after(self, amount: int=1, now: float=None) -> float:
+          Seconds until the specified amount of tokens is available.
+      reset_after(self, now: float=None) -> float:
+          Seconds until the bucket is full again.
   """
 
+  __slots__ = ("capacity", "refill_rate", "last_refill_time", "current_tokens")
+
   def __init__(self, capacity, refill_rate):
     self.capacity = capacity
     self.refill_rate = refill_rate
@@ -31,6 +40,9 @@ class TokenBucket:
     """
     Calculates the number of available tokens based on current time and last refill.
 
+    The bucket refills for the whole time elapsed since the last refill, up to
+    its capacity.
+
     Args:
         now (float, optional): A timestamp to use for calculating elapsed time.
                                 Defaults to the current time.
@@ -40,8 +52,8 @@ class TokenBucket:
     """
     if now is None:
       now = time()
-    elapsed_time = now - self.last_refill_time
-    refill_amount = min(elapsed_time, 1) * self.refill_rate
+    elapsed_time = max(0.0, now - self.last_refill_time)
+    refill_amount = elapsed_time * self.refill_rate
     self.current_tokens = min(self.capacity, self.current_tokens + refill_amount)
     self.last_refill_time = now
     return self.current_tokens
@@ -67,3 +79,45 @@ class TokenBucket:
     else:
       return False
 
+  def remaining(self, now=None):
+    """
+    The number of whole tokens available.
+
+    Args:
+        now (float, optional): A timestamp to refill up to. Defaults to the last refill.
+
+    Returns:
+        int: The number of whole tokens available.
+    """
+    if now is not None:
+      self.get_tokens(now)
+    return int(self.current_tokens)
+
+  def retry_after(self, amount=1, now=None):
+    """
+    Seconds until the specified amount of tokens is available.
+
+    Args:
+        amount (int): The number of tokens needed.
+        now (float, optional): A timestamp to refill up to. Defaults to the last refill.
+
+    Returns:
+        float: 0.0 if the tokens are already available.
+    """
+    if now is not None:
+      self.get_tokens(now)
+    return max(0.0, (amount - self.current_tokens) / self.refill_rate)
+
+  def reset_after(self, now=None):
+    """
+    Seconds until the bucket is full again.
+
+    Args:
+        now (float, optional): A timestamp to refill up to. Defaults to the last refill.
+
+    Returns:
+        float: 0.0 if the bucket is already full.
+    """
+    if now is not None:
+      self.get_tokens(now)
+    return max(0.0, (self.capacity - self.current_tokens) / self.refill_rate)
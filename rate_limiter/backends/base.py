@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+
+class RateLimitDecision(NamedTuple):
+    """
+    The figures reported to a client whose request was refused.
+
+    Attributes:
+        remaining (int): The requests that would be admitted right now.
+        retry_after (float): Seconds until one request would be admitted.
+        reset_after (float): Seconds until the full capacity is available again.
+    """
+
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+class RateLimitBackend(ABC):
+    """
+    Interface shared by the stores of rate-limit state.
+
+    A backend owns the state of every key and decides whether a request is
+    admitted. acquire() returns None for an admitted request, so the common
+    path allocates nothing, and a RateLimitDecision for a refused one.
+    Backends that talk to a remote store implement acquire() as a coroutine
+    function; RateLimiterMiddleware awaits it in that case.
+
+    Attributes:
+        capacity (int): The largest burst admitted per key.
+        refill_rate (float): The sustained rate admitted per key (requests per second).
+    """
+
+    capacity: int
+    refill_rate: float
+
+    @abstractmethod
+    def acquire(self, key: str, now: float | None = None):
+        """
+        Attempts to admit one request for key.
+
+        Args:
+            key (str): The rate-limit key of the request.
+            now (float, optional): The current timestamp. Defaults to the current time.
+
+        Returns:
+            RateLimitDecision | None: None if the request is admitted.
+        """
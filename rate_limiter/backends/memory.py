@@ -0,0 +1,49 @@
+from time import time
+from rate_limiter.backends.base import RateLimitBackend, RateLimitDecision
+from rate_limiter.bucket_store import BucketStore
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Keeps one algorithm instance per key in the memory of this process.
+
+    This is the fastest backend, but every worker process has its own state,
+    so with N workers a client may get up to N times the configured limit.
+
+    Args:
+        algorithm (type): A RateLimitAlgorithm subclass.
+        capacity (int): The largest burst admitted per key.
+        refill_rate (float): The sustained rate admitted per key (requests per second).
+        max_keys (int): The most buckets kept in memory; the least recently used go first.
+        idle_timeout (float): Seconds before an unused bucket is dropped.
+
+    Attributes:
+        buckets (BucketStore): The per-key algorithm state.
+    """
+
+    def __init__(self, algorithm, capacity: int, refill_rate: float, max_keys: int, idle_timeout: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.buckets = BucketStore(
+            lambda: algorithm(capacity, refill_rate),
+            max_keys=max_keys,
+            idle_timeout=idle_timeout,
+        )
+
+    def acquire(self, key: str, now: float | None = None):
+        """
+        Attempts to admit one request for key.
+
+        Args:
+            key (str): The rate-limit key of the request.
+            now (float, optional): The current timestamp. Defaults to the current time.
+
+        Returns:
+            RateLimitDecision | None: None if the request is admitted.
+        """
+        if now is None:
+            now = time()
+        bucket = self.buckets.get(key)
+        if bucket.consume(1, now):
+            return None
+        return RateLimitDecision(bucket.remaining(now), bucket.retry_after(1, now), bucket.reset_after(now))
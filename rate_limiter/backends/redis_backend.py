@@ -0,0 +1,104 @@
+from time import time
+from rate_limiter.algorithms.gcra import gcra_limits, gcra_update
+from rate_limiter.backends.base import RateLimitBackend, RateLimitDecision
+
+# Runs one GCRA decision atomically inside Redis. The key holds the theoretical
+# arrival time and expires once it has passed, since a missing key means a full burst.
+GCRA_SCRIPT = """
+local tat = tonumber(redis.call('GET', KEYS[1])) or 0
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local new_tat = math.max(tat, now) + interval
+if new_tat - burst > now then
+  return {0, string.format('%.6f', tat)}
+end
+redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, string.format('%.6f', new_tat)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Keeps GCRA state in Redis, shared by every worker on every host.
+
+    Each decision is one EVALSHA round trip, so prefer SharedMemoryBackend
+    when all workers run on one host. Any client exposing an asyncio
+    register_script(), such as redis.asyncio.Redis, works; FakeRedis stands
+    in for tests.
+
+    Args:
+        client: An asyncio Redis client.
+        capacity (int): The largest burst admitted per key.
+        refill_rate (float): The sustained rate admitted per key (requests per second).
+        prefix (str): Prepended to every rate-limit key in Redis.
+
+    Usage Example:
+        ```python
+        from redis.asyncio import Redis
+
+        backend = RedisBackend(Redis.from_url("redis://localhost:6379/0"), capacity=100, refill_rate=1.0)
+        app.add_middleware(RateLimiterMiddleware, backend=backend)
+        ```
+    """
+
+    def __init__(self, client, capacity: int, refill_rate: float, prefix: str = "ratelimit:"):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.prefix = prefix
+        self.emission_interval = 1.0 / refill_rate
+        self.burst_tolerance = self.emission_interval * capacity
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    async def acquire(self, key: str, now: float | None = None):
+        """
+        Attempts to admit one request for key.
+
+        Args:
+            key (str): The rate-limit key of the request.
+            now (float, optional): The current timestamp. Defaults to the current time.
+
+        Returns:
+            RateLimitDecision | None: None if the request is admitted.
+        """
+        if now is None:
+            now = time()
+        allowed, tat = await self._script(
+            keys=[self.prefix + key],
+            args=[repr(now), repr(self.emission_interval), repr(self.burst_tolerance)],
+        )
+        if int(allowed):
+            return None
+        return RateLimitDecision(*gcra_limits(float(tat), now, 1, self.capacity, self.emission_interval))
+
+
+class FakeRedis:
+    """
+    In-process stand-in for an asyncio Redis client that only runs GCRA_SCRIPT.
+
+    Several RedisBackend instances sharing one FakeRedis behave like workers
+    sharing one Redis server.
+
+    Attributes:
+        values (dict): Maps each Redis key to its (arrival time, expiry) pair.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def register_script(self, script: str):
+        """Returns a callable running script, which must be GCRA_SCRIPT."""
+        if script != GCRA_SCRIPT:
+            raise ValueError("FakeRedis can only run GCRA_SCRIPT")
+        return self._run_gcra
+
+    async def _run_gcra(self, keys, args):
+        """Mirrors GCRA_SCRIPT, including its string replies."""
+        now, interval, burst = (float(arg) for arg in args)
+        tat, expires_at = self.values.get(keys[0], (0.0, 0.0))
+        if expires_at <= now:
+            tat = 0.0
+        allowed, new_tat = gcra_update(tat, now, 1, interval, burst)
+        if allowed:
+            self.values[keys[0]] = (new_tat, new_tat)
+        return [int(allowed), f"{new_tat:.6f}".encode()]
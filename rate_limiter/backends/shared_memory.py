@@ -0,0 +1,146 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from hashlib import blake2b
+from time import time
+from rate_limiter.algorithms.gcra import gcra_limits, gcra_update
+from rate_limiter.backends.base import RateLimitBackend, RateLimitDecision
+
+# File header: magic, number of stripes, slots per stripe
+HEADER = struct.Struct("<8sII")
+MAGIC = b"MKRLSHM1"
+
+# One slot: 64-bit key fingerprint (0 when free) and the GCRA theoretical arrival time
+SLOT = struct.Struct("<Qd")
+
+
+def key_fingerprint(key: str) -> int:
+    """
+    Hashes a rate-limit key to a non-zero 64-bit integer.
+
+    The built-in hash() is salted per process, so workers could not agree on
+    it; blake2b gives every worker the same value.
+    """
+    digest = blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """
+    Keeps GCRA state in a memory-mapped file shared by every worker on the host.
+
+    The file holds a fixed table of slots split into stripes. A key hashes to
+    one stripe, and each decision locks only that stripe's byte range with
+    fcntl.lockf, so workers contend only when their keys share a stripe. The
+    per-key state is the single float GCRA needs, updated in place, so a
+    decision costs two system calls and no network round trip.
+
+    When every slot of a stripe is taken, a new key reuses the slot whose
+    arrival time is earliest. Slots whose arrival time has passed describe a
+    full bucket, so reusing them loses nothing; only when a stripe holds more
+    active keys than slots does one of them start over with a full burst.
+
+    Every worker must open the same path with the same capacity, refill rate
+    and layout. Put the file on a tmpfs such as /dev/shm so it never touches
+    the disk.
+
+    Args:
+        path (str): The file holding the table. Created if missing.
+        capacity (int): The largest burst admitted per key.
+        refill_rate (float): The sustained rate admitted per key (requests per second).
+        stripes (int): The number of independently locked stripes.
+        slots_per_stripe (int): The keys each stripe can hold.
+
+    Raises:
+        ValueError: If the file exists with a different layout.
+
+    Usage Example:
+        ```python
+        backend = SharedMemoryBackend("/dev/shm/mk_rate_limit", capacity=100, refill_rate=1.0)
+        app.add_middleware(RateLimiterMiddleware, backend=backend)
+        ```
+    """
+
+    def __init__(self, path: str, capacity: int, refill_rate: float,
+                 stripes: int = 8192, slots_per_stripe: int = 16):
+        self.path = path
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.stripes = stripes
+        self.slots_per_stripe = slots_per_stripe
+        self.emission_interval = 1.0 / refill_rate
+        self.burst_tolerance = self.emission_interval * capacity
+        self._stripe_bytes = SLOT.size * slots_per_stripe
+        size = HEADER.size + self._stripe_bytes * stripes
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._initialise(size)
+            self._map = mmap.mmap(self._fd, size)
+        except Exception:
+            os.close(self._fd)
+            raise
+        # fcntl locks belong to the process, so threads of one worker need their own lock
+        self._thread_lock = threading.Lock()
+
+    def _initialise(self, size: int):
+        """Sizes and stamps a new file, or checks the layout of an existing one."""
+        header = HEADER.pack(MAGIC, self.stripes, self.slots_per_stripe)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            elif os.pread(self._fd, HEADER.size, 0) != header or os.fstat(self._fd).st_size != size:
+                raise ValueError(f"Rate limit table {self.path} was created with a different layout")
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, fingerprint: int, offset: int):
+        """Returns (slot offset, arrival time) for the key, or the slot to give it."""
+        table = self._map
+        victim, victim_tat = offset, float("inf")
+        for slot in range(offset, offset + self._stripe_bytes, SLOT.size):
+            slot_fingerprint, tat = SLOT.unpack_from(table, slot)
+            if slot_fingerprint == fingerprint:
+                return slot, tat
+            if tat < victim_tat:
+                victim, victim_tat = slot, tat
+        return victim, 0.0
+
+    def acquire(self, key: str, now: float | None = None):
+        """
+        Attempts to admit one request for key.
+
+        Args:
+            key (str): The rate-limit key of the request.
+            now (float, optional): The current timestamp. Defaults to the current time.
+
+        Returns:
+            RateLimitDecision | None: None if the request is admitted.
+        """
+        if now is None:
+            now = time()
+        fingerprint = key_fingerprint(key)
+        offset = HEADER.size + (fingerprint % self.stripes) * self._stripe_bytes
+
+        with self._thread_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._stripe_bytes, offset)
+            try:
+                slot, tat = self._find_slot(fingerprint, offset)
+                allowed, new_tat = gcra_update(tat, now, 1, self.emission_interval, self.burst_tolerance)
+                if allowed:
+                    SLOT.pack_into(self._map, slot, fingerprint, new_tat)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._stripe_bytes, offset)
+
+        if allowed:
+            return None
+        return RateLimitDecision(*gcra_limits(tat, now, 1, self.capacity, self.emission_interval))
+
+    def close(self):
+        """Unmaps the table. The file itself is left for the other workers."""
+        self._map.close()
+        os.close(self._fd)
@@ -0,0 +1,42 @@
+from utils.lru_cache import LRUTTLCache
+
+
+class BucketStore:
+    """
+    Holds one rate-limit bucket per key, bounded in memory.
+
+    Buckets live in an LRU cache: once max_keys is reached the least recently
+    used bucket is dropped, and a bucket that has not been used for
+    idle_timeout seconds expires. Dropping an idle bucket loses nothing as
+    long as idle_timeout is at least the time a bucket takes to refill, since
+    a new bucket starts full. Lookups are O(1).
+
+    Args:
+        bucket_factory (callable): Creates a fresh bucket for a new key.
+        max_keys (int): The most buckets kept at once.
+        idle_timeout (float): Seconds after its last use that a bucket expires.
+    """
+
+    def __init__(self, bucket_factory, max_keys: int, idle_timeout: float):
+        self.bucket_factory = bucket_factory
+        self._buckets = LRUTTLCache(max_entries=max_keys, default_ttl=idle_timeout)
+
+    def get(self, key: str):
+        """
+        Returns the bucket for key, creating it if needed, and resets its idle timer.
+
+        Args:
+            key (str): The rate-limit key of the request.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self.bucket_factory()
+        self._buckets.set(key, bucket)
+        return bucket
+
+    def stats(self) -> dict:
+        """Returns the size and counters of the underlying cache."""
+        return self._buckets.stats()
+
+    def __len__(self):
+        return len(self._buckets)
@@ -0,0 +1,65 @@
+"""
+Key functions that decide which bucket a request draws from.
+
+Each key function takes the ASGI scope of the request and returns a string.
+Requests that map to the same key share one bucket.
+"""
+from jose import JWTError
+from validator.token_validator import decode_token
+
+
+def client_ip(scope) -> str:
+    """
+    Keys requests by client IP address.
+
+    Behind a reverse proxy, run uvicorn with --proxy-headers and
+    --forwarded-allow-ips so the scope carries the real client address.
+    """
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+def jwt_subject(scope) -> str:
+    """
+    Keys requests by the sub claim of their bearer token.
+
+    The token is verified through the cached decoder, so a forged sub cannot
+    be used to spread requests over many buckets. Requests without a valid
+    token fall back to their client IP.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    subject = decode_token(token).get("sub")
+                except JWTError:
+                    break
+                if subject:
+                    return f"sub:{subject}"
+            break
+    return client_ip(scope)
+
+
+def route(scope) -> str:
+    """Keys requests by HTTP method and path, giving each endpoint its own budget."""
+    return f"route:{scope.get('method', '')} {scope.get('path', '')}"
+
+
+def combine(*key_funcs):
+    """
+    Builds a key function from several others, e.g. a budget per client per route.
+
+    Args:
+        *key_funcs: The key functions whose keys are joined.
+
+    Returns:
+        A key function returning the individual keys joined with "|".
+    """
+    if not key_funcs:
+        raise ValueError("combine() needs at least one key function.")
+
+    def combined(scope) -> str:
+        return "|".join(key_func(scope) for key_func in key_funcs)
+
+    return combined
@@ -1,49 +1,116 @@
-from fastapi import Request, HTTPException
+from inspect import iscoroutinefunction
+from math import ceil
+from rate_limiter.algorithms.gcra import GCRA
+from rate_limiter.algorithms.sliding_window import SlidingWindowCounter
 from rate_limiter.algorithms.token_token import TokenBucket
+from rate_limiter.backends.memory import MemoryBackend
+from rate_limiter.key_functions import client_ip
+
+# The 429 body never changes, so it is encoded once
+TOO_MANY_REQUESTS_BODY = b'{"detail":"Too Many Requests"}'
+
+# Algorithms selectable by name
+ALGORITHMS = {
+    "token_bucket": TokenBucket,
+    "gcra": GCRA,
+    "sliding_window": SlidingWindowCounter,
+}
 
 class RateLimiterMiddleware:
     """
-    Middleware for rate limiting requests using the Token Bucket algorithm.
+    ASGI middleware for rate limiting requests.
+
+    Every key returned by key_func gets its own bucket, so one noisy client
+    only drains its own budget. Accepted requests are passed to the app
+    untouched. Rejected requests are answered directly with a 429 carrying
+    Retry-After and X-RateLimit-Limit/Remaining/Reset headers, without
+    reaching the app.
+
+    By default the buckets live in this process. Pass a backend from
+    rate_limiter.backends to share them between workers; capacity,
+    refill_rate and the bucket options are then taken from the backend.
 
     Args:
-        capacity (int): The maximum number of tokens the bucket can hold.
-        refill_rate (float): The rate at which tokens are refilled (tokens per second).
+        app (ASGIApp): The application to protect.
+        capacity (int, optional): The largest burst admitted per key. Required without a backend.
+        refill_rate (float, optional): The sustained rate admitted per key
+            (requests per second). Required without a backend.
+        algorithm (str | type): "token_bucket", "gcra", "sliding_window", or a
+            RateLimitAlgorithm subclass. Defaults to "token_bucket".
+        key_func (callable): Maps the ASGI scope of a request to its bucket key.
+            See rate_limiter.key_functions. Defaults to the client IP.
+        max_keys (int): The most buckets kept in memory; the least recently used go first.
+        idle_timeout (float, optional): Seconds before an unused bucket is dropped.
+            Defaults to twice the time an empty bucket takes to refill, which
+            also covers the previous window of the sliding window counter.
+        backend (RateLimitBackend, optional): Where the per-key state lives.
+            Defaults to a MemoryBackend built from the arguments above.
 
     Attributes:
-        bucket (TokenBucket): An instance of the TokenBucket class representing the token bucket.
-
-    Raises:
-        HTTPException: If the rate limit is exceeded (HTTP status code 429).
+        backend (RateLimitBackend): The per-key rate-limit state.
 
     Usage Example:
         ```python
         from fastapi import FastAPI
-        from your_module import RateLimiterMiddleware
+        from rate_limiter.key_functions import combine, jwt_subject, route
 
         app = FastAPI()
-        app.add_middleware(RateLimiterMiddleware(capacity=100, refill_rate=1.0))
+        app.add_middleware(RateLimiterMiddleware, capacity=100, refill_rate=1.0, key_func=combine(jwt_subject, route))
         ```
     """
 
-    def __init__(self, capacity: int, refill_rate: float):
-        self.bucket = TokenBucket(capacity, refill_rate)
+    def __init__(self, app, capacity: int | None = None, refill_rate: float | None = None,
+                 algorithm="token_bucket", key_func=client_ip, max_keys: int = 100_000,
+                 idle_timeout: float | None = None, backend=None):
+        self.app = app
+        self.key_func = key_func
+        if backend is None:
+            if capacity is None or refill_rate is None:
+                raise ValueError("capacity and refill_rate are required without a backend")
+            if isinstance(algorithm, str):
+                if algorithm not in ALGORITHMS:
+                    raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+                algorithm = ALGORITHMS[algorithm]
+            if idle_timeout is None:
+                idle_timeout = 2 * capacity / refill_rate
+            backend = MemoryBackend(algorithm, capacity, refill_rate, max_keys, idle_timeout)
+        self.backend = backend
+        self._await_backend = iscoroutinefunction(backend.acquire)
+        # Header values shared by every 429 response
+        self._static_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(TOO_MANY_REQUESTS_BODY)).encode()),
+            (b"x-ratelimit-limit", str(backend.capacity).encode()),
+        ]
 
-    async def __call__(self, request: Request, call_next):
+    async def __call__(self, scope, receive, send):
         """
-        Middleware method that gets called for each incoming request.
+        Checks the request's bucket and either forwards the request or answers 429.
 
         Args:
-            request (Request): The incoming request object.
-            call_next (function): The function to call to proceed with handling the request.
+            scope (dict): The ASGI connection scope.
+            receive (callable): The ASGI receive channel.
+            send (callable): The ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Response: The response generated by the corresponding path operation.
+        decision = self.backend.acquire(self.key_func(scope))
+        if self._await_backend:
+            decision = await decision
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
 
-        Raises:
-            HTTPException: If the rate limit is exceeded (HTTP status code 429).
-        """
-        self.bucket.get_tokens()
-        if not self.bucket.consume(1):
-            raise HTTPException(status_code=429, detail="Too Many Requests")
-        return await call_next(request)
+        await self._reject(decision, send)
 
+    async def _reject(self, decision, send):
+        """Sends the 429 response described by the backend's RateLimitDecision."""
+        headers = self._static_headers + [
+            (b"retry-after", str(max(1, ceil(decision.retry_after))).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(ceil(decision.reset_after)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": TOO_MANY_REQUESTS_BODY})
@@ -1,29 +1,35 @@
 # routes/api/v1/auth/auth_routes.py
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from config.db import db_connection
-from logic.auth.auth_logic import login_user, register_new_user, send_code_to_verify_email
+from config.db import get_db
+from logic.auth.auth_logic import login_user, register_new_user
+from logic.users.users_logic import send_code_to_verify_email
+from logic.users.user_export import EXPORT_FORMATS, export_users
+from logic.users.review_queue import (
+    load_onboarded_clients_page, mark_review_queue_changed, onboarded_client,
+    publish_client_onboarded, publish_client_reviewed, stream_review_queue
+)
+from middleware.verify_token import verify_admin_token
 from models.schemas.login_user_schema import LoginUserSchemas
 from models.schemas.user_schemas import CreateUserSchema
 from fastapi import status
-from fastapi_mail import MessageSchema
-from config.email import fastmail
+from crud_engine.email_outbox_crud import email_outbox_crud
+from logic.email.outbox_worker import outbox_worker
 from datetime import datetime, timezone
-from crud_engine.user_crud import crud 
+from crud_engine.user_crud import ONBOARDED_CLIENT_COLUMNS, crud
+from models.models import User
 from models.schemas.auth_schemas import VerifyEmailRequest
 from models.schemas.auth_schemas import BusinessCertificateUpload 
 from models.schemas.auth_schemas import BusinessCertificateReview
+from models.schemas.auth_schemas import LoginOut, MessageOut, OnboardedClientsPageOut, RegisterOut
+from utils.etag import etag_matches, weak_etag
+from utils.pagination import decode_cursor, encode_cursor
 auth_router = APIRouter()
 
-# Dependency to get DB session
-def get_db():
-    db = db_connection()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@auth_router.post("/auth/register")
+@auth_router.post("/auth/register", response_model=RegisterOut)
 async def create_user(user_data: CreateUserSchema, session: Session = Depends(get_db)):
     """
     Create a new user.
@@ -42,7 +48,7 @@ async def create_user(user_data: CreateUserSchema, session: Session = Depends(ge
         raise e
     
 @auth_router.post("/auth/verify-email", 
-    response_model=dict,
+    response_model=MessageOut,
     status_code=status.HTTP_200_OK,
     responses={
         200: {"description": "Email verified successfully"},
@@ -50,10 +56,11 @@ async def create_user(user_data: CreateUserSchema, session: Session = Depends(ge
         404: {"description": "User not found"}
     }
 )
-async def verify_email(
+def verify_email(
     verify_data: VerifyEmailRequest,
     session: Session = Depends(get_db)
 ):
+    # A plain def, so FastAPI runs the queries in its threadpool, off the event loop
     try:
         user = crud.get_user_by_email(session, verify_data.email)
         if not user:
@@ -62,8 +69,11 @@ async def verify_email(
                 detail="User not found"
             )
 
-        # Check if code is expired
-        if datetime.now(timezone.utc) > user.verify_user_token_expiry:
+        # Check if code is expired; SQLite hands the stored UTC expiry back without its timezone
+        expiry = user.verify_user_token_expiry
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) > expiry:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Verification code has expired"
@@ -77,9 +87,10 @@ async def verify_email(
             )
 
         # Update user verification status
-        crud.update_user(
+        crud.update_user_returning(
             session,
             user.id,
+            columns=(User.id,),
             is_email_verified=True,
             verify_user_token=None,
             verify_user_token_expiry=None,
@@ -91,7 +102,7 @@ async def verify_email(
     except HTTPException as e:
         raise e
 
-@auth_router.post("/auth/login")
+@auth_router.post("/auth/login", response_model=LoginOut)
 async def login(user_data: LoginUserSchemas, session: Session = Depends(get_db)):
     """
     Login user with provided credentials.
@@ -109,22 +120,49 @@ async def login(user_data: LoginUserSchemas, session: Session = Depends(get_db))
     except HTTPException as e:
         raise e
 
-@auth_router.post("/auth/send-verify-email-code")
-async def send_verify_email_code(email:str, session:Session = Depends(get_db)):
+@auth_router.post("/auth/send-verify-email-code", response_model=MessageOut)
+def send_verify_email_code(email:str, session:Session = Depends(get_db)):
     """
     Send a verification code to the user's email.
 
+    A plain def, so FastAPI runs the queries in its threadpool, off the event loop.
+
     Args:
         email (str): The user's email address.
     """
     try:
-        await send_code_to_verify_email(email, session)
+        send_code_to_verify_email(email, session)
         return {"message": "Verification code sent successfully"}
     except HTTPException as e:
         raise e
     
+def _store_business_certificate(session: Session, user_id: int, certificate_url: str):
+    """Checks the client and stores its certificate. Runs in a worker thread."""
+    user = crud.get_user_by_id(session, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    if not user.is_email_verified:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please verify your email first"
+        )
+
+    # Update user with certificate URL and set onboarding status
+    return crud.update_user_returning(
+        session,
+        user_id,
+        columns=ONBOARDED_CLIENT_COLUMNS,
+        business_url=certificate_url,
+        is_onboarded=True,
+        is_approved=False  # Reset approval status if certificate is reuploaded
+    )
+
 @auth_router.put("/auth/upload-business-certificate/{user_id}", 
-    response_model=dict,
+    response_model=MessageOut,
     status_code=status.HTTP_200_OK,
     responses={
         200: {"description": "Business certificate uploaded successfully"},
@@ -138,27 +176,13 @@ async def upload_business_certificate(
     session: Session = Depends(get_db)
 ):
     try:
-        user = crud.get_user_by_id(session, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        if not user.is_email_verified:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Please verify your email first"
-            )
-
-        # Update user with certificate URL and set onboarding status
-        crud.update_user(
-            session,
-            user_id,
-            business_url=certificate_data.certificate_url,
-            is_onboarded=True,
-            is_approved=False  # Reset approval status if certificate is reuploaded
+        # The queries run in a worker thread; the review queue is told on the event loop
+        client = await asyncio.to_thread(
+            _store_business_certificate, session, user_id, certificate_data.certificate_url
         )
+        if client is not None:
+            mark_review_queue_changed()
+            publish_client_onboarded(client)
 
         return {"message": "Business certificate uploaded successfully"}
     except HTTPException as e:
@@ -167,32 +191,141 @@ async def upload_business_certificate(
 
 
 @auth_router.get("/auth/admin/onboarded-clients",
+    response_model=OnboardedClientsPageOut,
     responses={
         200: {"description": "List of onboarded clients retrieved successfully"},
+        304: {"description": "The page matches the If-None-Match ETag"},
+        400: {"description": "Invalid cursor"},
         403: {"description": "Not authorized"}
     }
 )
 async def get_onboarded_clients(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Clients per page"),
+    after: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
     session: Session = Depends(get_db)
 ):
+    """
+    List onboarded clients one page at a time, oldest update first.
+
+    Pass the returned next_cursor as after to get the following page;
+    next_cursor is null on the last page. The page carries a weak ETag built
+    from the ID and updated_at of its rows and from next_cursor, so it
+    changes when a listed client changes, leaves or joins the page; send it
+    back in If-None-Match to get an empty 304 Not Modified instead.
+    """
     try:
-        clients = crud.get_onboarded_clients(session)
+        try:
+            position = decode_cursor(after) if after else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        # One extra row tells whether another page follows
+        clients = await load_onboarded_clients_page(session, limit + 1, position)
+        next_cursor = None
+        if len(clients) > limit:
+            clients = clients[:limit]
+            next_cursor = encode_cursor(clients[-1].updated_at, clients[-1].id)
+
+        etag = weak_etag(next_cursor, *(f"{client.id}@{client.updated_at.isoformat()}" for client in clients))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
         return {
-            "clients": [
-                {
-                    "user_id": client.id,
-                    "name": client.name,
-                    "email": client.email,
-                    "business_url": client.business_url,
-                    "onboarded_at": client.updated_at
-                }
-                for client in clients
-            ]
+            "clients": [onboarded_client(client) for client in clients],
+            "next_cursor": next_cursor
         }
     except HTTPException as e:
         raise e
 
+@auth_router.get("/auth/admin/users/export",
+    dependencies=[Depends(verify_admin_token)],
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Users streamed as NDJSON or CSV"},
+        403: {"description": "Not authorized"}
+    }
+)
+async def export_users_dump(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    role: Optional[str] = None,
+    is_onboarded: Optional[bool] = None,
+    is_approved: Optional[bool] = None
+):
+    """
+    Stream every user matching the filters as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and written as they arrive,
+    so memory use does not depend on the table size. The password and the
+    secret tokens are never exported.
+    """
+    media_type, extension, _ = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        export_users(export_format, role=role, is_onboarded=is_onboarded, is_approved=is_approved),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{extension}"'}
+    )
+
+@auth_router.get("/auth/admin/review-queue/stream",
+    dependencies=[Depends(verify_admin_token)],
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "The review queue as server-sent events"},
+        403: {"description": "Not authorized"}
+    }
+)
+async def stream_certificate_review_queue():
+    """
+    Stream the certificate review queue as server-sent events.
+
+    The current queue arrives first as snapshot events, then each
+    client_onboarded and client_reviewed change is pushed as it happens,
+    so dashboards no longer need to poll the onboarded-clients listing.
+    Changes reach the streams connected to the worker that made them.
+    """
+    return StreamingResponse(
+        stream_review_queue(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _store_certificate_review(session: Session, review_data: BusinessCertificateReview):
+    """Records a review and queues its email in one transaction. Runs in a worker thread."""
+    # Update approval status and read back the recipient in one statement
+    user = crud.update_user_returning(
+        session,
+        review_data.user_id,
+        columns=(User.email, User.name),
+        commit=False,
+        is_approved=review_data.approved,
+        is_onboarded=review_data.approved  # Set to false if rejected
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    # Queue email notification with the review decision
+    email_outbox_crud.enqueue(
+        session,
+        recipient=user.email,
+        subject="Business Certificate Review Update",
+        template_name="certificate_review.html",
+        template_body={
+            "name": user.name,
+            "status": "approved" if review_data.approved else "rejected",
+            "reason": review_data.reason if not review_data.approved else None
+        },
+        commit=False
+    )
+    session.commit()
+
 @auth_router.post("/auth/admin/review-business-certificate",
+    response_model=MessageOut,
     responses={
         200: {"description": "Business certificate review completed"},
         404: {"description": "User not found"},
@@ -204,37 +337,11 @@ async def review_business_certificate(
     session: Session = Depends(get_db)
 ):
     try:
-        user = crud.get_user_by_id(session, review_data.user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
-        # Update approval status
-        crud.update_user(
-            session,
-            review_data.user_id,
-            is_approved=review_data.approved,
-            is_onboarded=review_data.approved  # Set to false if rejected
-        )
-
-        # Send email notification
-        message = MessageSchema(
-            subject="Business Certificate Review Update",
-            recipients=[user.email],
-            template_body={
-                "name": user.name,
-                "status": "approved" if review_data.approved else "rejected",
-                "reason": review_data.reason if not review_data.approved else None
-            },
-            subtype="html"
-        )
-
-        await fastmail.send_message(
-            message, 
-            template_name="certificate_review.html"
-        )
+        # The queries run in a worker thread; the outbox and the review queue are told on the event loop
+        await asyncio.to_thread(_store_certificate_review, session, review_data)
+        outbox_worker.wake()
+        mark_review_queue_changed()
+        publish_client_reviewed(review_data.user_id, review_data.approved, review_data.reason)
 
         return {"message": f"Business certificate {review_data.approved and 'approved' or 'rejected'}"}
     except HTTPException as e:
@@ -1,34 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from config.db import db_connection
+from config.db import get_db
 from middleware.verify_token import verify_user_token
-from logic.users.users_logic import update_user_data,get_user_data_by_id
+from logic.users.users_logic import update_user_data,load_user_profile,get_users_data_by_ids
+from models.schemas.user_schemas import UserBatchLookupSchema, UserBatchOut, UserProfileOut
+from utils.etag import etag_matches
 
 # Creating an APIRouter instance
 user_data_router = APIRouter()
 
+# Endpoint to get several user profiles at once
+@user_data_router.post("/user/data/batch", response_model=UserBatchOut, dependencies=[Depends(verify_user_token)])
+async def get_user_profiles(lookup: UserBatchLookupSchema, session: Session = Depends(get_db)):
+    """
+    Get the profile data of several users with one database query.
+
+    Args:
+        lookup (UserBatchLookupSchema): The IDs of the users.
+        session (Session): Database session.
+
+    Returns:
+        dict: Each requested ID mapped to its profile, or to null if the user does not exist.
+    """
+    try:
+        response = await get_users_data_by_ids(lookup.user_ids, session)
+        return response
+    except HTTPException as e:
+        raise e
+
 # Endpoint to get user profile
-@user_data_router.get("/user/data/{user_id}", dependencies=[Depends(verify_user_token)])
-async def get_user_profile(user_id: int, session: Session = Depends(db_connection)):
+@user_data_router.get("/user/data/{user_id}",
+    response_model=UserProfileOut,
+    dependencies=[Depends(verify_user_token)],
+    responses={304: {"description": "The profile matches the If-None-Match ETag"}}
+)
+async def get_user_profile(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    session: Session = Depends(get_db)
+):
     """
     Get user profile data based on the provided user ID and token.
 
+    The response carries a weak ETag. Send it back in If-None-Match to get
+    an empty 304 Not Modified while the profile is unchanged.
+
     Args:
         user_id (int): The ID of the user.
+        response (Response): The response, to set the ETag on.
+        if_none_match (str, optional): The ETag of the client's copy.
         session (Session): Database session.
 
     Returns:
         dict: User profile data.
     """
     try:
-        response = await get_user_data_by_id(user_id, session)
-        return response
+        profile, etag = await load_user_profile(user_id, session)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return profile
     except HTTPException as e:
         raise e
 
 # Endpoint to update user data
-@user_data_router.put("/user/data/{user_id}", dependencies=[Depends(verify_user_token)])
-async def update_user_profile(user_id: int, update_data: dict, session: Session = Depends(db_connection)):
+@user_data_router.put("/user/data/{user_id}", response_model=UserProfileOut, dependencies=[Depends(verify_user_token)])
+async def update_user_profile(user_id: int, update_data: dict, session: Session = Depends(get_db)):
     """
     Update user profile data based on the provided user ID and data.
 
@@ -0,0 +1,45 @@
+"""
+Export the users table as NDJSON or CSV.
+
+Rows are streamed from the database in batches and written as they arrive,
+so the export runs in constant memory. The password and the secret tokens
+are never exported. DB_URL selects the database, as for the app.
+
+Run from the repository root:
+    python -m scripts.export_users --format csv --role client --onboarded --output clients.csv
+"""
+import argparse
+import sys
+from logic.users.user_export import EXPORT_FORMATS, export_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson", help="output format")
+    parser.add_argument("--output", help="file to write, defaults to standard output")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched at a time")
+    parser.add_argument("--role", help="only users with this role")
+    parser.add_argument("--onboarded", dest="is_onboarded", action=argparse.BooleanOptionalAction,
+                        help="only onboarded (or, with --no-onboarded, not onboarded) users")
+    parser.add_argument("--approved", dest="is_approved", action=argparse.BooleanOptionalAction,
+                        help="only approved (or, with --no-approved, not approved) users")
+    args = parser.parse_args()
+
+    chunks = export_users(
+        args.format,
+        batch_size=args.batch_size,
+        role=args.role,
+        is_onboarded=args.is_onboarded,
+        is_approved=args.is_approved,
+    )
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
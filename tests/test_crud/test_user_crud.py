@@ -1,9 +1,11 @@
 import pytest
-from sqlalchemy import create_engine
+from datetime import datetime
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from models.models import User  # Assuming CreateUser is the model from models.py
 from models.schemas.user_schemas import CreateUserSchema
-from crud_engine.user_crud import UserCRUD
+from crud_engine.user_crud import UserCRUD, is_duplicate_email
 
 # Setting up a test database
 DATABASE_URL = "sqlite:///:memory:"  # In-memory database for testing
@@ -222,3 +224,164 @@ def test_get_user_by_code_invalid_code_type(db_session, user_crud):
     """Test getting a user with an invalid code_type."""
     with pytest.raises(ValueError, match="Invalid code_type"):
         user_crud.get_user_by_code(db_session, "somecode", "invalid_type")
+
+def test_update_user_returning(db_session, user_crud):
+    """Test that update_user_returning updates the row in a single statement."""
+    created_user = user_crud.create_user(db_session, CreateUserSchema(
+        name="Carol White",
+        email="carolwhite@example.com",
+        phone="+1234567890",
+        role="client",
+        password="password789"
+    ))
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        row = user_crud.update_user_returning(
+            db_session,
+            created_user.id,
+            columns=(User.id, User.name, User.business_url),
+            name="Carol Updated",
+            business_url="https://example.com/certificate.pdf"
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE users SET")
+    assert row.id == created_user.id
+    assert row.name == "Carol Updated"
+    assert row.business_url == "https://example.com/certificate.pdf"
+
+def test_update_user_returning_not_found(db_session, user_crud):
+    """Test that update_user_returning returns None when no user matches."""
+    assert user_crud.update_user_returning(db_session, 9999, name="Non Existent") is None
+
+def test_update_user_returning_invalid_field(db_session, user_crud):
+    """Test that update_user_returning rejects fields that are not user columns."""
+    with pytest.raises(ValueError, match="Invalid field: invalid_field"):
+        user_crud.update_user_returning(db_session, 1, invalid_field="some_value")
+    with pytest.raises(ValueError, match="No fields provided"):
+        user_crud.update_user_returning(db_session, 1)
+
+def test_get_onboarded_clients_page(db_session, user_crud):
+    """Test that keyset pages walk every onboarded client once, in (updated_at, id) order."""
+    stamps = [datetime(2026, 1, 1, 12, 0, second) for second in (5, 1, 1, 3, 1)]
+    created = []
+    for index, stamp in enumerate(stamps):
+        user = user_crud.create_user(db_session, CreateUserSchema(
+            name=f"Client {index}",
+            email=f"client{index}@paging.example.com",
+            phone="+1234567890",
+            role="client",
+            password="password123"
+        ))
+        db_session.execute(update(User).where(User.id == user.id).values(is_onboarded=True, updated_at=stamp))
+        created.append((stamp, user.id))
+    db_session.commit()
+
+    seen, after = [], None
+    while True:
+        page = user_crud.get_onboarded_clients_page(db_session, 2, after)
+        assert len(page) <= 2
+        seen.extend(page)
+        if len(page) < 2:
+            break
+        after = (page[-1].updated_at, page[-1].id)
+
+    assert set(seen[0]._fields) == {"id", "name", "email", "business_url", "updated_at"}
+    ours = [(row.updated_at, row.id) for row in seen if row.email.endswith("@paging.example.com")]
+    assert ours == sorted(created)
+    assert len({row.id for row in seen}) == len(seen)
+
+def test_onboarded_clients_page_with_database_timestamps(db_session, user_crud):
+    """Test that cursors match timestamps written by the database's now()."""
+    for index in range(3):
+        user = user_crud.create_user(db_session, CreateUserSchema(
+            name=f"Stamped {index}",
+            email=f"stamped{index}@paging.example.com",
+            phone="+1234567890",
+            role="client",
+            password="password123"
+        ))
+        user_crud.update_user_returning(db_session, user.id, is_onboarded=True)
+
+    first = user_crud.get_onboarded_clients_page(db_session, 1000)
+    last = first[-1]
+    assert last.email == "stamped2@paging.example.com"
+    assert user_crud.get_onboarded_clients_page(db_session, 1000, (last.updated_at, last.id)) == []
+    before_last = first[-2]
+    assert user_crud.get_onboarded_clients_page(db_session, 1000, (before_last.updated_at, before_last.id)) == [last]
+
+def test_get_users_by_ids(db_session, user_crud):
+    """Test that a batch of IDs is resolved with one IN query onto the profile columns."""
+    created = [
+        user_crud.create_user(db_session, CreateUserSchema(
+            name=f"Batch {index}",
+            email=f"batch{index}@example.com",
+            phone="+1234567890",
+            role="client",
+            password="password123"
+        ))
+        for index in range(3)
+    ]
+    wanted = [created[2].id, created[0].id, created[0].id, 999999]
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        rows = user_crud.get_users_by_ids(db_session, wanted)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 1
+    assert " IN (" in statements[0]
+    assert "password" not in statements[0]
+    assert sorted(row.id for row in rows) == sorted([created[0].id, created[2].id])
+    assert set(rows[0]._fields) == {
+        "id", "role", "name", "email", "profile_url", "business_url", "is_email_verified"
+    }
+    assert user_crud.get_users_by_ids(db_session, []) == []
+
+def test_create_user_returning(db_session, user_crud):
+    """Test that create_user_returning inserts and reads back the user in a single statement."""
+    values = {"name": "Dave Black", "email": "daveblack@example.com", "phone": "+1234567890",
+              "role": "client", "password": "hashed-password"}
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        row = user_crud.create_user_returning(db_session, values)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO users")
+    assert row._fields == ("id", "email", "name")
+    user = user_crud.get_user_by_id(db_session, row.id)
+    assert user.email == "daveblack@example.com"
+    assert user.created_at is not None
+
+def test_create_user_returning_duplicate_email(db_session, user_crud):
+    """Test that a taken email surfaces as an IntegrityError on users.email."""
+    values = {"name": "Erin Gray", "email": "eringray@example.com", "phone": "+1234567890",
+              "role": "client", "password": "hashed-password"}
+    user_crud.create_user_returning(db_session, values)
+
+    with pytest.raises(IntegrityError) as error:
+        user_crud.create_user_returning(db_session, values)
+    db_session.rollback()
+
+    assert is_duplicate_email(error.value)
+    with pytest.raises(ValueError, match="Invalid field: invalid_field"):
+        user_crud.create_user_returning(db_session, {**values, "invalid_field": 1})
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base
+from models.schemas.user_schemas import CreateUserSchema
+from crud_engine.user_crud import UserCRUD
+from crud_engine.user_events import on_users_changed, remove_users_changed_listener
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create an in-memory database and a session on it."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def changes():
+    """The user IDs handed to a listener, one set per commit."""
+    published = []
+    listener = on_users_changed(lambda user_ids: published.append(set(user_ids)))
+    yield published
+    remove_users_changed_listener(listener)
+
+@pytest.fixture(scope="function")
+def user_crud():
+    """Provide an instance of the UserCRUD class."""
+    return UserCRUD()
+
+def new_user(email="events@example.com"):
+    return CreateUserSchema(name="Event User", email=email, phone="+1234567890", role="client", password="password123")
+
+def test_writes_are_published_on_commit(db_session, user_crud, changes):
+    """Test that create_user, update_user and update_user_returning report their user after commit."""
+    user = user_crud.create_user(db_session, new_user())
+    assert changes == [{user.id}]
+
+    user_crud.update_user(db_session, user.id, name="Renamed")
+    user_crud.update_user_returning(db_session, user.id, name="Renamed Again")
+    assert changes == [{user.id}] * 3
+
+def test_changes_wait_for_the_commit(db_session, user_crud, changes):
+    """Test that writes in one transaction are published together, and only once committed."""
+    first = user_crud.create_user(db_session, new_user("first@example.com"), commit=False)
+    second = user_crud.create_user(db_session, new_user("second@example.com"), commit=False)
+    user_crud.update_user_returning(db_session, first.id, commit=False, name="Renamed")
+    assert changes == []
+
+    db_session.commit()
+    assert changes == [{first.id, second.id}]
+
+def test_rolled_back_changes_are_not_published(db_session, user_crud, changes):
+    """Test that a rollback forgets the changes of its transaction."""
+    user_crud.create_user(db_session, new_user(), commit=False)
+    db_session.rollback()
+    db_session.commit()
+
+    assert changes == []
+
+def test_missing_users_and_failing_listeners_are_harmless(db_session, user_crud, changes):
+    """Test that updating nobody publishes nothing and a failing listener does not break the commit."""
+    user_crud.update_user_returning(db_session, 9999, name="Nobody")
+    assert changes == []
+
+    def broken(user_ids):
+        raise RuntimeError("listener failed")
+
+    on_users_changed(broken)
+    try:
+        user = user_crud.create_user(db_session, new_user())
+    finally:
+        remove_users_changed_listener(broken)
+    assert changes == [{user.id}]
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base
+from models.schemas.user_schemas import CreateUserSchema
+from crud_engine.user_crud import UserCRUD
+from crud_engine.user_loader import get_user_loader
+
+
+@pytest.fixture(scope="function")
+def engine():
+    """An in-memory database with the users table."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def db_session(engine):
+    """Create a new database session for each test."""
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield db
+    db.close()
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    """The SQL statements run on the engine."""
+    log = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: log.append(statement))
+    return log
+
+@pytest.fixture(scope="function")
+def user_crud():
+    """Provide an instance of the UserCRUD class."""
+    return UserCRUD()
+
+def make_user(db_session, user_crud, email="loader@example.com"):
+    """Create and commit a client with this email."""
+    return user_crud.create_user(db_session, CreateUserSchema(
+        name="Loader User",
+        email=email,
+        phone="+1234567890",
+        role="client",
+        password="password123"
+    ))
+
+def test_user_is_fetched_once_by_id_and_email(db_session, user_crud, statements):
+    """Test that lookups by either key share one query."""
+    user_id = make_user(db_session, user_crud).id
+    del statements[:]
+
+    by_email = user_crud.get_user_by_email(db_session, "loader@example.com")
+    by_id = user_crud.get_user_by_id(db_session, user_id)
+
+    assert by_id is by_email
+    assert user_crud.get_user_by_email(db_session, "loader@example.com") is by_email
+    assert len(statements) == 1
+
+def test_misses_are_remembered_until_the_user_is_created(db_session, user_crud, statements):
+    """Test that a remembered miss is replaced by a user created in the same transaction."""
+    assert user_crud.get_user_by_email(db_session, "new@example.com") is None
+    assert user_crud.get_user_by_email(db_session, "new@example.com") is None
+    assert len(statements) == 1
+
+    user = user_crud.create_user(db_session, CreateUserSchema(
+        name="New User",
+        email="new@example.com",
+        phone="+1234567890",
+        role="client",
+        password="password123"
+    ), commit=False)
+
+    assert user_crud.get_user_by_email(db_session, "new@example.com") is user
+    assert user_crud.get_user_by_id(db_session, user.id) is user
+
+def test_updates_and_transaction_ends_clear_the_loader(db_session, user_crud, statements):
+    """Test that nothing memoized survives an update or the end of the transaction."""
+    user_id = make_user(db_session, user_crud).id
+    user_crud.get_user_by_id(db_session, user_id)
+    user_crud.update_user_returning(db_session, user_id, commit=False, email="renamed@example.com")
+    del statements[:]
+
+    assert user_crud.get_user_by_email(db_session, "loader@example.com") is None
+    assert user_crud.get_user_by_email(db_session, "renamed@example.com").id == user_id
+    assert len(statements) == 2
+
+    db_session.commit()
+    del statements[:]
+    user_crud.get_user_by_id(db_session, user_id)
+    assert len(statements) == 1
+
+def test_loader_belongs_to_its_session(engine, db_session):
+    """Test that each session gets its own loader and keeps it."""
+    other = sessionmaker(bind=engine)()
+    try:
+        assert get_user_loader(db_session) is get_user_loader(db_session)
+        assert get_user_loader(db_session) is not get_user_loader(other)
+    finally:
+        other.close()
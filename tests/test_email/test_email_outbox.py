@@ -0,0 +1,196 @@
+import asyncio
+import email
+import socket
+from datetime import timedelta
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base, EmailOutbox, User
+from models.schemas.user_schemas import CreateUserSchema
+from crud_engine.email_outbox_crud import email_outbox_crud, utcnow
+from crud_engine.user_crud import UserCRUD
+from logic.email.outbox_worker import OutboxWorker, backoff_delay
+
+TEMPLATE_FOLDER = Path(__file__).resolve().parents[2] / "email_templates"
+
+ALICE = dict(name="Alice", email="alice@example.com", phone="+1234567890", role="client", password="secret123")
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping every message it receives."""
+
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+class FailingMailer:
+    """A mailer whose relay is always down."""
+
+    async def send_message(self, message, template_name=None):
+        raise ConnectionRefusedError("relay unavailable")
+
+
+@pytest.fixture(scope="function")
+def session_factory():
+    """Create a fresh in-memory database shared by the test and the worker."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def smtp_server():
+    """Run a local SMTP server that records what it receives."""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+def make_mailer(port):
+    """Build a FastMail client for the local SMTP server."""
+    from fastapi_mail import ConnectionConfig, FastMail
+
+    return FastMail(ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+        TEMPLATE_FOLDER=TEMPLATE_FOLDER,
+    ))
+
+def queue_verification_email(db, recipient="alice@example.com"):
+    return email_outbox_crud.enqueue(
+        db,
+        recipient=recipient,
+        subject="Verify Your Email",
+        template_name="verification_email.html",
+        template_body={"name": "Alice", "code": "123456"},
+    )
+
+def test_backoff_doubles_up_to_the_maximum():
+    """Test the retry delays."""
+    assert [backoff_delay(attempts, 30, 200) for attempts in range(1, 6)] == [30, 60, 120, 200, 200]
+
+def test_email_is_queued_in_the_callers_transaction(session_factory):
+    """Test that rolling back the user change also drops its email."""
+    with session_factory() as db:
+        user = UserCRUD().create_user(db, CreateUserSchema(**ALICE), commit=False)
+        assert user.id is not None
+        email_outbox_crud.enqueue(
+            db, recipient=user.email, subject="Verify Your Email", template_name="verification_email.html",
+            template_body={"name": user.name, "code": "123456"}, commit=False
+        )
+        db.rollback()
+
+        assert db.scalars(select(User)).all() == []
+        assert db.scalars(select(EmailOutbox)).all() == []
+
+def test_claimed_messages_are_leased(session_factory):
+    """Test that a claimed message is hidden from other senders until its lease runs out."""
+    with session_factory() as db:
+        queue_verification_email(db)
+        claimed = email_outbox_crud.claim_due(db, batch_size=10, lease=timedelta(minutes=5))
+        assert [message.recipient for message in claimed] == ["alice@example.com"]
+        assert email_outbox_crud.claim_due(db, batch_size=10, lease=timedelta(minutes=5)) == []
+
+def test_worker_delivers_through_smtp(session_factory, smtp_server):
+    """Test that the worker renders the template and delivers it to the SMTP server."""
+    handler, port = smtp_server
+    with session_factory() as db:
+        queue_verification_email(db)
+
+    worker = OutboxWorker(mailer=make_mailer(port), session_factory=session_factory)
+    assert asyncio.run(worker.drain_once()) == 1
+
+    assert len(handler.envelopes) == 1
+    assert handler.envelopes[0].rcpt_tos == ["alice@example.com"]
+    html = next(
+        part.get_payload(decode=True)
+        for part in email.message_from_bytes(handler.envelopes[0].content).walk()
+        if part.get_content_type() == "text/html"
+    )
+    assert b"123456" in html
+    with session_factory() as db:
+        message = db.scalars(select(EmailOutbox)).one()
+        assert message.status == "sent"
+        assert message.attempts == 1
+        assert message.sent_at is not None
+
+def test_failed_delivery_backs_off_then_dies(session_factory):
+    """Test that failures are retried later and end up dead after max_attempts."""
+    with session_factory() as db:
+        queue_verification_email(db)
+
+    worker = OutboxWorker(mailer=FailingMailer(), session_factory=session_factory, max_attempts=2, backoff_base=60)
+    assert asyncio.run(worker.drain_once()) == 1
+
+    with session_factory() as db:
+        message = db.scalars(select(EmailOutbox)).one()
+        assert message.status == "pending"
+        assert message.attempts == 1
+        assert "relay unavailable" in message.last_error
+        assert message.next_attempt_at > utcnow() + timedelta(seconds=50)
+
+    # Not due yet
+    assert asyncio.run(worker.drain_once()) == 0
+
+    with session_factory() as db:
+        db.get(EmailOutbox, message.id).next_attempt_at = utcnow()
+        db.commit()
+    assert asyncio.run(worker.drain_once()) == 1
+
+    with session_factory() as db:
+        message = db.scalars(select(EmailOutbox)).one()
+        assert message.status == "dead"
+        assert message.attempts == 2
+
+def test_registration_returns_before_the_email_is_sent(session_factory, monkeypatch):
+    """Test that registration commits the user and its email without contacting SMTP."""
+    from logic.auth import auth_logic
+
+    woken = []
+    monkeypatch.setattr(auth_logic.outbox_worker, "wake", lambda: woken.append(True))
+
+    with session_factory() as db:
+        response = asyncio.run(auth_logic.register_new_user(CreateUserSchema(**ALICE), db))
+
+    assert response["email"] == "alice@example.com"
+    assert woken == [True]
+    with session_factory() as db:
+        message = db.scalars(select(EmailOutbox)).one()
+        assert message.recipient == "alice@example.com"
+        assert message.template_name == "verification_email.html"
+        assert message.status == "pending"
+        assert db.get(User, response["user_id"]).verify_user_token == message.template_body["code"]
+
+def test_template_errors_are_dead_at_once(session_factory):
+    """Test that a message whose template cannot render is not retried."""
+    with session_factory() as db:
+        email_outbox_crud.enqueue(
+            db, recipient="alice@example.com", subject="Verify Your Email",
+            template_name="verification_email.html", template_body={"name": "Alice"}
+        )
+
+    worker = OutboxWorker(mailer=FailingMailer(), session_factory=session_factory)
+    assert asyncio.run(worker.drain_once()) == 1
+
+    with session_factory() as db:
+        message = db.scalars(select(EmailOutbox)).one()
+        assert message.status == "dead"
+        assert "code" in message.last_error
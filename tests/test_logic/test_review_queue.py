@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base, User
+from logic.users import review_queue
+from logic.users.review_queue import (
+    load_onboarded_clients_page, mark_review_queue_changed, publish_client_reviewed, review_queue_events, stream_review_queue
+)
+
+
+@pytest.fixture(scope="function")
+def session_factory(monkeypatch):
+    """Create an in-memory database with three onboarded clients and small snapshot pages."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        for index in range(3):
+            db.add(User(name=f"Client {index}", email=f"client{index}@example.com", role="client",
+                        password="hash", is_onboarded=True))
+        db.commit()
+    monkeypatch.setattr(review_queue, "REVIEW_STREAM_SNAPSHOT_PAGE", 2)
+    yield factory
+    engine.dispose()
+
+def parse(chunk: bytes):
+    """Splits one server-sent event into its name and data."""
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+def test_stream_sends_the_queue_then_pushes_changes(session_factory):
+    """Test the snapshot pages, a pushed event and a keepalive."""
+    async def scenario():
+        stream = stream_review_queue(session_factory, keepalive=0.01)
+        chunks = [await anext(stream) for _ in range(3)]
+        publish_client_reviewed(2, False, "Blurry")
+        chunks.append(await anext(stream))
+        chunks.append(await anext(stream))
+        await stream.aclose()
+        return chunks
+
+    retry, first, second, reviewed, keepalive = asyncio.run(scenario())
+
+    assert retry.startswith(b"retry: ")
+    assert parse(first)[0] == parse(second)[0] == "snapshot"
+    assert parse(first)[1]["complete"] is False
+    clients = parse(first)[1]["clients"] + parse(second)[1]["clients"]
+    assert [client["email"] for client in clients] == [f"client{index}@example.com" for index in range(3)]
+    assert parse(second)[1]["complete"] is True
+    assert parse(reviewed) == ("client_reviewed", {"user_id": 2, "approved": False, "reason": "Blurry"})
+    assert keepalive == b": keepalive\n\n"
+    assert len(review_queue_events) == 0
+
+def test_stream_that_falls_behind_is_told_to_resync(session_factory):
+    """Test that a dropped stream ends with a resync event."""
+    async def scenario():
+        stream = stream_review_queue(session_factory)
+        for _ in range(3):
+            await anext(stream)
+        for user_id in range(review_queue_events.queue_size + 1):
+            publish_client_reviewed(user_id, True)
+        return [chunk async for chunk in stream]
+
+    chunks = asyncio.run(scenario())
+
+    assert parse(chunks[-1]) == ("resync", {})
+    assert len(chunks) == review_queue_events.queue_size
+
+def test_listing_read_after_a_review_does_not_join_an_older_read(session_factory, monkeypatch):
+    """Test that a herd shares one read, but a request after a committed change reads the new rows."""
+    read_page = review_queue._read_onboarded_clients_page
+    release = threading.Event()
+    reads = []
+
+    def slow_first_read(bind, limit, after):
+        rows = read_page(bind, limit, after)
+        reads.append(len(rows))
+        if len(reads) == 1:
+            # Hold the herd's read, already made, in flight while the review commits
+            release.wait(timeout=5)
+        return rows
+
+    monkeypatch.setattr(review_queue, "_read_onboarded_clients_page", slow_first_read)
+
+    async def scenario():
+        with session_factory() as db:
+            herd = [asyncio.ensure_future(load_onboarded_clients_page(db, 50)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+
+            db.query(User).filter(User.id == 1).update({"is_onboarded": False})
+            db.commit()
+            mark_review_queue_changed()
+            later = asyncio.ensure_future(load_onboarded_clients_page(db, 50))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*herd), await later
+
+    herd, later = asyncio.run(scenario())
+
+    assert reads == [3, 2]
+    assert all(len(page) == 3 for page in herd)
+    assert [row.id for row in later] == [2, 3]
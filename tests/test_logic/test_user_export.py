@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base, User
+from logic.users.user_export import EXPORT_FIELDS, export_users
+
+
+@pytest.fixture(scope="function")
+def session_factory():
+    """Create an in-memory database with a few users."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        for index in range(5):
+            db.add(User(
+                name=f"User {index}",
+                email=f"user{index}@example.com",
+                role="client" if index < 4 else "admin",
+                password="$2b$12$secret-hash",
+                verify_user_token=f"verify-{index}",
+                forget_password_token=f"reset-{index}",
+                is_onboarded=index % 2 == 0,
+                is_approved=index == 0,
+            ))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+def test_sensitive_columns_are_never_exported():
+    """Test that the password hash and the secret tokens are excluded."""
+    assert "password" not in EXPORT_FIELDS
+    assert not [field for field in EXPORT_FIELDS if field.endswith("_token")]
+    assert {"id", "email", "role", "is_onboarded", "is_approved", "created_at"} <= set(EXPORT_FIELDS)
+
+def test_ndjson_export_streams_one_chunk_per_batch(session_factory):
+    """Test that NDJSON is produced batch by batch and filters apply."""
+    chunks = list(export_users("ndjson", batch_size=2, session_factory=session_factory, role="client"))
+    records = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+
+    assert len(chunks) == 2
+    assert [record["email"] for record in records] == [f"user{index}@example.com" for index in range(4)]
+    assert set(records[0]) == set(EXPORT_FIELDS)
+    assert "T" in records[0]["created_at"]
+    assert b"secret-hash" not in b"".join(chunks)
+    assert b"verify-0" not in b"".join(chunks)
+
+def test_csv_export_has_a_header_and_filters(session_factory):
+    """Test that CSV output parses back to the filtered users."""
+    body = b"".join(export_users(
+        "csv", batch_size=2, session_factory=session_factory, is_onboarded=True, is_approved=False
+    )).decode()
+    rows = list(csv.DictReader(io.StringIO(body)))
+
+    assert [row["email"] for row in rows] == ["user2@example.com", "user4@example.com"]
+    assert list(rows[0]) == EXPORT_FIELDS
+
+def test_empty_csv_export_still_has_a_header(session_factory):
+    """Test that an export matching nobody is just the header line."""
+    body = b"".join(export_users("csv", session_factory=session_factory, role="nobody")).decode()
+    assert body.strip() == ",".join(EXPORT_FIELDS)
+
+def test_unknown_format_is_rejected(session_factory):
+    """Test that unsupported formats fail before touching the database."""
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export_users("xml", session_factory=session_factory)
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.models import Base, User
+from models.schemas.user_schemas import CreateUserSchema
+from logic.users.users_logic import crud, get_users_data_by_ids, load_user_profile, update_user_data
+from utils.profile_cache import profile_cache
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create an in-memory database with two users."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for index in range(2):
+        db.add(User(
+            name=f"User {index}",
+            email=f"user{index}@example.com",
+            role="client",
+            password="$2b$12$secret-hash",
+        ))
+    db.commit()
+    # Profiles cached by earlier tests belong to other databases
+    profile_cache.clear()
+    yield db
+    db.close()
+    engine.dispose()
+    profile_cache.clear()
+
+def test_batch_profiles_keep_request_order_and_report_missing_ids(db_session):
+    """Test that every requested ID gets an entry, None for unknown users."""
+    profiles = asyncio.run(get_users_data_by_ids([2, 9999, 1], db_session))
+
+    assert list(profiles) == [2, 9999, 1]
+    assert profiles[9999] is None
+    assert profiles[1]["email"] == "user0@example.com"
+    assert profiles[2] == {
+        "user_id": 2,
+        "user_role": "client",
+        "user_name": "User 1",
+        "email": "user1@example.com",
+        "profile_picture": None,
+        "business_url": None,
+        "is_verified": False,
+    }
+
+def test_profile_is_read_through_the_cache_until_it_changes(db_session):
+    """Test that profile GETs skip the database until an update commits."""
+    statements = []
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert asyncio.run(load_user_profile(1, db_session)).profile["user_name"] == "User 0"
+    assert asyncio.run(load_user_profile(1, db_session)).profile["user_name"] == "User 0"
+    assert len(statements) == 1
+
+    asyncio.run(update_user_data(1, {"name": "Renamed"}, db_session))
+    assert asyncio.run(load_user_profile(1, db_session)).profile["user_name"] == "Renamed"
+    assert len(statements) == 3
+
+def test_missing_user_is_cached_until_it_is_created(db_session):
+    """Test that an unknown ID is answered from the negative cache, then invalidated by create_user."""
+    statements = []
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(load_user_profile(3, db_session))
+        assert error.value.status_code == 404
+    assert len(statements) == 1
+    assert profile_cache.stats()["negative_hits"] == 1
+
+    crud.create_user(db_session, CreateUserSchema(
+        name="User 2", email="user2@example.com", phone="+1234567890", role="client", password="password123"
+    ))
+    assert asyncio.run(load_user_profile(3, db_session)).profile["email"] == "user2@example.com"
+
+def test_concurrent_profile_misses_share_one_query(db_session):
+    """Test that a herd of requests for an uncached profile reads it once and shares the result."""
+    statements = []
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    async def herd():
+        return await asyncio.gather(*(load_user_profile(1, db_session) for _ in range(20)))
+
+    profiles = asyncio.run(herd())
+
+    assert len(statements) == 1
+    assert all(profile is profiles[0] for profile in profiles)
+    assert profiles[0].profile["user_name"] == "User 0"
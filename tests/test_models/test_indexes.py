@@ -0,0 +1,100 @@
+import os
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from models.models import Base
+from crud_engine.user_crud import UserCRUD
+
+# Set TEST_POSTGRES_URL to a disposable PostgreSQL database to check its plans too
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+CRUD_LOOKUPS = {
+    "get_user_by_email": lambda crud, db: crud.get_user_by_email(db, "someuser@example.com"),
+    "get_user_by_id": lambda crud, db: crud.get_user_by_id(db, 1),
+    "get_user_by_code_verify": lambda crud, db: crud.get_user_by_code(db, "123456", "verify_user_token"),
+    "get_user_by_code_forget": lambda crud, db: crud.get_user_by_code(db, "reset456", "forget_password_token"),
+    "get_onboarded_clients": lambda crud, db: crud.get_onboarded_clients(db),
+    "get_onboarded_clients_first_page": lambda crud, db: crud.get_onboarded_clients_page(db, 50),
+    "get_onboarded_clients_next_page": lambda crud, db: crud.get_onboarded_clients_page(
+        db, 50, (datetime(2026, 1, 1, 12, 0), 42)
+    ),
+}
+
+
+def capture_query(engine, lookup):
+    """Runs a CRUD lookup and returns the SQL statement and parameters it sent."""
+    captured = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        db = sessionmaker(bind=engine)()
+        try:
+            lookup(UserCRUD(), db)
+        finally:
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(captured) == 1
+    return captured[0]
+
+@pytest.fixture(scope="module")
+def sqlite_engine():
+    """Creates an in-memory SQLite database with the model indexes."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def postgres_engine():
+    """Creates the schema in the PostgreSQL test database, if one is configured."""
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.mark.parametrize("lookup_name", CRUD_LOOKUPS)
+def test_sqlite_lookup_uses_index(sqlite_engine, lookup_name):
+    """Test that each CRUD lookup searches an index instead of scanning users."""
+    statement, parameters = capture_query(sqlite_engine, CRUD_LOOKUPS[lookup_name])
+
+    with sqlite_engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = " ".join(row[-1] for row in plan)
+
+    assert "SEARCH users USING" in details, details
+    assert "SCAN users" not in details, details
+
+@pytest.mark.parametrize("lookup_name", CRUD_LOOKUPS)
+def test_postgres_lookup_uses_index(postgres_engine, lookup_name):
+    """Test that each CRUD lookup can be answered from an index on PostgreSQL."""
+    statement, parameters = capture_query(postgres_engine, CRUD_LOOKUPS[lookup_name])
+
+    with postgres_engine.connect() as conn:
+        # The test table is tiny, so rule out the sequential scan the planner would prefer
+        conn.execute(text("SET enable_seqscan = off"))
+        plan = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    details = " ".join(row[0] for row in plan)
+
+    assert "Index" in details, details
+    assert "Seq Scan" not in details, details
+
+@pytest.mark.parametrize("lookup_name", ["get_onboarded_clients_first_page", "get_onboarded_clients_next_page"])
+def test_sqlite_onboarded_page_needs_no_sort(sqlite_engine, lookup_name):
+    """Test that pages are read in index order, without sorting the matching clients."""
+    statement, parameters = capture_query(sqlite_engine, CRUD_LOOKUPS[lookup_name])
+
+    with sqlite_engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = " ".join(row[-1] for row in plan)
+
+    assert "ix_users_role_is_onboarded_updated_at_id" in details, details
+    assert "TEMP B-TREE" not in details, details
@@ -1,8 +1,9 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
-from models.models import User, Base
+from models.models import User, Base, precise_now
 
 
 # Database URL (use a test database or an in-memory SQLite database)
@@ -136,3 +137,13 @@ def test_update_user(db_session):
     assert updated_user.role == "Manager"
     assert updated_user.password == "password123"  # Ensure password remains unchanged
 
+def test_precise_now_only_changes_updated_at_on_sqlite():
+    """Test that only updated_at renders fractional seconds on SQLite, and now() is left alone."""
+    def render(expression, dialect):
+        return str(select(expression).compile(dialect=dialect))
+
+    assert "strftime('%Y-%m-%d %H:%M:%f000', 'now')" in render(precise_now(), sqlite.dialect())
+    assert "now()" in render(precise_now(), postgresql.dialect())
+    assert "CURRENT_TIMESTAMP" in render(func.now(), sqlite.dialect())
+    assert isinstance(User.__table__.c.updated_at.default.arg, precise_now)
+    assert isinstance(User.__table__.c.updated_at.onupdate.arg, precise_now)
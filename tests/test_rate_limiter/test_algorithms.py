@@ -0,0 +1,109 @@
+import pytest
+from rate_limiter.algorithms.gcra import GCRA
+from rate_limiter.algorithms.sliding_window import SlidingWindowCounter
+from rate_limiter.algorithms.token_token import TokenBucket
+from rate_limiter.rate_limiter import ALGORITHMS, RateLimiterMiddleware
+
+START = 1_000_000.0
+
+@pytest.fixture(params=list(ALGORITHMS), scope="function")
+def algorithm(request):
+    """Provide each rate limiting algorithm class in turn."""
+    return ALGORITHMS[request.param]
+
+def make_limiter(algorithm, capacity=10, refill_rate=2.0):
+    """Creates a limiter whose clock starts at START, at a window boundary."""
+    limiter = algorithm(capacity, refill_rate)
+    if isinstance(limiter, TokenBucket):
+        limiter.last_refill_time = START
+    return limiter
+
+def test_burst_up_to_capacity(algorithm):
+    """Test that a fresh key admits exactly capacity requests at once."""
+    limiter = make_limiter(algorithm)
+
+    admitted = sum(limiter.consume(1, START) for _ in range(15))
+
+    assert admitted == 10
+    assert limiter.remaining(START) == 0
+
+def test_sustained_rate(algorithm):
+    """Test that a client hammering for a minute gets about refill_rate requests per second."""
+    limiter = make_limiter(algorithm, capacity=10, refill_rate=2.0)
+
+    admitted = 0
+    for step in range(60 * 100):
+        admitted += limiter.consume(1, START + step * 0.01)
+
+    # At most the initial burst of 10 plus 2 per second; the sliding window counter
+    # does not add a burst on top of its windows and runs slightly conservative
+    assert 0.9 * 2 * 60 <= admitted <= 10 + 2 * 60 + 1
+
+def test_idle_key_refills_completely(algorithm):
+    """Test that a key left idle long enough gets its whole burst back."""
+    limiter = make_limiter(algorithm)
+    for _ in range(10):
+        limiter.consume(1, START)
+
+    later = START + 60
+    assert limiter.remaining(later) == 10
+    assert sum(limiter.consume(1, later) for _ in range(15)) == 10
+
+def test_retry_after_is_accurate(algorithm):
+    """Test that a refused request is admitted once retry_after has passed, not before."""
+    limiter = make_limiter(algorithm)
+    for _ in range(10):
+        limiter.consume(1, START)
+
+    wait = limiter.retry_after(1, START)
+
+    assert wait > 0
+    assert limiter.consume(1, START + wait * 0.9) is False
+    assert limiter.consume(1, START + wait + 1e-6) is True
+
+def test_reset_after_restores_capacity(algorithm):
+    """Test that the full capacity is back once reset_after has passed."""
+    limiter = make_limiter(algorithm)
+    for _ in range(4):
+        limiter.consume(1, START)
+
+    reset_at = START + limiter.reset_after(START) + 1e-6
+
+    assert limiter.remaining(reset_at) == 10
+
+def test_keys_are_isolated(algorithm):
+    """Test that a client flooding its key leaves a well-behaved client its full budget."""
+    noisy = make_limiter(algorithm)
+    polite = make_limiter(algorithm)
+
+    for step in range(1000):
+        noisy.consume(1, START + step * 0.001)
+
+    assert sum(polite.consume(1, START + 1) for _ in range(10)) == 10
+
+def test_token_bucket_refills_for_full_idle_time():
+    """Test the fix for refills capped at one second of elapsed time."""
+    bucket = make_limiter(TokenBucket, capacity=100, refill_rate=1.0)
+    bucket.consume(100, START)
+
+    assert bucket.get_tokens(START + 50) == 50
+
+def test_gcra_keeps_a_single_timestamp():
+    """Test that GCRA's only per-key state is its theoretical arrival time."""
+    limiter = GCRA(10, 2.0)
+    limiter.consume(1, START)
+
+    assert limiter.tat == START + 0.5
+    assert not hasattr(limiter, "__dict__")
+
+def test_middleware_selects_algorithm():
+    """Test that the middleware builds buckets of the chosen algorithm."""
+    for name, algorithm in ALGORITHMS.items():
+        middleware = RateLimiterMiddleware(None, capacity=5, refill_rate=1.0, algorithm=name)
+        assert isinstance(middleware.backend.buckets.get("ip:10.0.0.1"), algorithm)
+
+    middleware = RateLimiterMiddleware(None, capacity=5, refill_rate=1.0, algorithm=SlidingWindowCounter)
+    assert isinstance(middleware.backend.buckets.get("ip:10.0.0.1"), SlidingWindowCounter)
+
+    with pytest.raises(ValueError, match="Unknown rate limit algorithm"):
+        RateLimiterMiddleware(None, capacity=5, refill_rate=1.0, algorithm="leaky")
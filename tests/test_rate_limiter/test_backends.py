@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import pytest
+from rate_limiter.algorithms.gcra import GCRA
+from rate_limiter.backends.memory import MemoryBackend
+from rate_limiter.backends.redis_backend import FakeRedis, RedisBackend
+from rate_limiter.backends.shared_memory import SharedMemoryBackend
+from rate_limiter.rate_limiter import RateLimiterMiddleware
+
+NOW = 1_700_000_000.0
+
+
+def admitted(backend, key, attempts, now=NOW):
+    """Returns how many of attempts requests for key the backend admits."""
+    return sum(backend.acquire(key, now) is None for _ in range(attempts))
+
+def hammer(path, attempts, results):
+    """Worker process: acquires one key repeatedly and reports how many were admitted."""
+    backend = SharedMemoryBackend(path, capacity=20, refill_rate=0.001, stripes=4, slots_per_stripe=4)
+    results.put(admitted(backend, "ip:10.0.0.1", attempts))
+    backend.close()
+
+@pytest.fixture
+def table_path(tmp_path):
+    return str(tmp_path / "rate_limit.table")
+
+def test_memory_backend_reports_refusals():
+    """Test that the in-process backend admits a burst and describes the refusal."""
+    backend = MemoryBackend(GCRA, capacity=2, refill_rate=0.5, max_keys=10, idle_timeout=60)
+
+    assert admitted(backend, "a", 2) == 2
+    decision = backend.acquire("a", NOW)
+    assert decision.remaining == 0
+    assert decision.retry_after == pytest.approx(2.0)
+    assert decision.reset_after == pytest.approx(4.0)
+
+def test_shared_memory_limit_holds_across_workers(table_path):
+    """Test that two backends mapping the same table share one budget per key."""
+    first = SharedMemoryBackend(table_path, capacity=5, refill_rate=1.0)
+    second = SharedMemoryBackend(table_path, capacity=5, refill_rate=1.0)
+
+    assert admitted(first, "ip:10.0.0.1", 3) == 3
+    assert admitted(second, "ip:10.0.0.1", 3) == 2
+    assert admitted(second, "ip:10.0.0.2", 1) == 1
+
+    decision = first.acquire("ip:10.0.0.1", NOW)
+    assert decision.remaining == 0
+    assert decision.retry_after == pytest.approx(1.0)
+    assert decision.reset_after == pytest.approx(5.0)
+    assert first.acquire("ip:10.0.0.1", NOW + 1.0) is None
+
+    first.close()
+    second.close()
+
+def test_shared_memory_is_atomic_across_processes(table_path):
+    """Test that concurrent worker processes never admit more than the capacity."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=hammer, args=(table_path, 50, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert sum(results.get(timeout=5) for _ in workers) == 20
+
+def test_shared_memory_reuses_slots_when_a_stripe_is_full(table_path):
+    """Test that new keys take over the slot with the earliest arrival time."""
+    backend = SharedMemoryBackend(table_path, capacity=1, refill_rate=1.0, stripes=1, slots_per_stripe=2)
+
+    assert backend.acquire("a", NOW) is None
+    assert backend.acquire("b", NOW + 0.5) is None
+    # "a" holds the earliest arrival time, so "c" replaces it
+    assert backend.acquire("c", NOW + 0.6) is None
+    assert backend.acquire("b", NOW + 0.6) is not None
+    assert backend.acquire("c", NOW + 0.6) is not None
+    backend.close()
+
+def test_shared_memory_rejects_a_different_layout(table_path):
+    """Test that workers configured with a different table layout fail loudly."""
+    SharedMemoryBackend(table_path, capacity=5, refill_rate=1.0, stripes=4).close()
+
+    with pytest.raises(ValueError):
+        SharedMemoryBackend(table_path, capacity=5, refill_rate=1.0, stripes=8)
+
+def test_redis_backend_shares_state_through_the_server():
+    """Test the Redis backend against the in-process fake."""
+    server = FakeRedis()
+    first = RedisBackend(server, capacity=3, refill_rate=1.0)
+    second = RedisBackend(server, capacity=3, refill_rate=1.0)
+
+    async def scenario():
+        results = [await backend.acquire("ip:10.0.0.1", NOW) for backend in (first, second, first, second)]
+        later = await second.acquire("ip:10.0.0.1", NOW + 1.0)
+        return results, later
+
+    results, later = asyncio.run(scenario())
+    assert results[:3] == [None, None, None]
+    assert results[3].remaining == 0
+    assert results[3].retry_after == pytest.approx(1.0)
+    assert later is None
+    assert "ratelimit:ip:10.0.0.1" in server.values
+
+def test_middleware_awaits_async_backends():
+    """Test that the middleware answers 429 from an asyncio backend."""
+    statuses = []
+    async def ok_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    limiter = RateLimiterMiddleware(ok_app, backend=RedisBackend(FakeRedis(), capacity=1, refill_rate=0.001))
+    scope = {"type": "http", "method": "GET", "path": "/", "client": ("10.0.0.1", 50000), "headers": []}
+
+    async def scenario():
+        await limiter(scope, None, send)
+        await limiter(scope, None, send)
+
+    asyncio.run(scenario())
+    assert statuses == [200, 429]
+
+    with pytest.raises(ValueError):
+        RateLimiterMiddleware(ok_app)
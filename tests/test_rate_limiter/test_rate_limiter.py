@@ -0,0 +1,114 @@
+import asyncio
+import time
+import pytest
+from jose import jwt
+from rate_limiter.bucket_store import BucketStore
+from rate_limiter.key_functions import client_ip, combine, jwt_subject, route
+from rate_limiter.rate_limiter import RateLimiterMiddleware
+from validator import token_validator
+
+
+def make_scope(host="10.0.0.1", path="/api/v1/user/data/1", token=None):
+    """Builds a minimal ASGI HTTP scope."""
+    headers = [(b"host", b"testserver")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {"type": "http", "method": "GET", "path": path, "client": (host, 50000), "headers": headers}
+
+async def ok_app(scope, receive, send):
+    """An ASGI app that answers every request with 200."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+def call(limiter, scope):
+    """Sends one request through the middleware and returns (status, headers, body)."""
+    messages = []
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(limiter(scope, receive, send))
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+def test_client_ip_key():
+    """Test keying by client address."""
+    assert client_ip(make_scope(host="10.0.0.7")) == "ip:10.0.0.7"
+    assert client_ip({"type": "http", "headers": []}) == "ip:unknown"
+
+def test_jwt_subject_key():
+    """Test keying by the verified sub claim, with an IP fallback."""
+    token = jwt.encode(
+        {"sub": "user@example.com", "exp": int(time.time()) + 60},
+        str(token_validator.SECRET_KEY),
+        algorithm=token_validator.ALGORITHM,
+    )
+
+    assert jwt_subject(make_scope(token=token)) == "sub:user@example.com"
+    assert jwt_subject(make_scope(token="forged.token.value")) == "ip:10.0.0.1"
+    assert jwt_subject(make_scope()) == "ip:10.0.0.1"
+
+def test_combined_key():
+    """Test joining several key functions."""
+    key_func = combine(client_ip, route)
+    assert key_func(make_scope()) == "ip:10.0.0.1|route:GET /api/v1/user/data/1"
+
+    with pytest.raises(ValueError):
+        combine()
+
+def test_bucket_store_is_bounded():
+    """Test that the store evicts the least recently used bucket."""
+    store = BucketStore(dict, max_keys=2, idle_timeout=60)
+    first = store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+
+    assert len(store) == 2
+    assert store.get("a") is first
+    assert store.stats()["evictions"] == 1
+
+def test_noisy_client_does_not_limit_others():
+    """Test that one client exhausting its bucket leaves other clients unaffected."""
+    limiter = RateLimiterMiddleware(ok_app, capacity=3, refill_rate=0.001)
+    noisy = make_scope(host="10.0.0.1")
+    quiet = make_scope(host="10.0.0.2")
+
+    for _ in range(3):
+        assert call(limiter, noisy)[0] == 200
+    assert call(limiter, noisy)[0] == 429
+    assert call(limiter, quiet)[0] == 200
+
+def test_rejected_request_gets_rate_limit_headers():
+    """Test that a 429 carries Retry-After and X-RateLimit headers and a JSON body."""
+    limiter = RateLimiterMiddleware(ok_app, capacity=2, refill_rate=0.5)
+    scope = make_scope()
+
+    status, headers, _ = call(limiter, scope)
+    assert status == 200
+    assert b"x-ratelimit-limit" not in headers
+    call(limiter, scope)
+    status, headers, body = call(limiter, scope)
+
+    assert status == 429
+    assert body == b'{"detail":"Too Many Requests"}'
+    assert headers[b"content-type"] == b"application/json"
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert headers[b"x-ratelimit-limit"] == b"2"
+    assert headers[b"x-ratelimit-remaining"] == b"0"
+    assert headers[b"retry-after"] == b"2"
+    assert headers[b"x-ratelimit-reset"] == b"4"
+
+def test_non_http_scopes_pass_through():
+    """Test that lifespan and websocket scopes are not rate limited."""
+    seen = []
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    limiter = RateLimiterMiddleware(app, capacity=1, refill_rate=0.001)
+    for _ in range(3):
+        asyncio.run(limiter({"type": "lifespan"}, receive, None))
+
+    assert seen == ["lifespan"] * 3
@@ -0,0 +1,186 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import config.db as db_config
+from config.db import get_db
+from logic.auth.auth_logic import create_access_token
+from logic.users.review_queue import review_queue_events
+from main import app
+from models.models import Base, User
+from utils.profile_cache import profile_cache
+
+USER_TOKEN = create_access_token({"sub": "alice@example.com"}, "client")
+ADMIN_TOKEN = create_access_token({"sub": "admin@example.com"}, "Admin")
+
+
+@pytest.fixture(scope="function")
+def api(monkeypatch):
+    """A client for the app on an in-memory database, with a log of the SQL each request runs."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    app.dependency_overrides[get_db] = override_get_db
+    # The export opens its own session, outside the request's dependencies
+    monkeypatch.setattr(db_config, "_session_factory", session_factory)
+    client = TestClient(app)
+    # Profiles cached by earlier tests belong to other databases
+    profile_cache.clear()
+
+    def call(method, url, token=None, expected_status=200, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        headers.update(kwargs.pop("headers", {}))
+        del statements[:]
+        response = client.request(method, url, headers=headers, **kwargs)
+        assert response.status_code == expected_status, response.text
+        return response, list(statements)
+
+    call.session_factory = session_factory
+    yield call
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+    profile_cache.clear()
+
+def test_every_route_loads_each_user_row_at_most_once(api):
+    """Test the statements each route runs, so a duplicate user fetch shows up as an extra query."""
+    def queries(method, url, token=None, **kwargs):
+        return [statement.split()[0] for statement in api(method, url, token, **kwargs)[1]]
+
+    # The user and its verification email; a taken email is left to the unique constraint
+    alice = {
+        "name": "Alice Green", "email": "alice@example.com", "phone": "+1234567890",
+        "role": "client", "password": "password123"
+    }
+    response, statements = api("POST", "/api/v1/auth/register", json=alice)
+    user_id = response.json()["user_id"]
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "INSERT"]
+    response, statements = api("POST", "/api/v1/auth/register", expected_status=400, json=alice)
+    assert response.json() == {"detail": "User with this email already exists"}
+    assert [statement.split()[0] for statement in statements] == ["INSERT"]
+
+    assert queries("POST", "/api/v1/auth/login", json={"email": "alice@example.com", "password": "password123"}) == ["SELECT"]
+
+    with api.session_factory() as db:
+        code = db.execute(select(User.verify_user_token).where(User.id == user_id)).scalar()
+    assert queries("POST", "/api/v1/auth/verify-email", json={"email": "alice@example.com", "code": code}) == ["SELECT", "UPDATE"]
+    # Lookup by email, the existence check answered from the loader, then the update
+    assert queries("POST", "/api/v1/auth/send-verify-email-code", params={"email": "alice@example.com"}) == ["SELECT", "UPDATE"]
+    published = review_queue_events.published
+    assert queries("PUT", f"/api/v1/auth/upload-business-certificate/{user_id}",
+                   json={"certificate_url": "https://example.com/certificate.pdf"}) == ["SELECT", "UPDATE"]
+
+    assert queries("GET", f"/api/v1/user/data/{user_id}", USER_TOKEN) == ["SELECT"]
+    # Served from the profile cache
+    assert queries("GET", f"/api/v1/user/data/{user_id}", USER_TOKEN) == []
+    assert queries("PUT", f"/api/v1/user/data/{user_id}", USER_TOKEN, json={"name": "Alice Updated"}) == ["UPDATE"]
+    assert queries("POST", "/api/v1/user/data/batch", USER_TOKEN, json={"user_ids": [user_id, 9999]}) == ["SELECT"]
+
+    assert queries("GET", "/api/v1/auth/admin/onboarded-clients", ADMIN_TOKEN) == ["SELECT"]
+    assert queries("GET", "/api/v1/auth/admin/users/export", ADMIN_TOKEN) == ["SELECT"]
+    # The update reads back the recipient, then the email is queued
+    assert queries("POST", "/api/v1/auth/admin/review-business-certificate", ADMIN_TOKEN,
+                   json={"user_id": user_id, "approved": True}) == ["UPDATE", "INSERT"]
+    # Both certificate changes were pushed to the review queue streams
+    assert review_queue_events.published == published + 2
+
+def test_every_route_declares_a_typed_response():
+    """Test that JSON routes validate against a schema and render with orjson."""
+    routes = [route for route in app.routes if isinstance(route, APIRoute) and route.path.startswith("/api/v1")]
+
+    assert routes
+    for route in routes:
+        if route.response_class is StreamingResponse:
+            continue
+        assert route.response_model not in (None, dict), route.path
+        assert route.response_class is ORJSONResponse, route.path
+
+def test_conditional_gets_skip_unchanged_bodies(api):
+    """Test that a matching If-None-Match gets an empty 304 until the data changes."""
+    with api.session_factory() as db:
+        db.add(User(name="Alice Green", email="alice@example.com", role="client", password="hash", is_onboarded=True))
+        db.commit()
+
+    response, _ = api("GET", "/api/v1/user/data/1", USER_TOKEN)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    # Served from the profile cache: no query and no body
+    response, statements = api("GET", "/api/v1/user/data/1", USER_TOKEN, expected_status=304,
+                               headers={"If-None-Match": etag})
+    assert statements == []
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    api("PUT", "/api/v1/user/data/1", USER_TOKEN, json={"name": "Alice Updated"})
+    response, _ = api("GET", "/api/v1/user/data/1", USER_TOKEN, headers={"If-None-Match": etag})
+    assert response.json()["user_name"] == "Alice Updated"
+    assert response.headers["ETag"] != etag
+
+    response, _ = api("GET", "/api/v1/auth/admin/onboarded-clients", ADMIN_TOKEN)
+    page_etag = response.headers["ETag"]
+    response, _ = api("GET", "/api/v1/auth/admin/onboarded-clients", ADMIN_TOKEN, expected_status=304,
+                      headers={"If-None-Match": page_etag})
+    assert response.content == b""
+
+    # A client joining the page changes its ETag
+    with api.session_factory() as db:
+        db.add(User(name="Bob Smith", email="bob@example.com", role="client", password="hash", is_onboarded=True))
+        db.commit()
+    response, _ = api("GET", "/api/v1/auth/admin/onboarded-clients", ADMIN_TOKEN, headers={"If-None-Match": page_etag})
+    assert len(response.json()["clients"]) == 2
+
+def test_slow_query_does_not_hold_up_other_requests(api):
+    """Test that a request keeps being served while another one waits on a slow query."""
+    with api.session_factory() as db:
+        db.add(User(name="Alice Green", email="alice@example.com", role="client", password="hash"))
+        db.commit()
+
+    def slow_updates(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE"):
+            time.sleep(0.5)
+
+    engine = api.session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", slow_updates)
+    headers = {"Authorization": f"Bearer {USER_TOKEN}"}
+
+    async def scenario():
+        finished = []
+
+        async def request(name, method, url, **kwargs):
+            response = await client.request(method, url, headers=headers, **kwargs)
+            assert response.status_code == 200, response.text
+            finished.append((name, time.perf_counter() - started))
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            started = time.perf_counter()
+            await asyncio.gather(
+                request("update", "PUT", "/api/v1/user/data/1", json={"name": "Alice Updated"}),
+                request("lookup", "POST", "/api/v1/user/data/batch", json={"user_ids": [1]}),
+            )
+        return finished
+
+    try:
+        finished = asyncio.run(scenario())
+    finally:
+        event.remove(engine, "before_cursor_execute", slow_updates)
+
+    # The lookup is answered while the update is still waiting on its query
+    assert [name for name, _ in finished] == ["lookup", "update"]
+    assert finished[0][1] < 0.25
+    assert finished[1][1] >= 0.5
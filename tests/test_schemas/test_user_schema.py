@@ -2,7 +2,7 @@ import pytest
 from datetime import datetime, timedelta
 from pydantic import ValidationError
 from typing import Any, Dict
-from models.schemas.user_schemas import CreateUserSchema
+from models.schemas.user_schemas import CreateUserSchema, MAX_BATCH_USER_IDS, UserBatchLookupSchema
 
 @pytest.fixture
 def valid_user_data() -> Dict[str, Any]:
@@ -99,3 +99,17 @@ class TestCreateUserSchema:
         assert isinstance(user.created_at, (datetime, type(None)))
         assert isinstance(user.updated_at, (datetime, type(None)))
 
+
+class TestUserBatchLookupSchema:
+    def test_valid_lookup(self):
+        lookup = UserBatchLookupSchema(user_ids=[3, 1, 3])
+        assert lookup.user_ids == [3, 1, 3]
+
+    def test_empty_lookup(self):
+        with pytest.raises(ValidationError):
+            UserBatchLookupSchema(user_ids=[])
+
+    def test_too_many_ids(self):
+        UserBatchLookupSchema(user_ids=list(range(MAX_BATCH_USER_IDS)))
+        with pytest.raises(ValidationError):
+            UserBatchLookupSchema(user_ids=list(range(MAX_BATCH_USER_IDS + 1)))
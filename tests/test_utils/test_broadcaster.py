@@ -0,0 +1,51 @@
+import asyncio
+from utils.broadcaster import Broadcaster
+
+
+def test_events_reach_every_subscriber():
+    """Test that each subscriber gets every event, in order."""
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=4)
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        for event in ("a", "b"):
+            broadcaster.publish(event)
+        return [await first.get(), await first.get()], [await second.get(), await second.get()], broadcaster.stats()
+
+    first, second, stats = asyncio.run(scenario())
+
+    assert first == second == ["a", "b"]
+    assert stats == {"subscribers": 2, "published": 2, "dropped": 0}
+
+def test_slow_subscriber_is_dropped_without_blocking_the_others():
+    """Test that a full queue drops its subscriber, which then sees the end of the stream."""
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=2)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        received = []
+        for event in range(4):
+            broadcaster.publish(event)
+            received.append(await fast.get())
+        return received, [event async for event in slow], slow.dropped, broadcaster.stats()
+
+    received, slow_events, dropped, stats = asyncio.run(scenario())
+
+    assert received == [0, 1, 2, 3]
+    # The close marker replaced the oldest queued event
+    assert slow_events == [1]
+    assert dropped
+    assert stats == {"subscribers": 1, "published": 4, "dropped": 1}
+
+def test_closed_subscription_stops_receiving():
+    """Test that a closed subscription is forgotten and get() can time out."""
+    async def scenario():
+        broadcaster = Broadcaster()
+        with broadcaster.subscribe() as subscription:
+            assert len(broadcaster) == 1
+            try:
+                await subscription.get(timeout=0.01)
+            except asyncio.TimeoutError:
+                timed_out = True
+        broadcaster.publish("ignored")
+        return timed_out, len(broadcaster)
+
+    assert asyncio.run(scenario()) == (True, 0)
@@ -0,0 +1,87 @@
+import stat
+from pathlib import Path
+import pytest
+from jinja2 import UndefinedError
+from utils.email_templates import EmailTemplates, minify_html
+from utils.private_dir import is_private_dir
+
+TEMPLATE_FOLDER = Path(__file__).resolve().parents[2] / "email_templates"
+
+
+@pytest.fixture(scope="function")
+def templates(tmp_path):
+    """Provide templates compiled into a fresh bytecode cache."""
+    templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=str(tmp_path / "cache"))
+    templates.warm()
+    return templates
+
+def test_warm_compiles_every_template(tmp_path):
+    """Test that warming compiles both templates and fills the bytecode cache."""
+    cache_dir = tmp_path / "cache"
+    templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=str(cache_dir))
+
+    assert templates.warm() == ["certificate_review.html", "verification_email.html"]
+    assert len(list(cache_dir.iterdir())) == 2
+
+def test_render_needs_no_template_io_after_warm(templates, monkeypatch):
+    """Test that rendering uses the compiled templates without asking the loader again."""
+    def fail(*args):
+        raise AssertionError("template loaded again")
+
+    monkeypatch.setattr(templates.env.loader, "get_source", fail)
+    rendered = templates.render(
+        "verification_email.html", {"name": "Alice", "code": "482913"}, subject="Welcome, {{ name }}"
+    )
+
+    assert rendered.subject == "Welcome, Alice"
+    assert "482913" in rendered.html
+    assert "Alice" in rendered.html
+
+def test_missing_variables_raise(templates):
+    """Test that an undefined variable is an error rather than an empty string."""
+    with pytest.raises(UndefinedError):
+        templates.render("verification_email.html", {"name": "Alice"})
+
+def test_values_are_escaped(templates):
+    """Test that user-supplied values cannot inject HTML, while subjects stay plain text."""
+    rendered = templates.render(
+        "verification_email.html", {"name": "<b>Al & Co</b>", "code": "1"}, subject="Hi {{ name }}"
+    )
+
+    assert "&lt;b&gt;Al &amp; Co&lt;/b&gt;" in rendered.html
+    assert rendered.subject == "Hi <b>Al & Co</b>"
+
+def test_minified_templates_render_the_same_content(tmp_path):
+    """Test that minified templates are smaller and keep their content."""
+    context = {"name": "Alice", "status": "rejected", "reason": "Blurry scan"}
+    plain = EmailTemplates(TEMPLATE_FOLDER).render("certificate_review.html", context)
+    minified = EmailTemplates(TEMPLATE_FOLDER, minify=True).render("certificate_review.html", context)
+
+    assert len(minified.html) < len(plain.html) * 0.8
+    assert "\n" not in minified.html
+    assert "<!--" not in minified.html
+    assert "Blurry scan" in minified.html
+
+def test_minify_html_keeps_inline_text():
+    """Test that text spread over lines is joined with a single space."""
+    source = "<p>\n    Hello,\n    <b>Alice</b>\n</p>\n<!-- note -->\n<p>Bye</p>"
+    assert minify_html(source) == "<p> Hello, <b>Alice</b></p><p>Bye</p>"
+
+def test_cache_dir_must_be_private(tmp_path):
+    """Test that a cache folder others can write to is not used, so no one can plant bytecode."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=str(shared))
+    assert templates.env.bytecode_cache is None
+    templates.warm()
+    assert not list(shared.iterdir())
+
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "cache")
+    (tmp_path / "cache").mkdir(mode=0o700)
+    assert not is_private_dir(str(link), "tests")
+
+    created = tmp_path / "created"
+    assert is_private_dir(str(created), "tests")
+    assert stat.S_IMODE(created.stat().st_mode) & 0o077 == 0
@@ -0,0 +1,24 @@
+from utils.etag import etag_matches, weak_etag
+
+
+def test_weak_etag_depends_on_every_part():
+    """Test that equal parts give equal tags and any change gives a new one."""
+    etag = weak_etag(1, "2026-01-01T00:00:00")
+
+    assert etag == weak_etag(1, "2026-01-01T00:00:00")
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag != weak_etag(1, "2026-01-01T00:00:01")
+    assert etag != weak_etag(2, "2026-01-01T00:00:00")
+    assert weak_etag("a", "bc") != weak_etag("ab", "c")
+
+def test_if_none_match_uses_weak_comparison():
+    """Test lists, wildcards and strong forms of the same tag."""
+    etag = 'W/"abc"'
+
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"old", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"old"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+from utils.invalidation_bus import FakePubSub, InvalidationBus, PubSubTransport, UnixDatagramTransport, default_socket_dir
+from utils.profile_cache import PROFILE_MISS, CachedProfile, ProfileCache
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+async def wait_for_events(events, count, timeout=2.0):
+    """Waits until a handler has recorded count events."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while len(events) < count:
+        assert asyncio.get_running_loop().time() < deadline, "invalidation not delivered"
+        await asyncio.sleep(0.001)
+
+def test_unix_transport_reaches_the_other_workers(tmp_path):
+    """Test that an event reaches every other socket in the directory, but not its sender."""
+    async def scenario():
+        buses = [
+            InvalidationBus([UnixDatagramTransport(str(tmp_path), f"worker-{index}.sock")], origin=f"worker-{index}")
+            for index in range(3)
+        ]
+        events = {bus.origin: [] for bus in buses}
+        for bus in buses:
+            bus.subscribe(lambda user_ids, origin=bus.origin: events[origin].append(user_ids))
+            await bus.start()
+        try:
+            buses[0].publish_users_changed({7, 3})
+            await wait_for_events(events["worker-1"], 1)
+            await wait_for_events(events["worker-2"], 1)
+            await asyncio.sleep(0.01)
+            return events, [bus.stats() for bus in buses]
+        finally:
+            for bus in buses:
+                await bus.stop()
+
+    events, stats = asyncio.run(scenario())
+
+    assert events == {"worker-0": [], "worker-1": [[3, 7]], "worker-2": [[3, 7]]}
+    assert stats[0]["published"] == 1
+    assert stats[1]["received"] == 1
+    assert 0 <= stats[1]["last_lag_ms"] < 1000
+    assert stats[1]["max_lag_ms"] == stats[1]["mean_lag_ms"] == stats[1]["last_lag_ms"]
+    assert list(tmp_path.iterdir()) == []
+
+def test_sockets_of_dead_workers_are_removed(tmp_path):
+    """Test that publishing cleans up a socket file nobody is bound to."""
+    async def scenario():
+        dead = UnixDatagramTransport(str(tmp_path), "dead.sock")
+        await dead.start(lambda payload: None)
+        # A worker killed without closing leaves its socket file behind
+        dead._loop.remove_reader(dead._socket.fileno())
+        dead._socket.close()
+
+        bus = InvalidationBus([UnixDatagramTransport(str(tmp_path), "live.sock")])
+        await bus.start()
+        try:
+            bus.publish_users_changed([1])
+        finally:
+            await bus.stop()
+
+    asyncio.run(scenario())
+    assert list(tmp_path.iterdir()) == []
+
+def run_worker(directory, ready, received):
+    """A second worker process: report the first event it receives."""
+    async def scenario():
+        bus = InvalidationBus([UnixDatagramTransport(directory, "child.sock")], origin="child")
+        done = asyncio.Event()
+        bus.subscribe(lambda user_ids: (received.send(list(user_ids)), done.set()))
+        await bus.start()
+        ready.set()
+        try:
+            await asyncio.wait_for(done.wait(), 5)
+        finally:
+            await bus.stop()
+
+    asyncio.run(scenario())
+
+def test_unix_transport_crosses_processes(tmp_path):
+    """Test that a worker in another process applies the event."""
+    context = multiprocessing.get_context("fork")
+    ready = context.Event()
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=run_worker, args=(str(tmp_path), ready, sender))
+    child.start()
+    try:
+        assert ready.wait(5)
+
+        async def scenario():
+            bus = InvalidationBus([UnixDatagramTransport(str(tmp_path), "parent.sock")], origin="parent")
+            await bus.start()
+            try:
+                bus.publish_users_changed([42])
+            finally:
+                await bus.stop()
+
+        asyncio.run(scenario())
+        assert receiver.poll(5)
+        assert receiver.recv() == [42]
+    finally:
+        child.join(5)
+    assert child.exitcode == 0
+
+def test_pubsub_transport_reaches_other_hosts():
+    """Test that buses sharing a pub/sub server hear each other, and not themselves."""
+    async def scenario():
+        server = FakePubSub()
+        buses = [InvalidationBus([PubSubTransport(server)], origin=f"host-{index}") for index in range(2)]
+        events = {bus.origin: [] for bus in buses}
+        for bus in buses:
+            bus.subscribe(lambda user_ids, origin=bus.origin: events[origin].append(user_ids))
+            await bus.start()
+        try:
+            buses[0].publish_users_changed([5])
+            buses[1].publish_users_changed([6])
+            await wait_for_events(events["host-0"], 1)
+            await wait_for_events(events["host-1"], 1)
+            await asyncio.sleep(0.01)
+            return events, buses[0].stats()
+        finally:
+            for bus in buses:
+                await bus.stop()
+
+    events, stats = asyncio.run(scenario())
+
+    assert events == {"host-0": [[6]], "host-1": [[5]]}
+    assert stats["published"] == stats["received"] == 1
+
+def test_unstarted_bus_and_bad_messages_are_ignored(caplog):
+    """Test that publishing before start() and malformed messages do nothing."""
+    bus = InvalidationBus([PubSubTransport(FakePubSub())])
+    events = []
+    bus.subscribe(events.append)
+
+    bus.publish_users_changed([1])
+    bus._deliver(b"not json")
+    bus._deliver(b'{"origin": "other"}')
+
+    assert events == []
+    assert bus.stats()["published"] == bus.stats()["received"] == 0
+    assert "malformed invalidation" in caplog.text
+
+def test_default_configuration_keeps_worker_caches_in_sync(tmp_path, monkeypatch):
+    """Test that, with nothing configured, workers share a private socket dir and evict each other's profiles."""
+    env = {key: value for key, value in os.environ.items() if key != "INVALIDATION_BUS_SOCKET_DIR"}
+    env["XDG_RUNTIME_DIR"] = str(tmp_path)
+    configured = subprocess.run(
+        [sys.executable, "-c", "from utils.invalidation_bus import invalidation_bus; "
+                               "print([transport.directory for transport in invalidation_bus.transports])"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert configured.stdout.strip() == repr([str(tmp_path / "mk_invalidation")])
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+    async def scenario():
+        buses = [
+            InvalidationBus([UnixDatagramTransport(default_socket_dir(), f"worker-{index}.sock")])
+            for index in range(2)
+        ]
+        caches = [ProfileCache(max_entries=10) for _ in buses]
+        events = []
+        for bus, cache in zip(buses, caches):
+            bus.subscribe(cache.invalidate)
+            await bus.start()
+        buses[1].subscribe(events.append)
+        try:
+            caches[1].set(7, CachedProfile({"user_id": 7}, 'W/"1"'))
+            buses[0].publish_users_changed([7])
+            await wait_for_events(events, 1)
+            return [bus.connected for bus in buses], caches[1].get(7)
+        finally:
+            for bus in buses:
+                await bus.stop()
+
+    connected, cached = asyncio.run(scenario())
+
+    assert connected == [True, True]
+    assert cached is PROFILE_MISS
+    assert (tmp_path / "mk_invalidation").stat().st_mode & 0o777 == 0o700
+
+def test_socket_dir_others_can_write_to_is_refused(tmp_path, caplog):
+    """Test that a shared socket dir leaves the bus disconnected instead of trusting it."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+
+    async def scenario():
+        bus = InvalidationBus([UnixDatagramTransport(str(shared))])
+        await bus.start()
+        try:
+            bus.publish_users_changed([1])
+            return bus.connected
+        finally:
+            await bus.stop()
+
+    assert asyncio.run(scenario()) is False
+    assert list(shared.iterdir()) == []
+    assert "failed to start" in caplog.text
@@ -0,0 +1,72 @@
+import pytest
+from utils.lru_cache import LRUTTLCache
+
+
+class FakeClock:
+    """A clock the tests move forward by hand."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(scope="function")
+def clock():
+    return FakeClock()
+
+def test_get_and_set(clock):
+    """Test that stored values are returned and counted as hits."""
+    cache = LRUTTLCache(max_entries=2, clock=clock)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.hit_ratio == 0.5
+
+def test_least_recently_used_entry_is_evicted(clock):
+    """Test that the least recently used entry goes first when the cache is full."""
+    cache = LRUTTLCache(max_entries=2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+def test_entries_expire(clock):
+    """Test that entries are not returned once their TTL has passed."""
+    cache = LRUTTLCache(max_entries=10, default_ttl=30, clock=clock)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 25
+    assert cache.get("default") is None
+    assert len(cache) == 0
+
+def test_pop_and_clear(clock):
+    """Test removing a single entry and clearing the cache."""
+    cache = LRUTTLCache(max_entries=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == cache.evictions == 0
+
+def test_invalid_size():
+    """Test that a cache must hold at least one entry."""
+    with pytest.raises(ValueError):
+        LRUTTLCache(max_entries=0)
@@ -0,0 +1,18 @@
+from datetime import datetime
+import pytest
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the position it was made from."""
+    position = (datetime(2026, 3, 14, 15, 9, 26, 535897), 42)
+    token = encode_cursor(*position)
+
+    assert "=" not in token
+    assert decode_cursor(token) == position
+
+@pytest.mark.parametrize("token", ["", "not a cursor!", "bm90IGpzb24", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_rejected(token):
+    """Test that malformed or truncated cursors raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(token)
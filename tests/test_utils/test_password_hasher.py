@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utils.password_hasher import PasswordHasher
+
+
+@pytest.fixture(scope="function")
+def hasher():
+    """Provide a thread-pool PasswordHasher and shut it down afterwards."""
+    password_hasher = PasswordHasher(executor_type="thread", max_workers=2, queue_limit=2)
+    yield password_hasher
+    password_hasher.shutdown()
+
+def test_hash_and_verify(hasher):
+    """Test that a hashed password verifies, and a wrong password does not."""
+    async def scenario():
+        hashed = await hasher.hash("password123")
+        return (
+            hashed,
+            await hasher.verify("password123", hashed),
+            await hasher.verify("wrongpassword", hashed),
+        )
+
+    hashed, valid, invalid = asyncio.run(scenario())
+
+    assert hashed != "password123"
+    assert valid is True
+    assert invalid is False
+    assert hasher.pending == 0
+
+def test_process_pool_hash_and_verify():
+    """Test that hashing also works in a process pool."""
+    hasher = PasswordHasher(executor_type="process", max_workers=1, queue_limit=1)
+
+    async def scenario():
+        hashed = await hasher.hash("password123")
+        return await hasher.verify("password123", hashed)
+
+    try:
+        assert asyncio.run(scenario()) is True
+    finally:
+        hasher.shutdown()
+
+def test_full_queue_fails_fast():
+    """Test that calls beyond the workers and queue limit are rejected with 503."""
+    hasher = PasswordHasher(executor_type="thread", max_workers=1, queue_limit=1)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(hasher.hash("password123") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert rejected[0].headers == {"Retry-After": "1"}
+
+def test_invalid_executor_type():
+    """Test that an unknown executor type is rejected."""
+    with pytest.raises(ValueError, match="Invalid executor_type"):
+        PasswordHasher(executor_type="greenlet")
@@ -0,0 +1,78 @@
+from utils.profile_cache import PROFILE_MISS, CachedProfile, ProfileCache
+
+PROFILE = CachedProfile({"user_id": 1, "user_name": "Alice Green"}, 'W/"1"')
+
+
+class FakeClock:
+    """A settable clock for TTL tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_profiles_and_missing_users_are_cached():
+    """Test that found and missing users are both served from the cache."""
+    cache = ProfileCache(max_entries=10)
+    assert cache.get(1) is PROFILE_MISS
+
+    cache.set(1, PROFILE)
+    cache.set(2, None)
+
+    assert cache.get(1) == PROFILE
+    assert cache.get(2) is None
+    assert cache.stats() == {
+        "size": 2, "max_entries": 10, "hits": 2, "misses": 1, "evictions": 0,
+        "hit_ratio": 2 / 3, "negative_hits": 1,
+    }
+
+def test_missing_users_expire_sooner():
+    """Test that the negative cache uses its own, shorter TTL."""
+    clock = FakeClock()
+    cache = ProfileCache(max_entries=10, ttl=300, negative_ttl=30, clock=clock)
+    cache.set(1, PROFILE)
+    cache.set(2, None)
+
+    clock.now = 31
+    assert cache.get(2) is PROFILE_MISS
+    assert cache.get(1) == PROFILE
+    clock.now = 301
+    assert cache.get(1) is PROFILE_MISS
+
+def test_least_recently_used_profile_is_evicted():
+    """Test that the cache stays within max_entries."""
+    cache = ProfileCache(max_entries=2)
+    cache.set(1, PROFILE)
+    cache.set(2, PROFILE)
+    cache.get(1)
+    cache.set(3, PROFILE)
+
+    assert len(cache) == 2
+    assert cache.get(2) is PROFILE_MISS
+    assert cache.get(1) == PROFILE
+
+def test_invalidate_drops_profiles_and_stale_fills():
+    """Test that a profile loaded before an invalidation is not cached after it."""
+    cache = ProfileCache(max_entries=10)
+    cache.set(1, PROFILE)
+    generation = cache.generation
+
+    cache.invalidate([1])
+    assert cache.get(1) is PROFILE_MISS
+
+    cache.set(1, PROFILE, generation)
+    assert cache.get(1) is PROFILE_MISS
+    cache.set(1, PROFILE, cache.generation)
+    assert cache.get(1) == PROFILE
+
+def test_disabled_cache_always_misses():
+    """Test that disable() drops the cached profiles and ignores later fills."""
+    cache = ProfileCache(max_entries=10)
+    cache.set(1, PROFILE)
+
+    cache.disable()
+    cache.set(2, PROFILE)
+
+    assert cache.get(1) is PROFILE_MISS
+    assert cache.get(2) is PROFILE_MISS
+    assert len(cache) == 0
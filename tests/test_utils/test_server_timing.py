@@ -0,0 +1,102 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from logic.auth.auth_logic import login_user
+from middleware.server_timing import ServerTimingMiddleware
+from models.models import Base, User
+from models.schemas.login_user_schema import LoginUserSchemas
+from utils.server_timing import _NULL_SPAN, RequestTimings, collect_timings, install_db_timing, timed
+
+
+@pytest.fixture(scope="function")
+def engine():
+    """Create an in-memory database with one user, whose password hash is cheap to check."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(
+            name="Timed User",
+            email="timed@example.com",
+            role="client",
+            password=bcrypt.using(rounds=4).hash("password123"),
+        ))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+def build_app(engine, header: bool, log: bool) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, header=header, log=log)
+
+    @app.post("/login")
+    async def login(user_data: LoginUserSchemas):
+        with Session(engine) as db:
+            return await login_user(user_data, db)
+
+    return app
+
+def test_spans_are_summed_by_name_and_free_outside_a_request():
+    """Test that spans only record inside collect_timings, and add up per name."""
+    assert timed("db") is _NULL_SPAN
+
+    with collect_timings() as timings:
+        for _ in range(2):
+            with timed("db"):
+                pass
+        with timed("jwt"):
+            pass
+
+    assert timings.counts == {"db": 2, "jwt": 1}
+    assert timed("db") is _NULL_SPAN
+
+    fixed = RequestTimings()
+    fixed.add("db", 0.0012)
+    fixed.add("db", 0.0008)
+    fixed.add("bcrypt", 0.25)
+    assert fixed.header(total=0.3) == 'db;dur=2.000;desc="2 calls", bcrypt;dur=250.000;desc="1 call", total;dur=300.000'
+    assert fixed.fields() == {"db_ms": 2.0, "db_count": 2, "bcrypt_ms": 250.0, "bcrypt_count": 1}
+
+def test_login_reports_db_bcrypt_and_jwt_time(engine, caplog):
+    """Test that a login carries a Server-Timing header and a log record with its breakdown."""
+    client = TestClient(build_app(engine, header=True, log=True))
+
+    with caplog.at_level(logging.INFO, logger="utils.server_timing"):
+        response = client.post("/login", json={"email": "timed@example.com", "password": "password123"})
+
+    assert response.status_code == 200
+    metrics = [metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")]
+    assert {"db", "bcrypt", "jwt", "total"} <= set(metrics)
+
+    [record] = caplog.records
+    assert record.timing["path"] == "/login"
+    assert record.timing["status"] == 200
+    assert record.timing["bcrypt_count"] == 1
+    assert record.timing["jwt_count"] == 1
+    assert record.timing["db_count"] >= 1
+
+def test_header_can_be_switched_off(engine, caplog):
+    """Test that header=False keeps the timings out of the response but still logs them."""
+    client = TestClient(build_app(engine, header=False, log=True))
+
+    with caplog.at_level(logging.INFO, logger="utils.server_timing"):
+        response = client.post("/login", json={"email": "timed@example.com", "password": "wrong-password"})
+
+    assert response.status_code == 401
+    assert "server-timing" not in response.headers
+    assert caplog.records[0].timing["status"] == 401
+
+def test_failed_statement_is_timed_and_not_left_open(engine):
+    """Test that a statement that raises still ends its db span."""
+    install_db_timing()
+    with collect_timings() as timings, engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert not conn.info["query_started"]
+
+    assert timings.counts["db"] == 2
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    """Test that callers of one key wait for a single call, and other keys get their own."""
+    started = []
+
+    async def load(key):
+        started.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do(key, load, key) for key in ("a", "a", "a", "b")))
+        return results, flight.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert started == ["a", "b"]
+    assert results[0] is results[1] is results[2]
+    assert results[3] == {"key": "b"}
+    assert stats == {"in_flight": 0, "calls": 2, "shared": 2}
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    """Test that a failed call raises for all of its callers and the next call starts afresh."""
+    attempts = []
+
+    async def load():
+        attempts.append(None)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise ConnectionError("database went away")
+        return "ok"
+
+    async def scenario():
+        flight = SingleFlight()
+        failures = await asyncio.gather(flight.do("key", load), flight.do("key", load), return_exceptions=True)
+        return failures, await flight.do("key", load)
+
+    failures, retried = asyncio.run(scenario())
+
+    assert [type(failure) for failure in failures] == [ConnectionError, ConnectionError]
+    assert retried == "ok"
+    assert len(attempts) == 2
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    """Test that the other callers still get the result when the caller that started it gives up."""
+    async def load():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "ok"
@@ -0,0 +1,131 @@
+import asyncio
+import socket
+import pytest
+from fastapi_mail import ConnectionConfig, MessageSchema, MessageType
+from utils.smtp_pool import PooledFastMail
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+
+class SinkHandler:
+    """aiosmtpd handler that accepts every message, optionally dropping the channel once."""
+
+    def __init__(self):
+        self.recipients = []
+        self.sessions = set()
+        self.close_next = False
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.close_next:
+            self.close_next = False
+            return "421 Service closing transmission channel"
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture(scope="function")
+def smtp_sink():
+    """Run a local SMTP server that records recipients."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+def make_mailer(port, **pool_options):
+    """Build a pooled mailer for the local SMTP server."""
+    return PooledFastMail(ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    ), **pool_options)
+
+def message(recipient):
+    return MessageSchema(subject="Hello", recipients=[recipient], body="<p>Hi</p>", subtype=MessageType.html)
+
+def send_all(mailer, recipients, concurrently=False):
+    """Sends one message per recipient, then closes the pool."""
+    async def scenario():
+        if concurrently:
+            await asyncio.gather(*(mailer.send_message(message(recipient)) for recipient in recipients))
+        else:
+            for recipient in recipients:
+                await mailer.send_message(message(recipient))
+        await mailer.close()
+
+    asyncio.run(scenario())
+
+def test_sequential_messages_reuse_one_connection(smtp_sink):
+    """Test that a burst of messages is sent over a single SMTP session."""
+    handler, port = smtp_sink
+    mailer = make_mailer(port, size=2)
+    recipients = [f"user{i}@example.com" for i in range(5)]
+
+    send_all(mailer, recipients)
+
+    assert handler.recipients == recipients
+    assert mailer.pool.created == 1
+    assert len(handler.sessions) == 1
+
+def test_concurrent_messages_are_bounded_by_pool_size(smtp_sink):
+    """Test that concurrent sends never open more than size connections."""
+    handler, port = smtp_sink
+    mailer = make_mailer(port, size=2)
+
+    send_all(mailer, [f"user{i}@example.com" for i in range(10)], concurrently=True)
+
+    assert len(handler.recipients) == 10
+    assert mailer.pool.created <= 2
+    assert len(mailer.pool) == 0
+
+def test_idle_connections_are_replaced(smtp_sink):
+    """Test that a connection idle past idle_timeout is closed rather than reused."""
+    handler, port = smtp_sink
+    mailer = make_mailer(port, idle_timeout=0.05, health_check_interval=0.0)
+
+    async def scenario():
+        await mailer.send_message(message("first@example.com"))
+        await asyncio.sleep(0.1)
+        await mailer.send_message(message("second@example.com"))
+        await mailer.close()
+
+    asyncio.run(scenario())
+    assert handler.recipients == ["first@example.com", "second@example.com"]
+    assert mailer.pool.created == 2
+
+def test_lost_pooled_connection_is_retried_on_a_new_one(smtp_sink):
+    """Test that a 421 on a reused connection resends the message over a fresh connection."""
+    handler, port = smtp_sink
+    mailer = make_mailer(port)
+
+    async def scenario():
+        await mailer.send_message(message("first@example.com"))
+        handler.close_next = True
+        await mailer.send_message(message("second@example.com"))
+        await mailer.close()
+
+    asyncio.run(scenario())
+    assert handler.recipients == ["first@example.com", "second@example.com"]
+    assert mailer.pool.created == 2
+
+def test_suppressed_sends_never_connect(smtp_sink):
+    """Test that SUPPRESS_SEND still dispatches messages without opening connections."""
+    _, port = smtp_sink
+    mailer = make_mailer(port)
+    mailer.config.SUPPRESS_SEND = 1
+
+    with mailer.record_messages() as outbox:
+        send_all(mailer, ["user@example.com"])
+
+    assert len(outbox) == 1
+    assert mailer.pool.created == 0
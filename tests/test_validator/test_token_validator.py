@@ -0,0 +1,78 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from validator import token_validator
+from validator.token_validator import decode_token, token_claims_cache, validate_admin_token, validate_user_token
+
+
+def make_token(role="client", expires_in=60, **claims):
+    """Encodes a token with the validator's secret and algorithm."""
+    payload = {"sub": "user@example.com", "role": role, "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(payload, str(token_validator.SECRET_KEY), algorithm=token_validator.ALGORITHM)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and finish every test with an empty claims cache."""
+    token_claims_cache.clear()
+    yield
+    token_claims_cache.clear()
+
+def test_repeated_token_is_decoded_once(monkeypatch):
+    """Test that a token seen before is served from the cache."""
+    token = make_token()
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(token_validator.jwt, "decode", lambda *args, **kwargs: calls.append(1) or real_decode(*args, **kwargs))
+
+    for _ in range(5):
+        assert asyncio.run(validate_user_token(token))["sub"] == "user@example.com"
+
+    assert len(calls) == 1
+    assert token_claims_cache.hits == 4
+    assert token_claims_cache.misses == 1
+
+def test_cached_token_expires_with_exp(monkeypatch):
+    """Test that cached claims are not served past the token's exp."""
+    token = make_token(expires_in=30)
+    decode_token(token)
+
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(token_validator.jwt, "decode", lambda *args, **kwargs: calls.append(1) or real_decode(*args, **kwargs))
+    real_time = time.time
+    monkeypatch.setattr(token_claims_cache, "clock", lambda: real_time() + 31)
+
+    decode_token(token)
+
+    # The cache entry expired, so the token went back through jwt.decode
+    assert len(calls) == 1
+    assert token_claims_cache.misses == 2
+
+def test_expired_token_is_rejected():
+    """Test that an expired token is rejected and never cached."""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_user_token(make_token(expires_in=-10)))
+
+    assert exc_info.value.status_code == 401
+    assert len(token_claims_cache) == 0
+
+def test_invalid_token_is_not_cached():
+    """Test that invalid tokens are rejected and never stored."""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_user_token("not-a-token"))
+
+    assert exc_info.value.status_code == 401
+    assert len(token_claims_cache) == 0
+
+def test_admin_role_is_checked_on_cache_hit():
+    """Test that a cached non-admin token is still refused admin access."""
+    admin_token = make_token(role="Admin")
+    client_token = make_token(role="client")
+    decode_token(client_token)
+
+    assert asyncio.run(validate_admin_token(admin_token))["role"] == "Admin"
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_admin_token(client_token))
+    assert exc_info.value.status_code == 403
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Events a subscriber may fall behind by before it is dropped
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", 256))
+
+# Put in a dropped subscriber's queue to end its iteration
+_CLOSED = object()
+
+
+class Subscription:
+    """
+    One subscriber's bounded queue of events.
+
+    Iterate with `async for`, or call get(), until the broadcaster drops the
+    subscriber for falling too far behind, and close the subscription when
+    done with it.
+
+    Attributes:
+        dropped (bool): Whether the broadcaster dropped this subscriber.
+    """
+
+    def __init__(self, broadcaster: "Broadcaster", queue_size: int):
+        self.broadcaster = broadcaster
+        self.dropped = False
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def _offer(self, event) -> bool:
+        """Queues an event without waiting. Returns False if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _drop(self):
+        """Ends the subscription, making room for the close marker if needed."""
+        self.dropped = True
+        while True:
+            try:
+                self._queue.put_nowait(_CLOSED)
+                return
+            except asyncio.QueueFull:
+                self._queue.get_nowait()
+
+    async def get(self, timeout: float | None = None):
+        """
+        Waits for the next event.
+
+        Args:
+            timeout (float, optional): Seconds to wait before raising asyncio.TimeoutError.
+
+        Returns:
+            The event, or None once the broadcaster has dropped the subscription.
+        """
+        event = await asyncio.wait_for(self._queue.get(), timeout)
+        return None if event is _CLOSED else event
+
+    def close(self):
+        """Unsubscribes. Safe to call more than once."""
+        self.broadcaster._subscribers.discard(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Broadcaster:
+    """
+    Fans events out to every subscriber of this worker process.
+
+    Publishing never waits: each subscriber has a bounded queue, and a
+    subscriber whose queue is full is dropped rather than slowing the
+    publisher or the other subscribers. A dropped subscriber should start
+    over from a fresh snapshot. Subscribers do no work until an event
+    arrives, so idle subscriptions cost nothing but memory.
+
+    Publish and subscribe on the event loop's thread.
+
+    Args:
+        queue_size (int): The events a subscriber may fall behind by.
+
+    Attributes:
+        published (int): Events published.
+        dropped (int): Subscribers dropped for falling behind.
+    """
+
+    def __init__(self, queue_size: int = BROADCAST_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self._subscribers = set()
+
+    def subscribe(self) -> Subscription:
+        """Returns a new subscription; close it, or use it as a context manager, when done."""
+        subscription = Subscription(self, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def publish(self, event):
+        """
+        Queues an event for every subscriber, dropping those that are full.
+
+        Args:
+            event: The event, not None, shared by every subscriber and not to be mutated.
+        """
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if not subscription._offer(event):
+                self._subscribers.discard(subscription)
+                subscription._drop()
+                self.dropped += 1
+                logger.warning("Dropped a subscriber %d events behind", self.queue_size)
+
+    def stats(self) -> dict:
+        """Returns the subscriber count and counters, for metrics endpoints and logs."""
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+    def __len__(self):
+        return len(self._subscribers)
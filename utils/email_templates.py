@@ -0,0 +1,135 @@
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+from dotenv import load_dotenv
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, select_autoescape
+from utils.private_dir import is_private_dir
+
+load_dotenv()
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Email template settings
+EMAIL_TEMPLATE_FOLDER = Path(os.getenv("EMAIL_TEMPLATE_FOLDER", BASE_DIR / "email_templates"))
+# Compiled bytecode is executed when loaded, so the folder must be private to
+# this user. The default is one folder per user in the temp dir, which is
+# refused, like any other, if someone else created it first.
+EMAIL_TEMPLATE_CACHE_DIR = os.getenv(
+    "EMAIL_TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), f"mk_email_templates-{os.getuid()}")
+)
+EMAIL_TEMPLATE_MINIFY = os.getenv("EMAIL_TEMPLATE_MINIFY", "true").lower() in ("1", "true", "yes")
+
+# HTML comments, except Outlook's conditional comments
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# Indentation and line breaks between two tags
+BETWEEN_TAGS = re.compile(r">\s*\n\s*<")
+# Any other line break with its indentation
+LINE_BREAK = re.compile(r"\s*\n\s*")
+
+
+def minify_html(source: str) -> str:
+    """
+    Shrinks HTML by dropping comments and the indentation between lines.
+
+    Tags on separate lines are joined without a space, and text broken over
+    several lines is joined with one space, which renders the same.
+    """
+    source = HTML_COMMENT.sub("", source)
+    source = BETWEEN_TAGS.sub("><", source)
+    return LINE_BREAK.sub(" ", source).strip()
+
+
+class MinifyingLoader(FileSystemLoader):
+    """FileSystemLoader that minifies template sources before they are compiled."""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_html(source), filename, uptodate
+
+
+class RenderedEmail(NamedTuple):
+    """A rendered email, ready for the sender."""
+
+    subject: str
+    html: str
+
+
+class EmailTemplates:
+    """
+    Renders the email templates from compiled, in-memory Jinja templates.
+
+    warm() compiles every template once, normally at startup. The compiled
+    code is also written to a bytecode cache, so the next worker or restart
+    skips parsing. After that, render() does no file I/O and no parsing:
+    auto-reload is off, so Jinja never checks the files again.
+
+    Variables missing from the context raise instead of rendering as empty
+    strings, and values are HTML-escaped. With minify, the HTML is minified
+    once when a template is loaded rather than on every render.
+
+    Args:
+        folder (str | Path): The folder holding the templates.
+        cache_dir (str, optional): Where to keep compiled bytecode. None disables the cache,
+            as does a folder that is not private to this user (see utils.private_dir).
+        minify (bool): Whether to minify template sources.
+
+    Attributes:
+        env (Environment): The Jinja environment.
+    """
+
+    def __init__(self, folder, cache_dir: str | None = None, minify: bool = False):
+        loader_class = MinifyingLoader if minify else FileSystemLoader
+        bytecode_cache = None
+        if cache_dir is not None and is_private_dir(cache_dir, "compiled email templates"):
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.env = Environment(
+            loader=loader_class(folder),
+            bytecode_cache=bytecode_cache,
+            undefined=StrictUndefined,
+            autoescape=select_autoescape(["html"], default_for_string=False),
+            auto_reload=False,
+        )
+        self._templates = {}
+        self._subjects = {}
+
+    def warm(self) -> list:
+        """
+        Compiles every HTML template in the folder.
+
+        Returns:
+            list: The names of the compiled templates.
+        """
+        for name in self.env.list_templates(extensions=["html"]):
+            self._templates[name] = self.env.get_template(name)
+        return sorted(self._templates)
+
+    def render(self, template_name: str, context: dict, subject: str = "") -> RenderedEmail:
+        """
+        Renders an email.
+
+        Args:
+            template_name (str): The template in the folder, e.g. "verification_email.html".
+            context (dict): The template variables.
+            subject (str): The subject line, itself a template rendered with context.
+
+        Returns:
+            RenderedEmail: The rendered subject and HTML body.
+
+        Raises:
+            jinja2.TemplateNotFound: If there is no such template.
+            jinja2.UndefinedError: If the template uses a variable missing from context.
+        """
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self._templates[template_name] = self.env.get_template(template_name)
+        subject_template = self._subjects.get(subject)
+        if subject_template is None:
+            subject_template = self._subjects[subject] = self.env.from_string(subject)
+        return RenderedEmail(subject_template.render(context), template.render(context))
+
+# Templates shared by this worker process
+email_templates = EmailTemplates(
+    EMAIL_TEMPLATE_FOLDER, cache_dir=EMAIL_TEMPLATE_CACHE_DIR, minify=EMAIL_TEMPLATE_MINIFY
+)
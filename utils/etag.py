@@ -0,0 +1,35 @@
+import hashlib
+from typing import Optional
+
+
+def weak_etag(*parts) -> str:
+    """
+    Builds a weak ETag from the values that identify a representation.
+
+    Args:
+        *parts: Values whose string forms change whenever the representation does.
+
+    Returns:
+        The quoted weak ETag, such as W/"3f2a...".
+    """
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tells whether an If-None-Match header matches an ETag, by weak comparison.
+
+    Args:
+        if_none_match: The header value: *, or a comma-separated list of ETags.
+        etag: The current ETag of the representation.
+
+    Returns:
+        True if the client's copy is current and a 304 can be sent.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
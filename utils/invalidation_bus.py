@@ -0,0 +1,383 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+from dotenv import load_dotenv
+from utils.private_dir import is_private_dir
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+
+def default_socket_dir() -> str:
+    """
+    Returns the directory the workers on this host share when none is configured.
+
+    This is a folder in the user's runtime directory (XDG_RUNTIME_DIR) if
+    there is one, otherwise a folder per user in the temp dir.
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "mk_invalidation")
+    return os.path.join(tempfile.gettempdir(), f"mk_invalidation-{os.getuid()}")
+
+
+# Directory of the per-worker sockets of the host-local bus. An empty value
+# disables it, and with it the profile cache (see main.py).
+INVALIDATION_BUS_SOCKET_DIR = os.getenv("INVALIDATION_BUS_SOCKET_DIR", default_socket_dir())
+
+# Pub/sub channel the cross-host transport publishes on
+INVALIDATION_BUS_CHANNEL = os.getenv("INVALIDATION_BUS_CHANNEL", "mk:user-invalidation")
+
+
+class InvalidationTransport(ABC):
+    """Carries encoded invalidation messages between the workers of an InvalidationBus."""
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[bytes], None]):
+        """
+        Starts receiving messages on the running event loop.
+
+        Args:
+            deliver (callable): Called on the event loop with each message received.
+        """
+
+    @abstractmethod
+    def publish(self, payload: bytes):
+        """Sends a message to the other workers without blocking. Safe to call from any thread."""
+
+    @abstractmethod
+    async def close(self):
+        """Stops receiving and releases the transport's resources."""
+
+
+class UnixDatagramTransport(InvalidationTransport):
+    """
+    Reaches every worker on this host through Unix-domain datagram sockets.
+
+    Each worker binds one socket in a shared directory and publishes by
+    sending the message to every other socket there. A socket nobody is bound
+    to any more was left by a dead worker and is removed. A message that does
+    not fit in a receiver's socket buffer is dropped and counted, never waited on.
+    The directory must be private to this user, so that no one else can
+    listen in or swap a worker's socket for their own.
+
+    Args:
+        directory (str): The directory shared by the workers' sockets.
+        name (str, optional): The socket file name. Defaults to one built from the PID.
+
+    Attributes:
+        dropped (int): Messages not delivered because a receiver was full.
+    """
+
+    def __init__(self, directory: str, name: str | None = None):
+        self.directory = directory
+        self.path = os.path.join(directory, name or f"worker-{os.getpid()}.sock")
+        self.dropped = 0
+        self._socket = None
+        self._loop = None
+        self._deliver = None
+
+    async def start(self, deliver: Callable[[bytes], None]):
+        if not is_private_dir(self.directory, "invalidation sockets"):
+            raise PermissionError(f"{self.directory} is not private to this user")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        self._socket.setblocking(False)
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._socket.fileno(), self._receive)
+
+    def _receive(self):
+        """Delivers every datagram waiting on the socket."""
+        while True:
+            try:
+                payload = self._socket.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            self._deliver(payload)
+
+    def publish(self, payload: bytes):
+        if self._socket is None:
+            return
+        with os.scandir(self.directory) as entries:
+            peers = [entry.path for entry in entries if entry.name.endswith(".sock") and entry.path != self.path]
+        for peer in peers:
+            try:
+                self._socket.sendto(payload, peer)
+            except (BlockingIOError, InterruptedError):
+                self.dropped += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker bound to this socket has exited
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+
+    async def close(self):
+        if self._socket is None:
+            return
+        self._loop.remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class PubSubTransport(InvalidationTransport):
+    """
+    Reaches workers on every host through a pub/sub channel.
+
+    Any asyncio client exposing publish() and pubsub(), such as
+    redis.asyncio.Redis, works; FakePubSub stands in for tests. Messages
+    published before start() are dropped.
+
+    Args:
+        client: An asyncio pub/sub client.
+        channel (str): The channel shared by every worker.
+
+    Usage Example:
+        ```python
+        from redis.asyncio import Redis
+
+        invalidation_bus.add_transport(PubSubTransport(Redis.from_url("redis://localhost:6379/0")))
+        ```
+    """
+
+    def __init__(self, client, channel: str = INVALIDATION_BUS_CHANNEL):
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._reader = None
+        self._loop = None
+        self._pending = set()
+
+    async def start(self, deliver: Callable[[bytes], None]):
+        self._loop = asyncio.get_running_loop()
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._reader = asyncio.create_task(self._read(deliver))
+
+    async def _read(self, deliver: Callable[[bytes], None]):
+        """Delivers the channel's messages until cancelled."""
+        async for message in self._pubsub.listen():
+            if message.get("type") == "message":
+                deliver(message["data"])
+
+    def publish(self, payload: bytes):
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self.client.publish(self.channel, payload), self._loop)
+        self._pending.add(future)
+        future.add_done_callback(self._published)
+
+    def _published(self, future):
+        """Logs a failed publish and forgets the future."""
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Failed to publish an invalidation: %r", future.exception())
+
+    async def close(self):
+        if self._reader is None:
+            return
+        self._reader.cancel()
+        try:
+            await self._reader
+        except asyncio.CancelledError:
+            pass
+        await self._pubsub.unsubscribe(self.channel)
+        await self._pubsub.aclose()
+        self._reader = None
+        self._loop = None
+
+
+class FakePubSub:
+    """
+    In-process stand-in for an asyncio Redis client that only does pub/sub.
+
+    Several PubSubTransport instances sharing one FakePubSub behave like
+    workers on different hosts sharing one Redis server.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+
+    async def publish(self, channel: str, data: bytes) -> int:
+        """Queues data for every subscription to channel and returns their number."""
+        queues = self._subscribers.get(channel, ())
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(queues)
+
+    def pubsub(self):
+        """Returns a new subscription connection."""
+        return _FakeSubscription(self._subscribers)
+
+
+class _FakeSubscription:
+    """One FakePubSub connection, mirroring the part of redis.asyncio.client.PubSub the transport uses."""
+
+    def __init__(self, subscribers: dict):
+        self._subscribers = subscribers
+        self._queue = asyncio.Queue()
+        self._channels = []
+
+    async def subscribe(self, channel: str):
+        self._subscribers.setdefault(channel, []).append(self._queue)
+        self._channels.append(channel)
+        self._queue.put_nowait({"type": "subscribe", "channel": channel, "data": len(self._channels)})
+
+    async def unsubscribe(self, channel: str):
+        self._subscribers[channel].remove(self._queue)
+        self._channels.remove(channel)
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self):
+        for channel in list(self._channels):
+            await self.unsubscribe(channel)
+
+
+class InvalidationBus:
+    """
+    Broadcasts "users changed" events to the other workers, so each one can
+    evict its own in-process copies.
+
+    Events published by this worker are not delivered back to it: its caches
+    were already evicted by the commit that published them. Each message
+    carries the time it was sent, and the delay until it is applied is kept
+    as lag metrics; across hosts the lag includes any clock skew. A transport
+    that fails to start is logged and left out.
+
+    Args:
+        transports (iterable): The transports to publish on and receive from.
+        origin (str, optional): Identifies this worker. Defaults to a unique ID.
+        clock (callable): Returns the current wall-clock time in seconds. Defaults to time.time.
+
+    Attributes:
+        published (int): Events this worker published.
+        received (int): Events from other workers applied here.
+        connected (bool): Whether a transport is running, so this worker hears the others.
+    """
+
+    def __init__(self, transports: Iterable[InvalidationTransport] = (), origin: str | None = None, clock=time.time):
+        self.transports = list(transports)
+        self.origin = origin or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.clock = clock
+        self.published = 0
+        self.received = 0
+        self._handlers = []
+        self._running = []
+        self._started = False
+        self._lag_total = 0.0
+        self._lag_last = 0.0
+        self._lag_max = 0.0
+
+    def add_transport(self, transport: InvalidationTransport):
+        """Adds a transport. Must be called before start()."""
+        self.transports.append(transport)
+
+    def subscribe(self, handler: Callable[[Iterable[int]], None]):
+        """
+        Registers a callable to run with the user IDs of every event from another worker.
+
+        Handlers run on the event loop and must be quick.
+
+        Returns:
+            The handler, so this can be used as a decorator.
+        """
+        self._handlers.append(handler)
+        return handler
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._running)
+
+    async def start(self):
+        """Starts every transport on the running event loop."""
+        for transport in self.transports:
+            try:
+                await transport.start(self._deliver)
+            except OSError:
+                logger.exception("Invalidation transport %r failed to start", transport)
+                continue
+            self._running.append(transport)
+        self._started = True
+
+    async def stop(self):
+        """Closes every running transport."""
+        self._started = False
+        for transport in self._running:
+            await transport.close()
+        self._running = []
+
+    def publish_users_changed(self, user_ids: Iterable[int]):
+        """
+        Tells the other workers that these users changed. Does nothing before start().
+
+        Args:
+            user_ids: The IDs of the users.
+        """
+        if not self._started:
+            return
+        payload = json.dumps(
+            {"origin": self.origin, "sent_at": self.clock(), "user_ids": sorted(user_ids)},
+            separators=(",", ":")
+        ).encode()
+        for transport in self._running:
+            transport.publish(payload)
+        self.published += 1
+
+    def _deliver(self, payload: bytes):
+        """Applies an event received from a transport."""
+        try:
+            message = json.loads(payload)
+            origin, sent_at, user_ids = message["origin"], message["sent_at"], message["user_ids"]
+        except (ValueError, KeyError, TypeError):
+            logger.error("Ignoring a malformed invalidation message: %r", payload[:200])
+            return
+        if origin == self.origin:
+            return
+
+        for handler in self._handlers:
+            try:
+                handler(user_ids)
+            except Exception:
+                logger.exception("Invalidation handler %r failed", handler)
+
+        lag = max(self.clock() - sent_at, 0.0)
+        self.received += 1
+        self._lag_last = lag
+        self._lag_total += lag
+        self._lag_max = max(self._lag_max, lag)
+
+    def stats(self) -> dict:
+        """Returns the event counters and the lag, in milliseconds, for metrics endpoints and logs."""
+        return {
+            "published": self.published,
+            "received": self.received,
+            "dropped": sum(getattr(transport, "dropped", 0) for transport in self.transports),
+            "last_lag_ms": self._lag_last * 1000,
+            "max_lag_ms": self._lag_max * 1000,
+            "mean_lag_ms": self._lag_total / self.received * 1000 if self.received else 0.0,
+        }
+
+
+# The bus of this worker process; host-local unless INVALIDATION_BUS_SOCKET_DIR is empty
+invalidation_bus = InvalidationBus(
+    [UnixDatagramTransport(INVALIDATION_BUS_SOCKET_DIR)] if INVALIDATION_BUS_SOCKET_DIR else []
+)
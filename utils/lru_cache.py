@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    A bounded, thread-safe LRU cache whose entries also expire after a TTL.
+
+    Every operation is O(1): entries live in an OrderedDict in recency order,
+    the least recently used entry is evicted once max_entries is reached, and
+    an expired entry is dropped when it is next read.
+
+    Args:
+        max_entries (int): The most entries the cache holds.
+        default_ttl (float, optional): Seconds an entry lives when set() gets no ttl.
+            None keeps entries until they are evicted.
+        clock (callable): Returns the current time in seconds. Defaults to time.monotonic.
+
+    Attributes:
+        hits (int): Reads that found a live entry.
+        misses (int): Reads that found nothing or an expired entry.
+        evictions (int): Entries dropped to stay within max_entries.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: float | None = None, clock=time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the live value for key and marks it most recently used.
+
+        Args:
+            key: The cache key.
+            default: Returned when the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        """
+        Stores value under key, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl (float, optional): Seconds until the entry expires. Defaults to default_ttl.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._entries[key] = (value, expires_at)
+
+    def pop(self, key, default=None):
+        """Removes key and returns its value, live or not."""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of reads that were hits, or 0.0 before the first read."""
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+    def stats(self) -> dict:
+        """Returns the size and counters as a dictionary, for metrics endpoints and logs."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    def __len__(self):
+        return len(self._entries)
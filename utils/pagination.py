@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(updated_at: datetime, row_id: int) -> str:
+    """
+    Encodes a keyset position as an opaque, URL-safe cursor token.
+
+    Args:
+        updated_at: The sort timestamp of the last row returned.
+        row_id: The ID of the last row returned, which breaks timestamp ties.
+
+    Returns:
+        The cursor token.
+    """
+    payload = json.dumps([updated_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> tuple:
+    """
+    Decodes a cursor token produced by encode_cursor.
+
+    Args:
+        token: The cursor token.
+
+    Returns:
+        The (updated_at, row_id) position.
+
+    Raises:
+        ValueError: If the token is not a valid cursor.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        updated_at, row_id = json.loads(payload)
+        if not isinstance(row_id, int):
+            raise ValueError
+        return datetime.fromisoformat(updated_at), row_id
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,113 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Executor settings for password hashing
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64))
+
+
+def _hash_password(password: str) -> str:
+    """Hashes a password. Module level so process pools can pickle it."""
+    return pwd_context.hash(password)
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    """Verifies a password against its hash. Module level so process pools can pickle it."""
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded executor, off the event loop.
+
+    Each bcrypt call costs a few hundred milliseconds of CPU. Running it inline
+    in an async handler stalls every other request on the worker, so calls are
+    handed to a thread or process pool instead. At most max_workers calls run
+    at once and at most queue_limit more may wait; beyond that, callers get a
+    503 straight away rather than queueing behind a login storm.
+
+    Args:
+        executor_type (str): "thread" or "process".
+        max_workers (int): The number of hashing workers.
+        queue_limit (int): How many calls may wait for a free worker.
+    """
+
+    def __init__(self, executor_type: str = "thread", max_workers: int = 1, queue_limit: int = 0):
+        if executor_type not in ("thread", "process"):
+            raise ValueError("Invalid executor_type. Must be 'thread' or 'process'.")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """The number of calls running or waiting in the executor."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so worker processes are not forked at import time
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_workers + self.queue_limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashes a password.
+
+        Raises:
+            HTTPException: 503 if the hashing queue is full.
+        """
+        return await self._run(_hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verifies a password against its hash.
+
+        Raises:
+            HTTPException: 503 if the hashing queue is full.
+        """
+        return await self._run(_verify_password, password, hashed_password)
+
+    def shutdown(self):
+        """Stops the executor. Calls waiting in it are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared instance used by the auth and user logic
+password_hasher = PasswordHasher(
+    executor_type=PASSWORD_HASH_EXECUTOR,
+    max_workers=PASSWORD_HASH_WORKERS,
+    queue_limit=PASSWORD_HASH_QUEUE_LIMIT,
+)
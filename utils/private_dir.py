@@ -0,0 +1,38 @@
+import logging
+import os
+import stat
+
+logger = logging.getLogger(__name__)
+
+
+def is_private_dir(path: str, purpose: str) -> bool:
+    """
+    Creates the folder if needed and checks that only this user can use it.
+
+    The folder must be a real directory, not a symlink, owned by this user,
+    with no permissions for group or others (0700). Anything else is logged
+    as a warning.
+
+    Args:
+        path (str): The folder.
+        purpose (str): What the folder is for, for the warning, e.g. "compiled email templates".
+
+    Returns:
+        bool: Whether the folder is safe to keep the purpose's files in.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        status = os.lstat(path)
+    except OSError as error:
+        logger.warning("Cannot use %s for %s: %s", path, purpose, error)
+        return False
+    if not stat.S_ISDIR(status.st_mode):
+        logger.warning("Cannot use %s for %s: not a directory", path, purpose)
+        return False
+    if status.st_uid != os.getuid():
+        logger.warning("Cannot use %s for %s: owned by another user", path, purpose)
+        return False
+    if status.st_mode & 0o077:
+        logger.warning("Cannot use %s for %s: its mode must be 0700", path, purpose)
+        return False
+    return True
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+from dotenv import load_dotenv
+from utils.lru_cache import LRUTTLCache
+
+load_dotenv()
+
+# Profile cache settings
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", 10000))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", 300))
+PROFILE_CACHE_NEGATIVE_TTL = float(os.getenv("PROFILE_CACHE_NEGATIVE_TTL", 30))
+
+# Returned by ProfileCache.get when the cache knows nothing about a user
+PROFILE_MISS = object()
+
+
+class CachedProfile(NamedTuple):
+    """A user's profile dictionary and the weak ETag of its version."""
+    profile: dict
+    etag: str
+
+
+class ProfileCache:
+    """
+    An LRU+TTL cache of user profiles, stored as CachedProfile and keyed by user ID.
+
+    A missing user is cached as None for the shorter negative_ttl, so repeated
+    lookups of an unknown ID do not reach the database either. Entries are
+    dropped by invalidate() when a user changes; a fill that raced with an
+    invalidation is discarded, so a profile read before a commit can never be
+    cached after that commit's invalidation.
+
+    Args:
+        max_entries (int): The most profiles, found or missing, the cache holds.
+        ttl (float): Seconds a profile is served before it is read again.
+        negative_ttl (float): Seconds a missing user is remembered.
+        clock (callable): Returns the current time in seconds. Defaults to time.monotonic.
+
+    Attributes:
+        negative_hits (int): Reads answered with a cached missing user.
+        enabled (bool): Whether profiles are cached at all. See disable().
+    """
+
+    def __init__(self, max_entries: int = PROFILE_CACHE_MAX_ENTRIES, ttl: float = PROFILE_CACHE_TTL,
+                 negative_ttl: float = PROFILE_CACHE_NEGATIVE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_hits = 0
+        self.enabled = True
+        self._entries = LRUTTLCache(max_entries=max_entries, clock=clock)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counts invalidations. Read it before loading a profile and pass it to set()."""
+        return self._generation
+
+    def get(self, user_id: int):
+        """
+        Returns the cached profile of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            The CachedProfile, None if the user is known to be missing,
+            or PROFILE_MISS if the cache has nothing for this ID. The
+            profile dictionary is shared and must not be mutated.
+        """
+        if not self.enabled:
+            return PROFILE_MISS
+        profile = self._entries.get(user_id, PROFILE_MISS)
+        if profile is None:
+            self.negative_hits += 1
+        return profile
+
+    def set(self, user_id: int, profile, generation: int | None = None):
+        """
+        Caches a profile, or None for a missing user.
+
+        Args:
+            user_id (int): The ID of the user.
+            profile (CachedProfile, optional): The profile, or None if no user has this ID.
+            generation (int, optional): The generation read before the profile
+                was loaded. The profile is dropped if an invalidation came since.
+        """
+        ttl = self.ttl if profile is not None else self.negative_ttl
+        with self._lock:
+            if not self.enabled or (generation is not None and generation != self._generation):
+                return
+            self._entries.set(user_id, profile, ttl=ttl)
+
+    def invalidate(self, user_ids):
+        """
+        Drops the cached profiles of users that changed.
+
+        Args:
+            user_ids: The IDs of the users.
+        """
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id)
+
+    def disable(self):
+        """
+        Drops every profile and stops caching: get() then always misses and set() does nothing.
+
+        For a worker that cannot hear about the changes other workers commit,
+        whose cached profiles would be served stale until they expire.
+        """
+        with self._lock:
+            self.enabled = False
+            self._generation += 1
+            self._entries.clear()
+
+    def clear(self):
+        """Drops every profile and resets the counters."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.negative_hits = 0
+
+    def stats(self) -> dict:
+        """Returns the size, counters and hit ratio as a dictionary, for metrics endpoints and logs."""
+        return {**self._entries.stats(), "negative_hits": self.negative_hits}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Profiles cached by this worker process
+profile_cache = ProfileCache()
@@ -0,0 +1,188 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Send a Server-Timing header with every response. Keep it off in production:
+# it tells clients how long the password check and the database took.
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "false").lower() in ("1", "true", "yes")
+# Log the timings of every request, and of every email outbox batch, as structured fields
+SERVER_TIMING_LOG = os.getenv("SERVER_TIMING_LOG", "false").lower() in ("1", "true", "yes")
+
+# The timings of the request being handled, or None when nothing collects them
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    The time spent in each kind of operation while handling one request.
+
+    Durations of the same name are summed, so db is the total time of every
+    query. Operations that ran concurrently are each counted in full.
+
+    Attributes:
+        durations (dict): Seconds spent, by operation name.
+        counts (dict): Operations timed, by operation name.
+    """
+    __slots__ = ("durations", "counts")
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+
+    def add(self, name: str, seconds: float):
+        """Records one operation."""
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: Optional[float] = None) -> str:
+        """
+        Formats the timings as a Server-Timing header value, in milliseconds.
+
+        Args:
+            total (float, optional): Seconds the whole request took, sent as total.
+
+        Returns:
+            str: For example 'db;dur=1.204;desc="2 calls", bcrypt;dur=212.5;desc="1 call"'.
+        """
+        metrics = [
+            f'{name};dur={seconds * 1000:.3f};desc="{self.counts[name]} call{"" if self.counts[name] == 1 else "s"}"'
+            for name, seconds in self.durations.items()
+        ]
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+    def fields(self) -> dict:
+        """Returns the timings as flat log fields, such as db_ms and db_count."""
+        fields = {}
+        for name, seconds in self.durations.items():
+            fields[f"{name}_ms"] = round(seconds * 1000, 3)
+            fields[f"{name}_count"] = self.counts[name]
+        return fields
+
+
+class _Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def timed(name: str):
+    """
+    Times the enclosed block as one operation of the current request.
+
+    Outside collect_timings(), as when timing is switched off, this returns
+    a shared no-op context manager, so a disabled span costs one context
+    variable lookup.
+
+    Usage Example:
+        ```python
+        with timed("bcrypt"):
+            valid = await password_hasher.verify(password, user.password)
+        ```
+
+    Args:
+        name (str): The operation, used as the Server-Timing metric name.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _NULL_SPAN
+    return _Span(timings, name)
+
+
+@contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    """
+    Collects the spans of the enclosed block, and of the tasks and threads it starts.
+
+    Yields:
+        RequestTimings: The timings, filled in as the block runs.
+    """
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def log_timings(message: str, timings: RequestTimings, **fields):
+    """
+    Logs timings at INFO level, as a readable message and as the record's timing attribute.
+
+    Args:
+        message (str): What was timed, such as "request".
+        timings (RequestTimings): The timings to log.
+        **fields: More fields for the record, such as the path and status.
+    """
+    timing = {**fields, **timings.fields()}
+    logger.info(
+        "%s %s", message, " ".join(f"{key}={value}" for key, value in timing.items()),
+        extra={"timing": timing}
+    )
+
+
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if _current_timings.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    if timings is not None:
+        started = conn.info.get("query_started")
+        if started:
+            timings.add("db", time.perf_counter() - started.pop())
+
+
+def _failed_query(exception_context):
+    timings = _current_timings.get()
+    conn = exception_context.connection
+    if timings is not None and conn is not None:
+        started = conn.info.get("query_started")
+        if started:
+            timings.add("db", time.perf_counter() - started.pop())
+
+
+def install_db_timing():
+    """
+    Times every SQL statement, of any engine, as a db span of the current request.
+
+    This covers every UserCRUD query. Until it is called, queries carry no
+    timing hooks at all. Safe to call more than once.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _start_query):
+        event.listen(Engine, "before_cursor_execute", _start_query)
+        event.listen(Engine, "after_cursor_execute", _end_query)
+        event.listen(Engine, "handle_error", _failed_query)
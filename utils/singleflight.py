@@ -0,0 +1,71 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one.
+
+    The first caller for a key starts the call; callers that arrive while it
+    is in flight await the same result, or the same exception, instead of
+    making their own. The key is forgotten as soon as the call finishes, so
+    nothing is cached: a caller arriving after that starts a new call.
+
+    The call runs in its own task. A caller that is cancelled stops waiting
+    without cancelling the call for the others. Every caller gets the same
+    object, so results should be immutable, or at least never mutated.
+
+    Use it from the event loop's thread.
+
+    Attributes:
+        calls (int): Calls started.
+        shared (int): Callers that joined a call already in flight.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._flights = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args):
+        """
+        Returns the result of func(*args), shared with concurrent callers of the same key.
+
+        Args:
+            key: Identifies the call, typically the operation and its arguments.
+            func: A coroutine function, or any callable returning an awaitable.
+            *args: The arguments of func.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            Whatever the call raised.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = asyncio.ensure_future(func(*args))
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(flight)
+
+    def _finish(self, key, flight):
+        """Forgets a finished call, retrieving its exception in case nobody awaits it any more."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()
+
+    def stats(self) -> dict:
+        """Returns the calls in flight and the counters, for metrics endpoints and logs."""
+        return {"in_flight": len(self._flights), "calls": self.calls, "shared": self.shared}
+
+    def __len__(self):
+        return len(self._flights)
+
+
+# Reads coalesced by this worker process
+singleflight = SingleFlight()
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+import time
+from email.utils import formataddr
+import aiosmtplib
+from dotenv import load_dotenv
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
+from fastapi_mail.errors import PydanticClassRequired
+from fastapi_mail.fastmail import email_dispatched
+from fastapi_mail.msg import MailMsg
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# SMTP pool settings, per worker process
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 4))
+SMTP_POOL_IDLE_TIMEOUT = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", 60))
+SMTP_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("SMTP_POOL_HEALTH_CHECK_INTERVAL", 15))
+
+# Errors meaning the connection is gone rather than the message being refused
+CONNECTION_LOST_ERRORS = (ConnectionError, aiosmtplib.SMTPTimeoutError)
+
+
+def is_connection_lost(error: Exception) -> bool:
+    """Whether error means the SMTP connection is unusable, so the send may be retried elsewhere."""
+    if isinstance(error, CONNECTION_LOST_ERRORS):
+        return True
+    # 421: the server is closing the transmission channel
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code == 421
+
+
+class SMTPConnectionPool:
+    """
+    Keeps a few authenticated SMTP sessions open and reuses them for many messages.
+
+    A fresh connection costs a TCP handshake, STARTTLS and a login; a pooled
+    one costs nothing before the message itself. At most size connections are
+    open at once, and callers wait for a free one beyond that.
+
+    Idle connections are checked before reuse: one idle for longer than
+    idle_timeout is closed, since servers drop idle clients anyway, and one
+    idle for longer than health_check_interval must answer NOOP first. If a
+    reused connection turns out to be dead while sending, the message is
+    retried once on a new connection.
+
+    Args:
+        config (ConnectionConfig): The fastapi_mail connection settings.
+        size (int): The most connections open at once.
+        idle_timeout (float): Seconds an unused connection is kept open.
+        health_check_interval (float): Seconds of idleness after which a
+            connection is checked with NOOP before reuse.
+
+    Attributes:
+        created (int): Connections opened so far.
+    """
+
+    def __init__(self, config: ConnectionConfig, size: int = SMTP_POOL_SIZE,
+                 idle_timeout: float = SMTP_POOL_IDLE_TIMEOUT,
+                 health_check_interval: float = SMTP_POOL_HEALTH_CHECK_INTERVAL):
+        self.config = config
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.created = 0
+        # (connection, last used) pairs, most recently used last
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Opens and authenticates a new connection."""
+        config = self.config
+        connection = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            timeout=config.TIMEOUT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.VALIDATE_CERTS,
+        )
+        await connection.connect()
+        if config.USE_CREDENTIALS:
+            await connection.login(config.MAIL_USERNAME, config.MAIL_PASSWORD.get_secret_value())
+        self.created += 1
+        return connection
+
+    @staticmethod
+    async def _discard(connection: aiosmtplib.SMTP):
+        """Closes a connection, politely if it is still up."""
+        try:
+            if connection.is_connected:
+                await connection.quit()
+        except Exception:
+            connection.close()
+
+    async def _checkout(self):
+        """Returns (connection, reused) with a healthy pooled connection if there is one."""
+        now = time.monotonic()
+        while self._idle:
+            connection, last_used = self._idle.pop()
+            idle_for = now - last_used
+            if idle_for > self.idle_timeout or not connection.is_connected:
+                await self._discard(connection)
+                continue
+            if idle_for > self.health_check_interval:
+                try:
+                    await connection.noop()
+                except Exception:
+                    await self._discard(connection)
+                    continue
+            return connection, True
+        return await self._connect(), False
+
+    async def send(self, message):
+        """
+        Sends a built email message over a pooled connection.
+
+        Args:
+            message (email.message.Message): The message to send.
+
+        Raises:
+            aiosmtplib.SMTPException: If the server refuses the message or cannot be reached.
+        """
+        async with self._slots:
+            connection, reused = await self._checkout()
+            try:
+                await connection.send_message(message)
+            except Exception as error:
+                await self._discard(connection)
+                if not (reused and is_connection_lost(error)):
+                    raise
+                # The server dropped a pooled connection; one fresh attempt
+                logger.info("Pooled SMTP connection lost (%s), reconnecting", error)
+                connection = await self._connect()
+                try:
+                    await connection.send_message(message)
+                except Exception:
+                    await self._discard(connection)
+                    raise
+            self._idle.append((connection, time.monotonic()))
+
+    async def close(self):
+        """Closes every idle connection."""
+        idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            await self._discard(connection)
+
+    def __len__(self):
+        return len(self._idle)
+
+
+class PooledFastMail(FastMail):
+    """
+    FastMail that sends through an SMTPConnectionPool instead of a new connection per message.
+
+    Messages are built and the email_dispatched signal is sent exactly as
+    FastMail does, so record_messages() and SUPPRESS_SEND keep working.
+
+    Args:
+        config (ConnectionConfig): The fastapi_mail connection settings.
+        **pool_options: Passed to SMTPConnectionPool.
+
+    Attributes:
+        pool (SMTPConnectionPool): The connections messages are sent over.
+    """
+
+    def __init__(self, config: ConnectionConfig, **pool_options):
+        super().__init__(config)
+        self.pool = SMTPConnectionPool(config, **pool_options)
+
+    async def build_message(self, message: MessageSchema, template_name: str | None = None):
+        """Renders the template, if any, and builds the MIME message."""
+        if self.config.TEMPLATE_FOLDER and template_name and message.template_body is not None:
+            template = await self.get_mail_template(self.config.template_engine(), template_name)
+            message.template_body = template.render(**self.check_data(message.template_body))
+        sender = self.config.MAIL_FROM
+        if self.config.MAIL_FROM_NAME is not None:
+            sender = formataddr((self.config.MAIL_FROM_NAME, self.config.MAIL_FROM))
+        return await MailMsg(message)._message(sender)
+
+    async def send_message(self, message: MessageSchema, template_name: str | None = None) -> None:
+        """
+        Builds and sends a message over a pooled connection.
+
+        Args:
+            message (MessageSchema): The message to send.
+            template_name (str, optional): The template in TEMPLATE_FOLDER to render.
+        """
+        if not isinstance(message, MessageSchema):
+            raise PydanticClassRequired("Message schema should be provided from MessageSchema class")
+        msg = await self.build_message(message, template_name)
+        if not self.config.SUPPRESS_SEND:
+            await self.pool.send(msg)
+        email_dispatched.send(msg)
+
+    async def close(self):
+        """Closes the pooled connections."""
+        await self.pool.close()
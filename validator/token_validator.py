@@ -1,7 +1,11 @@
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
+import hashlib
 import os
+import time
 from jose import JWTError, jwt
+from utils.lru_cache import LRUTTLCache
+from utils.server_timing import timed
 
 
 # Load environment variables from .env file
@@ -12,7 +16,43 @@ token_secret = os.getenv("TOKEN_SECRET")
 SECRET_KEY = os.getenv("SECRET_KEY", token_secret)
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
 
+# Decoded claims keyed by the SHA-256 of the token, kept until the token's exp
+token_claims_cache = LRUTTLCache(max_entries=TOKEN_CACHE_MAX_ENTRIES, clock=time.time)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decodes and verifies a JWT token, reusing the claims of a token seen before.
+
+    Only tokens that carry an exp claim are cached, and only until that exp,
+    so a cached token never outlives the expiry jwt.decode would enforce.
+    The returned claims are shared between requests and must not be mutated.
+
+    Args:
+        token (str): The JWT token string to decode.
+
+    Raises:
+        JWTError: If the token is invalid or expired.
+
+    Returns:
+        dict: The payload of the decoded token.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_claims_cache.get(key)
+    if payload is not None:
+        return payload
+
+    with timed("jwt"):
+        payload = jwt.decode(token, str(SECRET_KEY), algorithms=[ALGORITHM])
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_claims_cache.set(key, payload, ttl=remaining)
+    return payload
 
 
 async def validate_user_token(token: str):
@@ -30,7 +70,7 @@ async def validate_user_token(token: str):
     """
     try:
         # Verify JWT token
-        payload = jwt.decode(token, str(SECRET_KEY), algorithms=[ALGORITHM])
+        payload = decode_token(token)
         return payload
     except JWTError:
         raise HTTPException(
@@ -54,7 +94,7 @@ async def validate_admin_token(token: str):
     """
     try:
         # Decode and verify the JWT token
-        payload = jwt.decode(token, str(SECRET_KEY), algorithms=[ALGORITHM])
+        payload = decode_token(token)
 
         # Get the user's role from the token payload
         role = payload.get("role")